@@ -0,0 +1,87 @@
+# conftest.py
+
+"""
+Shared setup for the benchmark suite: minimal Django settings, process-wide
+price store, fundamentals cache and LLM registry replaced by offline fakes
+(see fakes.py) so no benchmark touches the network, and the regression gate
+against the baseline committed under baselines/.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from pytest_benchmark.utils import get_machine_id, parse_compare_fail  # noqa: E402
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+BASELINE_STORAGE = BENCHMARK_DIR / "baselines"
+# Saved run to compare against (its number or name prefix); empty disables the gate
+BENCHMARK_BASELINE = os.getenv("BENCHMARK_BASELINE", "0001")
+# Regression that fails the run, in --benchmark-compare-fail syntax
+BENCHMARK_FAIL = os.getenv("BENCHMARK_FAIL", "median:20%")
+
+sys.path.insert(0, str(BENCHMARK_DIR.parent))
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("ANSWER_CACHE_ENABLED", "0")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+if not settings.configured:
+    settings.configure(
+        SECRET_KEY="benchmarks",
+        DEBUG=False,
+        ALLOWED_HOSTS=["*"],
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "rest_framework",
+            "financials_api",
+        ],
+        DATABASES={},
+        USE_TZ=True,
+    )
+    django.setup()
+
+from financials_api import fundamentals_cache, llm_clients, price_store  # noqa: E402
+
+from fakes import synthetic_prices, synthetic_statements  # noqa: E402
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """
+    Default the storage to baselines/ and, unless the command line picks a
+    storage or comparison itself, compare with BENCHMARK_BASELINE and fail on
+    a BENCHMARK_FAIL regression. Baselines are per platform (pytest-benchmark's
+    machine id); without one for this platform the run is not gated.
+    """
+    option = config.option
+    if option.benchmark_storage != "file://./.benchmarks":
+        return  # a storage of its own; compare options are up to the command line
+    option.benchmark_storage = f"file://{BASELINE_STORAGE}"
+    if option.benchmark_compare or not BENCHMARK_BASELINE:
+        return
+    if not any((BASELINE_STORAGE / get_machine_id()).glob(f"{BENCHMARK_BASELINE}*.json")):
+        print(f"No {BENCHMARK_BASELINE} benchmark baseline for {get_machine_id()}; regressions are not checked.")
+        return
+    option.benchmark_compare = BENCHMARK_BASELINE
+    if not option.benchmark_compare_fail:
+        option.benchmark_compare_fail = [parse_compare_fail(BENCHMARK_FAIL)]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def offline_backends(tmp_path_factory):
+    """Swap the yfinance-backed stores and the Gemini registry for fakes for the whole run."""
+    saved = price_store._store, fundamentals_cache._cache, llm_clients._registry
+    price_store._store = price_store.PriceStore(tmp_path_factory.mktemp("price_store"), fetcher=synthetic_prices)
+    fundamentals_cache._cache = fundamentals_cache.FundamentalsCache(
+        tmp_path_factory.mktemp("fundamentals_cache"), fetcher=synthetic_statements
+    )
+    llm_clients._registry = llm_clients.LLMRegistry(backend="fake")
+    yield
+    price_store._store, fundamentals_cache._cache, llm_clients._registry = saved
@@ -0,0 +1,144 @@
+# fakes.py
+
+"""
+Offline stand-ins for the network-backed dependencies of the benchmarked
+paths: yfinance (price and statement fetchers), the embedding models used by
+the retrievers, and synthetic Q&A corpora. Gemini goes through the fake
+backend of financials_api.llm_clients. Everything is deterministic, so runs
+are comparable with stored baselines.
+"""
+
+import functools
+import zlib
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from financials_api.price_store import COLUMNS
+from financials_api.ratio_rules import LINE_ITEMS
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+CALENDAR_START = pd.Timestamp("1990-01-01")
+CALENDAR_END = pd.Timestamp("2040-01-01")
+
+_WORDS = (
+    "risk reflexivity market bubble currency pound central bank policy leverage credit "
+    "inflation rates bond equity hedge fund position short long trend boom bust feedback "
+    "loop sentiment investor fallibility theory price value liquidity crisis emerging debt "
+    "dollar euro yen volatility macro trade capital flow regulation deficit growth recession "
+    "earnings valuation momentum speculation conviction exit size loss mistake survival "
+    "opportunity asymmetric bet thesis narrative expectation reality gap correction"
+).split()
+
+
+def _seed(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+
+@functools.lru_cache(maxsize=1)
+def _calendar() -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """Business-day calendar and one shared random-walk factor, so any two tickers are cointegrated."""
+    days = pd.bdate_range(CALENDAR_START, CALENDAR_END)
+    factor = np.cumsum(np.random.default_rng(7).normal(0.0, 0.01, len(days)))
+    return days, factor
+
+
+@functools.lru_cache(maxsize=64)
+def _closes(ticker: str) -> np.ndarray:
+    """Closes for the whole calendar: the factor plus a stationary AR(1) deviation per ticker."""
+    days, factor = _calendar()
+    rng = np.random.default_rng(_seed(ticker))
+    loading = rng.uniform(0.8, 1.2)
+    noise = rng.normal(0.0, 0.004, len(days))
+    deviation = np.empty(len(days))
+    deviation[0] = 0.0
+    for i in range(1, len(days)):
+        deviation[i] = 0.95 * deviation[i - 1] + noise[i]
+    return rng.uniform(20, 200) * np.exp(loading * factor + deviation)
+
+
+def synthetic_prices(tickers: Sequence[str], start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, pd.DataFrame]:
+    """PriceStore fetcher: daily OHLCV over [start, end), the same values for a date on every call."""
+    days, _ = _calendar()
+    lo, hi = days.searchsorted(pd.Timestamp(start)), days.searchsorted(pd.Timestamp(end))
+    frames = {}
+    for ticker in tickers:
+        close = _closes(ticker)[lo:hi]
+        frame = pd.DataFrame({col: close for col in COLUMNS}, index=days[lo:hi])
+        frame["Volume"] = 1_000_000.0
+        frames[ticker] = frame
+    return frames
+
+
+def synthetic_statements(symbol: str, kinds: Iterable[str], extra_items: int = 40) -> Dict[str, pd.DataFrame]:
+    """
+    FundamentalsCache fetcher: four annual periods (Timestamp columns, newest
+    first, as yfinance returns them) with every line item the ratio rules
+    read plus extra_items filler rows per statement.
+    """
+    rng = np.random.default_rng(_seed(symbol))
+    periods = pd.DatetimeIndex([pd.Timestamp(f"{year}-09-30") for year in (2024, 2023, 2022, 2021)])
+    statements = {}
+    for kind in kinds:
+        items = sorted({item for statement, item, _ in LINE_ITEMS.values() if statement == kind})
+        items += [f"Other {kind.title()} Item {i}" for i in range(extra_items)]
+        values = rng.uniform(1e8, 5e10, (len(items), len(periods)))
+        frame = pd.DataFrame(values, index=items, columns=periods)
+        if "Basic EPS" in frame.index:
+            frame.loc["Basic EPS"] = rng.uniform(1, 10, len(periods))
+        if "Capital Expenditure" in frame.index:
+            frame.loc["Capital Expenditure"] *= -1
+        frame.iloc[rng.integers(0, len(items), 3), 0] = np.nan  # yfinance leaves gaps
+        statements[kind] = frame
+    return statements
+
+
+def synthetic_corpus(size: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """(question, answer) pairs built from a finance vocabulary."""
+    rng = np.random.default_rng(seed)
+    words = np.array(_WORDS)
+    corpus = []
+    for _ in range(size):
+        question = " ".join(rng.choice(words, rng.integers(6, 14))).capitalize() + "?"
+        answer = ". ".join(
+            " ".join(rng.choice(words, rng.integers(8, 20))).capitalize() for _ in range(rng.integers(2, 6))
+        ) + "."
+        corpus.append((question, answer))
+    return corpus
+
+
+def _hashed_embeddings(texts: Sequence[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Bag of hashed words: texts sharing words get similar unit vectors."""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in str(text).lower().split():
+            vectors[row, _seed(word.strip(".,?!")) % dim] += 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class FakeSentenceTransformer:
+    """sentence_transformers.SentenceTransformer stand-in for SimpleQARetriever."""
+
+    def __init__(self, model_name: str = "", **kwargs):
+        self.model_name = model_name
+
+    def encode(self, sentences, convert_to_numpy: bool = True, normalize_embeddings: bool = True, **kwargs):
+        single = isinstance(sentences, str)
+        vectors = _hashed_embeddings([sentences] if single else list(sentences))
+        return vectors[0] if single else vectors
+
+
+class FakeEmbeddingFunction:
+    """Chroma embedding function stand-in (chromadb calls it with `input`)."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, input):
+        return [vector.tolist() for vector in _hashed_embeddings(list(input))]
+
+    @staticmethod
+    def name() -> str:
+        return "benchmark-fake"
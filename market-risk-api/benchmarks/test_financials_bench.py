@@ -0,0 +1,54 @@
+# test_financials_bench.py
+
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from financials_api.ratio_rules import COMPILED_RULES, render_ratios, stack_statements
+from financials_api.views.financial_views import FinancialDataView, statement_to_json
+
+from fakes import synthetic_statements
+
+KINDS = ("income", "balance", "cashflow")
+
+
+def _statements(symbol, extra_items=40):
+    statements = synthetic_statements(symbol, KINDS, extra_items=extra_items)
+    return tuple(statements[kind] for kind in KINDS)
+
+
+@pytest.mark.benchmark(group="financials-view")
+def test_financial_data_view(benchmark):
+    """GET /api/financials/<symbol>/ with the statements cached: ratios for 4 years plus statement JSON."""
+    view = FinancialDataView.as_view()
+    factory = APIRequestFactory()
+
+    def get():
+        response = view(factory.get("/api/financials/AAPL/"), stock_symbol="AAPL")
+        response.render()
+        return response
+
+    assert get().status_code == 200  # fills the fundamentals cache outside the timed rounds
+    response = benchmark(get)
+    assert response.data["demoData"] is False
+    assert len(response.data["ratiosByYear"]) == 4
+
+
+@pytest.mark.benchmark(group="financials-ratios")
+@pytest.mark.parametrize("symbols", [1, 100])
+def test_ratio_computation(benchmark, symbols):
+    """stack_statements + render_ratios over 4 years, as in the view (1 symbol) and the screen (many)."""
+    statements = {f"S{i:03d}": _statements(f"S{i:03d}") for i in range(symbols)}
+
+    def ratios():
+        items, periods = stack_statements(statements, year_indices=range(4))
+        return render_ratios(COMPILED_RULES, items, periods)
+
+    assert len(benchmark(ratios)) == 4 * symbols
+
+
+@pytest.mark.benchmark(group="financials-statement-json")
+@pytest.mark.parametrize("extra_items", [40, 400])
+def test_statement_to_json(benchmark, extra_items):
+    income, _, _ = _statements("AAPL", extra_items=extra_items)
+    records = benchmark(statement_to_json, income, 4)
+    assert len(records) == len(income)
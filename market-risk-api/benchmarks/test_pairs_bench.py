@@ -0,0 +1,74 @@
+# test_pairs_bench.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from financials_api.pairs_backtest import run_backtest
+from financials_api.price_store import get_price_store
+from financials_api.rolling_stats import default_min_periods, rolling_mean_std
+from financials_api.views.pairs_view import PairTradingView
+
+YEARS = [1, 5, 20]
+
+
+def _range(years):
+    end = pd.Timestamp.today().normalize()
+    return end - pd.DateOffset(years=years), end
+
+
+@pytest.mark.benchmark(group="pairs-view")
+@pytest.mark.parametrize("years", YEARS)
+def test_pair_trading_view(benchmark, years):
+    """Full POST /api/pairs/: price store read, hedge fit, cointegration, backtest, fake insight, JSON render."""
+    start, end = _range(years)
+    body = {
+        "symbolA": "AAA",
+        "symbolB": "BBB",
+        "startDate": start.strftime("%Y-%m-%d"),
+        "endDate": end.strftime("%Y-%m-%d"),
+        "entryZ": 1.0,
+        "exitZ": 0.25,
+        "rollingWindow": 60,
+    }
+    view = PairTradingView.as_view()
+    factory = APIRequestFactory()
+
+    def post():
+        response = view(factory.post("/api/pairs/", body, format="json"))
+        response.render()
+        return response
+
+    assert post().status_code == 200  # fills the price store outside the timed rounds
+    response = benchmark(post)
+    assert response.status_code == 200
+    assert response.data["hedgeRatio"] is not None
+
+
+@pytest.mark.benchmark(group="pairs-backtest")
+@pytest.mark.parametrize("years", YEARS)
+def test_run_backtest(benchmark, years):
+    """The backtest kernel alone (rolling bands, positions, PnL) on aligned prices."""
+    start, end = _range(years)
+    prices = get_price_store().get_many(["AAA", "BBB"], start, end, field="Adj Close").dropna()
+    result = benchmark(run_backtest, prices["AAA"], prices["BBB"], 1.0, 1.0, 0.25, 60)
+    assert len(result.positions) == len(prices) - 1
+
+
+@pytest.mark.benchmark(group="pairs-rolling")
+@pytest.mark.parametrize("case", ["random-walk", "tiny-std"])
+def test_rolling_mean_std(benchmark, case):
+    """Rolling mean/std on 20 years of bars; must equal pandas' rolling mean/std exactly."""
+    rng = np.random.default_rng(0)
+    if case == "random-walk":
+        spread = rng.normal(0, 1, 5000).cumsum()
+    else:
+        # std ~1e-5 around a level of 100: cancellation-prone for sums of squares
+        spread = 100 + rng.normal(0, 1e-5, 5000)
+    spread[rng.integers(0, len(spread), 50)] = np.nan
+    window = 60
+    mean, std = benchmark(rolling_mean_std, spread, window)
+    rolling = pd.Series(spread).rolling(window, min_periods=default_min_periods(window))
+    np.testing.assert_array_equal(mean, rolling.mean().to_numpy())
+    np.testing.assert_array_equal(std, rolling.std().to_numpy())
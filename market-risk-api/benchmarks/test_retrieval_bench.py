@@ -0,0 +1,73 @@
+# test_retrieval_bench.py
+
+import csv
+
+import pandas as pd
+import pytest
+
+from financials_api.ticker_utils import extract_ticker
+
+from fakes import FakeEmbeddingFunction, FakeSentenceTransformer, synthetic_corpus
+
+CORPUS_SIZES = [100, 1000, 10000]
+QUERY = "How does Soros size a position when reflexivity turns a boom into a bust?"
+
+
+@pytest.fixture(scope="module", params=CORPUS_SIZES, ids=lambda n: f"{n}docs")
+def corpus(request):
+    return synthetic_corpus(request.param)
+
+
+@pytest.fixture(scope="module", params=["embeddings", "tfidf"])
+def simple_retriever(request, corpus, tmp_path_factory):
+    retriever_module = pytest.importorskip("financials_api.retriever")  # needs scikit-learn
+    path = tmp_path_factory.mktemp("corpus") / "qa_corpus.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(corpus)
+
+    with pytest.MonkeyPatch.context() as mp:
+        # Offline encoder in place of sentence-transformers; exact top-k (no HNSW)
+        mp.setattr(retriever_module, "SentenceTransformer", FakeSentenceTransformer if request.param == "embeddings" else None)
+        mp.setattr(retriever_module, "hnswlib", None)
+        retriever = retriever_module.SimpleQARetriever(str(path), cache_dir=tmp_path_factory.mktemp("embedding_cache"))
+    return retriever
+
+
+@pytest.fixture(scope="module")
+def chroma_retriever(corpus, tmp_path_factory):
+    rag_retriever = pytest.importorskip("financials_api.rag_retriever")  # needs chromadb
+    df = pd.DataFrame(
+        {"Label": "bench", "Question": [q for q, _ in corpus], "Answer": [a for _, a in corpus]}
+    )
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(rag_retriever, "load_qa_dataframe", lambda *args, **kwargs: df)
+        mp.setattr(rag_retriever.embedding_functions, "DefaultEmbeddingFunction", FakeEmbeddingFunction)
+        mp.setenv("ENABLE_SENTENCE_TRANSFORMER", "0")
+        retriever = rag_retriever.ChromaEmbeddingRetriever(persist_dir=str(tmp_path_factory.mktemp("chroma")))
+    return retriever
+
+
+@pytest.mark.benchmark(group="retrieval-simple")
+def test_simple_retrieve_top_k(benchmark, simple_retriever):
+    results = benchmark(simple_retriever.retrieve_top_k, QUERY, 5)
+    assert len(results) == 5
+
+
+@pytest.mark.benchmark(group="retrieval-chroma")
+def test_chroma_retrieve(benchmark, chroma_retriever):
+    results = benchmark(chroma_retriever.retrieve, QUERY, 5)
+    assert len(results) == 5
+
+
+@pytest.mark.benchmark(group="extract-ticker")
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Is TSLA too risky for Soros?",
+        "How would Soros view the FED raising rates?",
+        " ".join(["What would Soros say about the pound, the dollar and the euro today"] * 20) + " NVDA",
+    ],
+    ids=["hit", "miss", "long"],
+)
+def test_extract_ticker(benchmark, text):
+    benchmark(extract_ticker, text)
@@ -0,0 +1,216 @@
+# answer_cache.py
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+DEFAULT_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+# Cosine similarity between questions above which a cached answer is reused
+DEFAULT_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.92"))
+# Sentence-transformer model for the semantic tier, loaded on first use
+EMBEDDING_MODEL = os.getenv("ANSWER_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+# texts -> (n, dim) embeddings, or None when no embedding model is loaded
+Embedder = Callable[[list], Optional[np.ndarray]]
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+class LazyEmbedder:
+    """
+    Embedder for the semantic tier that loads its sentence-transformer model
+    on the first call, so importing this module stays cheap and the tier does
+    not depend on any other component being loaded. If the model cannot be
+    loaded it returns None and the caches fall back to exact matches.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None and self._error is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception as e:
+                    self._error = str(e)
+                    logger.warning("Answer cache: could not load %s (%s); only exact matches are cached.", self.model_name, e)
+            return self._model
+
+    def __call__(self, texts: list) -> Optional[np.ndarray]:
+        model = self._model or self._load()
+        if model is None:
+            return None
+        return model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True)
+
+
+@dataclass
+class _Entry:
+    answer: str
+    created_at: float
+    tickers: FrozenSet[str]
+    embedding: Optional[np.ndarray]
+
+
+class AnswerCache:
+    """
+    Two-tier LLM answer cache.
+
+    Exact tier: keyed on the normalized prompt.
+    Semantic tier: cosine similarity between the question and the questions of
+    cached entries with the same tickers, using the cache's embedder.
+    Entries expire after ttl_seconds, the least recently used are evicted past
+    max_entries, and entries built on a ticker's market snapshot are dropped
+    when that snapshot changes (or on invalidate_ticker).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        similarity_threshold: float = DEFAULT_SIMILARITY,
+        embedder: Optional[Embedder] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._snapshots: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+
+    def _embed(self, question: Optional[str]) -> Optional[np.ndarray]:
+        if not question or self.embedder is None:
+            return None
+        try:
+            vectors = self.embedder([question])
+        except Exception as e:
+            logger.warning("Answer cache embedding failed: %s", e)
+            return None
+        if vectors is None or len(vectors) == 0:
+            return None
+        vector = np.asarray(vectors[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return now - entry.created_at >= self.ttl_seconds
+
+    def get(self, prompt: str, question: Optional[str] = None, tickers: Iterable[str] = ()) -> Optional[str]:
+        """Cached answer for prompt (exact) or for a similar question with the same tickers."""
+        key = normalize_text(prompt)
+        tickers = frozenset(t.upper() for t in tickers if t)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry, now):
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits["exact"] += 1
+                    return entry.answer
+            candidates = [
+                (k, e) for k, e in self._entries.items()
+                if e.embedding is not None and e.tickers == tickers and not self._expired(e, now)
+            ]
+
+        query = self._embed(question) if candidates else None
+        if query is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        sims = np.stack([e.embedding for _, e in candidates]) @ query
+        best = int(np.argmax(sims))
+        with self._lock:
+            if sims[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+            key, entry = candidates[best]
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits["semantic"] += 1
+            return entry.answer
+
+    def put(self, prompt: str, answer: str, question: Optional[str] = None, tickers: Iterable[str] = ()) -> None:
+        entry = _Entry(
+            answer=answer,
+            created_at=time.time(),
+            tickers=frozenset(t.upper() for t in tickers if t),
+            embedding=self._embed(question),
+        )
+        key = normalize_text(prompt)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def note_snapshot(self, ticker: str, snapshot: str) -> None:
+        """Record the market snapshot used for ticker; a changed snapshot invalidates its entries."""
+        ticker = ticker.upper()
+        with self._lock:
+            previous = self._snapshots.get(ticker)
+            self._snapshots[ticker] = snapshot
+        if previous is not None and previous != snapshot:
+            self.invalidate_ticker(ticker)
+
+    def invalidate_ticker(self, ticker: str) -> int:
+        ticker = ticker.upper()
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if ticker in e.tickers]
+            for k in stale:
+                del self._entries[k]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._snapshots.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_caches: Dict[str, AnswerCache] = {}
+_embedder: Optional[LazyEmbedder] = None
+_caches_guard = threading.Lock()
+
+
+def get_answer_cache(name: str) -> Optional[AnswerCache]:
+    """
+    Process-wide AnswerCache per endpoint name ("rag", "chatbot"), or None
+    when ANSWER_CACHE_ENABLED=0. The caches share one LazyEmbedder.
+    """
+    global _embedder
+    if not CACHE_ENABLED:
+        return None
+    with _caches_guard:
+        cache = _caches.get(name)
+        if cache is None:
+            if _embedder is None:
+                _embedder = LazyEmbedder()
+            cache = _caches[name] = AnswerCache(embedder=_embedder)
+        return cache
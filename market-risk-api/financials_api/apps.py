@@ -1,6 +1,20 @@
+import os
+
 from django.apps import AppConfig
 
 
 class FinancialsApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'financials_api'
+
+    def ready(self):
+        # The RAG chatbot is created lazily on the first /api/ragbot/ request.
+        # RAG_WARMUP=1 starts loading it in the background as soon as the app is up.
+        if os.getenv("RAG_WARMUP", "0") == "1":
+            from .interface import warm_up
+            warm_up()
+
+        # The live pairs monitor otherwise starts on the first /api/pairs/monitor/ request.
+        if os.getenv("PAIRS_MONITOR_AUTOSTART", "0") == "1":
+            from .pairs_monitor import get_pairs_monitor
+            get_pairs_monitor()
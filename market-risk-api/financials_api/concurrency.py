@@ -0,0 +1,47 @@
+# concurrency.py
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# Blocking network calls (Chroma, yfinance, the price store) from async views
+IO_WORKERS = int(os.getenv("ASYNC_IO_WORKERS", "32"))
+# numpy/pandas/statsmodels work (cointegration fits, backtests, embeddings);
+# these mostly release the GIL, so about one thread per core
+CPU_WORKERS = int(os.getenv("ASYNC_CPU_WORKERS", str(os.cpu_count() or 4)))
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(kind: str) -> ThreadPoolExecutor:
+    """Process-wide bounded thread pool for kind ("io" or "cpu")."""
+    with _executors_lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            workers = CPU_WORKERS if kind == "cpu" else IO_WORKERS
+            executor = _executors[kind] = ThreadPoolExecutor(
+                max_workers=max(1, workers), thread_name_prefix=f"async-{kind}"
+            )
+        return executor
+
+
+async def _run(kind: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    # Run in a copy of the caller's context (as asyncio.to_thread does), so tracing spans nest
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(kind), functools.partial(context.run, fn, *args, **kwargs))
+
+
+async def run_io(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await a blocking I/O call without holding up the event loop."""
+    return await _run("io", fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await CPU-bound work on the CPU pool, so it cannot starve I/O calls of threads."""
+    return await _run("cpu", fn, *args, **kwargs)
@@ -0,0 +1,178 @@
+# fundamentals_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = Path(os.getenv("FUNDAMENTALS_CACHE_DIR", BASE_DIR / "fundamentals_cache"))
+
+# Annual statements only change a few times a year.
+DEFAULT_TTL_SECONDS = int(os.getenv("FUNDAMENTALS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Empty results (unknown symbol, throttled response) are retried much sooner.
+EMPTY_TTL_SECONDS = int(os.getenv("FUNDAMENTALS_CACHE_EMPTY_TTL_SECONDS", "600"))
+MAX_MEMORY_ENTRIES = 1024
+
+# yfinance attribute names to try per statement (fallbacks for yfinance API changes)
+STATEMENTS: Dict[str, list] = {
+    "income": ["financials", "income_stmt", "get_income_stmt"],
+    "balance": ["balance_sheet", "get_balance_sheet"],
+    "cashflow": ["cashflow", "get_cashflow"],
+}
+
+
+def _get_statement(ticker, candidates) -> pd.DataFrame:
+    """
+    Try a list of attribute names on the yfinance ticker to fetch a statement.
+    Returns the first non-empty DataFrame, otherwise an empty DataFrame.
+    """
+    for name in candidates:
+        try:
+            stmt = getattr(ticker, name, pd.DataFrame())
+            if callable(stmt):
+                stmt = stmt()
+            if stmt is not None and not stmt.empty:
+                return stmt
+        except Exception:
+            continue
+    return pd.DataFrame()
+
+
+def fetch_statements(symbol: str, kinds: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    """Default network fetcher: one yf.Ticker for all requested statement kinds."""
+    ticker = yf.Ticker(symbol)
+    return {kind: _get_statement(ticker, STATEMENTS[kind]) for kind in kinds}
+
+
+class FundamentalsCache:
+    """
+    Two-tier cache of annual financial statements keyed by (symbol, statement).
+
+    Hits are served from an in-process LRU; misses fall back to a pickle per
+    entry on disk, and only then to yfinance. Entries expire after ttl_seconds
+    (EMPTY_TTL_SECONDS for empty statements).
+    """
+
+    def __init__(
+        self,
+        root: Path | str = DEFAULT_CACHE_DIR,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        fetcher=fetch_statements,
+        max_memory_entries: int = MAX_MEMORY_ENTRIES,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self._fetcher = fetcher
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, pd.DataFrame]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, kind: str) -> Path:
+        return self.root / symbol.replace("/", "_") / f"{kind}.pkl"
+
+    def _fresh(self, fetched_at: float, frame: pd.DataFrame) -> bool:
+        ttl = EMPTY_TTL_SECONDS if frame.empty else self.ttl_seconds
+        return (time.time() - fetched_at) < ttl
+
+    def _remember(self, key: Tuple[str, str], fetched_at: float, frame: pd.DataFrame) -> None:
+        with self._lock:
+            self._memory[key] = (fetched_at, frame)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, symbol: str, kind: str) -> Optional[pd.DataFrame]:
+        key = (symbol, kind)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is not None and self._fresh(*entry):
+            return entry[1]
+
+        path = self._path(symbol, kind)
+        try:
+            fetched_at = path.stat().st_mtime
+            frame = pd.read_pickle(path)
+        except (FileNotFoundError, OSError, ValueError, EOFError):
+            return None
+        if not self._fresh(fetched_at, frame):
+            return None
+        self._remember(key, fetched_at, frame)
+        return frame
+
+    def _store(self, symbol: str, kind: str, frame: pd.DataFrame) -> None:
+        fetched_at = time.time()
+        path = self._path(symbol, kind)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".pkl.{os.getpid()}.{threading.get_ident()}.tmp")
+        frame.to_pickle(tmp)
+        os.replace(tmp, path)
+        self._remember((symbol, kind), fetched_at, frame)
+
+    def get_statements(self, symbol: str, kinds: Iterable[str] = ("income", "balance", "cashflow")) -> Tuple[pd.DataFrame, ...]:
+        """
+        Return the requested statements for symbol, in order.
+        All statements missing from the cache are fetched with a single yf.Ticker.
+        """
+        symbol = symbol.upper().strip()
+        kinds = list(kinds)
+        found = {kind: self._lookup(symbol, kind) for kind in kinds}
+        missing = [kind for kind, frame in found.items() if frame is None]
+        if missing:
+            fetched = self._fetcher(symbol, missing)
+            for kind in missing:
+                frame = fetched.get(kind)
+                frame = frame if frame is not None else pd.DataFrame()
+                self._store(symbol, kind, frame)
+                found[kind] = frame
+        return tuple(found[kind] for kind in kinds)
+
+    def prefetch(self, symbols: Iterable[str], max_workers: int = 8) -> Dict[str, Optional[str]]:
+        """
+        Warm the cache for many symbols with at most max_workers concurrent fetches.
+        Returns {symbol: None} on success or {symbol: error message}.
+        """
+        symbols = list(dict.fromkeys(s.upper().strip() for s in symbols))
+
+        def warm(symbol):
+            try:
+                self.get_statements(symbol)
+                return symbol, None
+            except Exception as e:
+                return symbol, str(e)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return dict(pool.map(warm, symbols))
+
+    def invalidate(self, symbol: str) -> None:
+        symbol = symbol.upper().strip()
+        with self._lock:
+            for kind in STATEMENTS:
+                self._memory.pop((symbol, kind), None)
+        for kind in STATEMENTS:
+            try:
+                self._path(symbol, kind).unlink()
+            except FileNotFoundError:
+                pass
+
+
+_cache: Optional[FundamentalsCache] = None
+_cache_guard = threading.Lock()
+
+
+def get_fundamentals_cache() -> FundamentalsCache:
+    """Process-wide FundamentalsCache shared by the financial views."""
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = FundamentalsCache()
+        return _cache
@@ -1,32 +1,113 @@
+import os
+from typing import List, Optional
+
 import torch
 from transformers import T5Tokenizer, T5ForConditionalGeneration
 
+try:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM  # type: ignore
+    import onnxruntime  # type: ignore
+except Exception:
+    ORTModelForSeq2SeqLM = None
+    onnxruntime = None
+
+# eager (fp32 PyTorch), int8 (dynamically quantized Linear layers) or onnx (ONNX Runtime)
+INFERENCE_MODE = os.getenv("T5_INFERENCE_MODE", "eager")
+# Intra-op threads for PyTorch / ONNX Runtime; unset keeps the library default
+NUM_THREADS = int(os.getenv("T5_NUM_THREADS", "0")) or None
+# 1 takes the greedy fast path (no beam search)
+NUM_BEAMS = int(os.getenv("T5_NUM_BEAMS", "4"))
+BATCH_SIZE = int(os.getenv("T5_BATCH_SIZE", "8"))
+MAX_INPUT_LENGTH = 512  # Context length limit
+
+
 class T5Generator:
-    def __init__(self, model_name='t5-small', max_length=256):
+    def __init__(
+        self,
+        model_name='t5-small',
+        max_length=256,
+        mode: str = INFERENCE_MODE,
+        num_threads: Optional[int] = NUM_THREADS,
+        num_beams: int = NUM_BEAMS,
+        batch_size: int = BATCH_SIZE,
+    ):
+        if num_threads:
+            torch.set_num_threads(num_threads)
         self.tokenizer = T5Tokenizer.from_pretrained(model_name)
-        self.model = T5ForConditionalGeneration.from_pretrained(model_name)
         self.max_length = max_length
-        print(f"T5 Generator initialized with model: {model_name}") # Keep init message
+        self.num_beams = max(1, num_beams)
+        self.batch_size = max(1, batch_size)
+        self.mode = mode
+        self.model = self._load_model(model_name, num_threads)
+        print(f"T5 Generator initialized with model: {model_name} ({self.mode})") # Keep init message
+
+    def _load_model(self, model_name, num_threads):
+        if self.mode == "onnx":
+            if ORTModelForSeq2SeqLM is not None:
+                session_options = onnxruntime.SessionOptions()
+                if num_threads:
+                    session_options.intra_op_num_threads = num_threads
+                return ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, session_options=session_options)
+            print("optimum[onnxruntime] is not installed; falling back to int8 PyTorch inference.")
+            self.mode = "int8"
+
+        model = T5ForConditionalGeneration.from_pretrained(model_name)
+        model.eval()
+        if self.mode == "int8":
+            # Weights of the Linear layers are stored as int8; activations are
+            # quantized on the fly. Roughly 2-3x faster on CPU with a small accuracy cost.
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif self.mode != "eager":
+            raise ValueError(f"Unknown T5 inference mode: {self.mode} (use eager, int8 or onnx)")
+        return model
+
+    def _generation_kwargs(self):
+        if self.num_beams == 1:
+            return {"num_beams": 1, "do_sample": False}
+        return {"num_beams": self.num_beams, "early_stopping": True, "length_penalty": 1.1}
 
     def generate(self, prompt: str) -> str:
-        input_ids = self.tokenizer.encode(
-            prompt,
-            return_tensors='pt',
-            max_length=512, # Context length limit
-            truncation=True
-        )
-
-        with torch.no_grad():
-            output_ids = self.model.generate(
-                input_ids,
-                max_length=self.max_length,
-                num_beams=4,
-                early_stopping=True,
-                length_penalty=1.1
+        return self.generate_batch([prompt])[0]
+
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        """
+        Answers for several prompts, in order. Prompts are sorted by token
+        length and generated batch_size at a time, so each batch is padded
+        only to its own longest prompt.
+        """
+        if not prompts:
+            return []
+
+        lengths = [
+            len(ids) for ids in self.tokenizer(
+                list(prompts), max_length=MAX_INPUT_LENGTH, truncation=True
+            )["input_ids"]
+        ]
+        order = sorted(range(len(prompts)), key=lambda i: lengths[i])
+        answers: List[Optional[str]] = [None] * len(prompts)
+
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start:start + self.batch_size]
+            inputs = self.tokenizer(
+                [prompts[i] for i in chunk],
+                return_tensors='pt',
+                padding=True,
+                max_length=MAX_INPUT_LENGTH,
+                truncation=True
             )
 
-        answer = self.tokenizer.decode(
-            output_ids[0],
-            skip_special_tokens=True
-        )
-        return answer
\ No newline at end of file
+            with torch.inference_mode():
+                output_ids = self.model.generate(
+                    input_ids=inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    max_length=self.max_length,
+                    **self._generation_kwargs()
+                )
+
+            decoded = self.tokenizer.batch_decode(
+                output_ids,
+                skip_special_tokens=True
+            )
+            for i, answer in zip(chunk, decoded):
+                answers[i] = answer
+        return answers
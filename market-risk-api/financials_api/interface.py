@@ -1,10 +1,16 @@
+import asyncio
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 
-from .rag_retriever import ChromaEmbeddingRetriever
-from .rag_generator import GeminiAnswerGenerator
+from .answer_cache import get_answer_cache
+from .concurrency import run_io
+from .prompt_builder import PromptBuilder, count_tokens, static_token_count
 from .ticker_utils import extract_ticker
 from .market_data import get_market_snapshot
+from .tracing import end_with, open_span, span
 
 SYSTEM_INSTRUCTIONS = """
 You are NOT a financial advisor and you MUST NOT provide financial advice.  
@@ -50,29 +56,91 @@ Always answer the **safe, reinterpreted educational version** of the question.
 """.strip()
 
 
+PROMPT_TEMPLATE = """{system}
+
+[CONTEXT – SOROS Q&A]
+{context}
+
+[CONTEXT – MARKET SNAPSHOT]
+{market}
+
+[QUESTION]
+{question}
+
+[INSTRUCTIONS TO THE MODEL]
+Using only the information above as your primary grounding, provide one coherent answer
+that blends Soros-style framing, reasoning, and risk/uncertainty watchouts. Keep it concise,
+educational, and readable for a classroom presentation—no numbered sections or headings.
+"""
+# Everything in the prompt except the per-request parts; counted once
+PROMPT_PREFIX = PROMPT_TEMPLATE.format(system=SYSTEM_INSTRUCTIONS, context="", market="", question="")
+
+
+BATCH_WORKERS = int(os.getenv("RAG_BATCH_WORKERS", "4"))
+
+
+def _tickers(question: str) -> Tuple[str, ...]:
+    ticker = extract_ticker(question)
+    return (ticker,) if ticker else ()
+
+
+async def _timed(name: str, awaitable, **attributes):
+    """Await inside a span, so stages run with asyncio.gather() are timed individually."""
+    with span(name, **attributes):
+        return await awaitable
+
+
 class SorosRAGChatbot:
     def __init__(self):
         base_dir = Path(__file__).resolve().parent.parent
         persist_dir = base_dir / "chroma_db"
         print(f"Initializing Soros RAG Chatbot (Chroma persist: {persist_dir})")
+        # Imported here so that loading this module (every worker, every manage.py
+        # command) does not pull in chromadb, the embedding model or Gemini.
+        from .rag_retriever import ChromaEmbeddingRetriever
+        from .rag_generator import GeminiAnswerGenerator
+
         self.retriever = ChromaEmbeddingRetriever(persist_dir=str(persist_dir))
-        self.generator = GeminiAnswerGenerator()
+        self.generator = GeminiAnswerGenerator(cache=get_answer_cache("rag"))
+        self.prompt_builder = PromptBuilder()
 
-    def _build_prompt(self, user_question: str) -> str:
+    def _build_prompt(self, user_question: str, context_pairs: Optional[List[Tuple[str, str]]] = None) -> str:
         """
         Build a prompt that includes system instructions, retrieved context,
         optional market snapshot, and the original question.
+        Pass context_pairs to skip retrieval (already done in a batch).
         """
-        context_pairs = self.retriever.retrieve(user_question, top_k=5)
-        if context_pairs:
-            context_blocks = [f"Q: {q}\nA: {a}" for (q, a) in context_pairs]
-            context_text = "\n\n".join(context_blocks)
-        else:
-            context_text = "No directly relevant Soros Q&A could be retrieved for this question."
+        with span("rag.build_prompt"):
+            if context_pairs is None:
+                with span("rag.retrieve"):
+                    context_pairs = self.retriever.retrieve(user_question, top_k=5)
+            ticker = extract_ticker(user_question)
+            market_context = None
+            if ticker:
+                with span("rag.market_snapshot", ticker=ticker):
+                    market_context = get_market_snapshot(ticker)
+            return self._compose_prompt(user_question, context_pairs, ticker, market_context)
 
-        ticker = extract_ticker(user_question)
+    async def _build_prompt_async(self, user_question: str) -> str:
+        """
+        _build_prompt() for async views: Chroma retrieval and the market
+        snapshot run concurrently on the I/O pool instead of one after the other.
+        """
+        with span("rag.build_prompt"):
+            ticker = extract_ticker(user_question)
+            retrieval = _timed("rag.retrieve", run_io(self.retriever.retrieve, user_question, top_k=5))
+            if ticker:
+                context_pairs, market_context = await asyncio.gather(
+                    retrieval, _timed("rag.market_snapshot", run_io(get_market_snapshot, ticker), ticker=ticker)
+                )
+            else:
+                context_pairs, market_context = await retrieval, None
+            return self._compose_prompt(user_question, context_pairs, ticker, market_context)
+
+    def _compose_prompt(self, user_question, context_pairs, ticker, market_context) -> str:
         if ticker:
-            market_context = get_market_snapshot(ticker)
+            if self.generator.cache is not None:
+                self.generator.cache.note_snapshot(ticker, market_context)
             market_block = (
                 f"Market snapshot for {ticker} (background only, do not just repeat):\n"
                 f"{market_context}"
@@ -80,53 +148,219 @@ class SorosRAGChatbot:
         else:
             market_block = "No specific ticker detected. The question may be more general or macro-oriented."
 
-        prompt = f"""{SYSTEM_INSTRUCTIONS}
+        # The retrieved Q&A gets whatever the token budget leaves after the fixed parts
+        reserved = static_token_count(PROMPT_PREFIX) + count_tokens(user_question) + count_tokens(market_block)
+        with span("rag.assemble_context", passages=len(context_pairs)):
+            context = self.prompt_builder.build_context(user_question, context_pairs, reserved)
+        context_text = context.text or "No directly relevant Soros Q&A could be retrieved for this question."
 
-[CONTEXT – SOROS Q&A]
-{context_text}
-
-[CONTEXT – MARKET SNAPSHOT]
-{market_block}
-
-[QUESTION]
-{user_question}
-
-[INSTRUCTIONS TO THE MODEL]
-Using only the information above as your primary grounding, provide one coherent answer
-that blends Soros-style framing, reasoning, and risk/uncertainty watchouts. Keep it concise,
-educational, and readable for a classroom presentation—no numbered sections or headings.
-"""
-        return prompt
+        return PROMPT_TEMPLATE.format(
+            system=SYSTEM_INSTRUCTIONS,
+            context=context_text,
+            market=market_block,
+            question=user_question,
+        )
 
     def answer(self, user_question: str) -> str:
         user_question = (user_question or "").strip()
         if not user_question:
             return "Please ask a question about trading, investing, markets, or Soros's philosophy."
 
-        prompt = self._build_prompt(user_question)
-        reply = self.generator.generate(prompt)
+        with span("rag.answer"):
+            prompt = self._build_prompt(user_question)
+            with span("rag.generate"):
+                reply = self.generator.generate(prompt, question=user_question, tickers=_tickers(user_question))
         return reply
 
+    async def answer_async(self, user_question: str) -> str:
+        """answer() for async views; the Gemini call is awaited rather than blocking a thread."""
+        user_question = (user_question or "").strip()
+        if not user_question:
+            return "Please ask a question about trading, investing, markets, or Soros's philosophy."
+
+        with span("rag.answer"):
+            prompt = await self._build_prompt_async(user_question)
+            with span("rag.generate"):
+                return await self.generator.generate_async(prompt, question=user_question, tickers=_tickers(user_question))
+
+    def answer_stream(self, user_question: str) -> Iterator[str]:
+        """
+        Same as answer(), but yields the reply in chunks as Gemini streams it.
+        The rag.answer and rag.generate spans end when the chunks run out.
+        """
+        user_question = (user_question or "").strip()
+        if not user_question:
+            yield "Please ask a question about trading, investing, markets, or Soros's philosophy."
+            return
+
+        answer = open_span("rag.answer")
+        try:
+            with answer.activate():
+                prompt = self._build_prompt(user_question)
+        except Exception:
+            answer.end(error=True)
+            raise
+        chunks = self.generator.generate_stream(prompt, question=user_question, tickers=_tickers(user_question))
+        yield from end_with(chunks, answer.child("rag.generate"), answer)
+
+    async def answer_stream_async(self, user_question: str) -> Iterator[str]:
+        """
+        answer_stream() for async views: the prompt is built with retrieval and
+        the market snapshot running concurrently, then Gemini's chunks are
+        returned as an iterator (consumed off the event loop by sse_response()).
+        The rag.answer and rag.generate spans end when the iterator runs out.
+        """
+        user_question = (user_question or "").strip()
+        if not user_question:
+            return iter(["Please ask a question about trading, investing, markets, or Soros's philosophy."])
+
+        answer = open_span("rag.answer")
+        try:
+            with answer.activate():
+                prompt = await self._build_prompt_async(user_question)
+        except Exception:
+            answer.end(error=True)
+            raise
+        chunks = self.generator.generate_stream(prompt, question=user_question, tickers=_tickers(user_question))
+        return end_with(chunks, answer.child("rag.generate"), answer)
+
+    def answer_many(self, user_questions: List[str], max_workers: int = BATCH_WORKERS) -> List[str]:
+        """
+        Answer several questions: one batched retrieval for all of them, then
+        the Gemini calls run concurrently (at most max_workers at a time).
+        """
+        questions = [(q or "").strip() for q in user_questions]
+        asked = [q for q in questions if q]
+        contexts = {}
+        if asked:
+            with span("rag.retrieve_batch", queries=len(asked)):
+                contexts = dict(zip(asked, self.retriever.retrieve_many(asked, top_k=5)))
+
+        def run(question):
+            if not question:
+                return self.answer(question)
+            try:
+                with span("rag.answer"):
+                    prompt = self._build_prompt(question, contexts[question])
+                    with span("rag.generate"):
+                        return self.generator.generate(prompt, question=question, tickers=_tickers(question))
+            except Exception as e:
+                print(f"Error generating RAG answer: {e}")
+                return "An error occurred generating the RAG answer."
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return list(pool.map(run, questions))
+
 
-_chatbot = None
-_chatbot_error = None
+_chatbot: Optional[SorosRAGChatbot] = None
+_chatbot_error: Optional[str] = None
+_chatbot_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
 
-try:
-    _chatbot = SorosRAGChatbot()
-except Exception as e:
-    _chatbot_error = str(e)
-    print(f"CRITICAL WARNING: Failed to initialize SorosRAGChatbot: {e}")
+
+def get_chatbot() -> Optional[SorosRAGChatbot]:
+    """
+    The process-wide SorosRAGChatbot, created on first use.
+    Returns None if initialization failed (see rag_status()).
+    """
+    global _chatbot, _chatbot_error
+    if _chatbot is not None or _chatbot_error is not None:
+        return _chatbot
+    with _chatbot_lock:
+        if _chatbot is None and _chatbot_error is None:
+            try:
+                _chatbot = SorosRAGChatbot()
+            except Exception as e:
+                _chatbot_error = str(e)
+                print(f"CRITICAL WARNING: Failed to initialize SorosRAGChatbot: {e}")
+    return _chatbot
+
+
+def warm_up() -> threading.Thread:
+    """Start initializing the chatbot on a background thread (at most once per process)."""
+    global _warmup_thread
+    with _chatbot_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=get_chatbot, name="rag-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def rag_status() -> dict:
+    """Readiness of the RAG pipeline: state is idle, loading, ready or failed."""
+    if _chatbot is not None:
+        state = "ready"
+    elif _chatbot_error is not None:
+        state = "failed"
+    elif _chatbot_lock.locked() or (_warmup_thread is not None and _warmup_thread.is_alive()):
+        state = "loading"
+    else:
+        state = "idle"
+    return {"ready": state == "ready", "state": state, "error": _chatbot_error}
 
 
 def answer_question(query: str, k: int = 5) -> dict:
     """
     Adapter for the RAGView: returns a dict with an 'answer' key.
     """
-    if _chatbot is None:
+    chatbot = get_chatbot()
+    if chatbot is None:
+        return {"answer": f"Error: RAG components not available ({_chatbot_error})."}
+
+    try:
+        return {"answer": chatbot.answer(query)}
+    except Exception as e:
+        print(f"Error generating RAG answer: {e}")
+        return {"answer": "An error occurred generating the RAG answer."}
+
+
+def answer_questions(queries: List[str]) -> dict:
+    """
+    Batch adapter for the RAGView: returns a dict with an 'answers' list
+    in the same order as queries.
+    """
+    chatbot = get_chatbot()
+    if chatbot is None:
+        return {"answers": [f"Error: RAG components not available ({_chatbot_error})." for _ in queries]}
+
+    try:
+        return {"answers": chatbot.answer_many(queries)}
+    except Exception as e:
+        print(f"Error generating RAG answers: {e}")
+        return {"answers": ["An error occurred generating the RAG answer." for _ in queries]}
+
+
+async def answer_question_async(query: str) -> dict:
+    """
+    answer_question() for async views. The first call still initializes the
+    chatbot, off the event loop.
+    """
+    chatbot = _chatbot or await run_io(get_chatbot)
+    if chatbot is None:
         return {"answer": f"Error: RAG components not available ({_chatbot_error})."}
 
     try:
-        return {"answer": _chatbot.answer(query)}
+        return {"answer": await chatbot.answer_async(query)}
     except Exception as e:
         print(f"Error generating RAG answer: {e}")
         return {"answer": "An error occurred generating the RAG answer."}
+
+
+async def stream_answer_async(query: str) -> Iterator[str]:
+    """stream_answer() for async views: awaits the prompt, returns the chunk iterator."""
+    chatbot = _chatbot or await run_io(get_chatbot)
+    if chatbot is None:
+        return iter([f"Error: RAG components not available ({_chatbot_error})."])
+    return await chatbot.answer_stream_async(query)
+
+
+def stream_answer(query: str) -> Iterator[str]:
+    """
+    Streaming adapter for the RAGView: yields answer chunks.
+    Initialization failures are reported as a single chunk, like answer_question().
+    """
+    chatbot = get_chatbot()
+    if chatbot is None:
+        yield f"Error: RAG components not available ({_chatbot_error})."
+        return
+    yield from chatbot.answer_stream(query)
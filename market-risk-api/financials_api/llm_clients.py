@@ -0,0 +1,228 @@
+# llm_clients.py
+
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import google.generativeai as genai
+except Exception:
+    genai = None
+
+# gemini (google-generativeai) or fake (offline, deterministic replies)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+
+def resolve_api_key() -> Optional[str]:
+    key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+    if key:
+        return key
+    try:
+        from buffet_backend import secrets  # type: ignore
+
+        return getattr(secrets, "GEMINI_API_KEY", None)
+    except Exception:
+        return None
+
+
+@dataclass
+class ModelMetrics:
+    """Per-model call counters. Token counts come from the responses' usage metadata."""
+
+    calls: int = 0
+    errors: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, latency: float, response=None, error: bool = False) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.prompt_tokens += int(getattr(usage, "prompt_token_count", 0) or 0)
+            self.output_tokens += int(getattr(usage, "candidates_token_count", 0) or 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "latencyTotalSeconds": self.latency_total,
+                "latencyAvgSeconds": self.latency_total / self.calls if self.calls else None,
+                "latencyMaxSeconds": self.latency_max if self.calls else None,
+                "promptTokens": self.prompt_tokens,
+                "outputTokens": self.output_tokens,
+            }
+
+
+class LLMModel:
+    """
+    Shared handle on one model with a fixed generation config.
+    generate_content()/generate_content_async() mirror the Gemini API and
+    return its response objects; every call is timed into the model's metrics.
+    Streaming calls record the time until the stream is open.
+    """
+
+    def __init__(self, name: str, model, generation_config: Optional[Dict[str, Any]], metrics: ModelMetrics):
+        self.name = name
+        self.model = model
+        self.generation_config = generation_config
+        self.metrics = metrics
+
+    def _kwargs(self, stream: bool = False) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"stream": True} if stream else {}
+        if self.generation_config:
+            kwargs["generation_config"] = self.generation_config
+        return kwargs
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        started = time.perf_counter()
+        try:
+            response = self.model.generate_content(prompt, **self._kwargs(stream))
+        except Exception:
+            self.metrics.record(time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record(time.perf_counter() - started, None if stream else response)
+        return response
+
+    async def generate_content_async(self, prompt: str):
+        started = time.perf_counter()
+        try:
+            response = await self.model.generate_content_async(prompt, **self._kwargs())
+        except Exception:
+            self.metrics.record(time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record(time.perf_counter() - started, response)
+        return response
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        part = SimpleNamespace(text=text)
+        self.candidates = [SimpleNamespace(content=SimpleNamespace(parts=[part]), finish_reason="STOP")]
+        self.prompt_feedback = SimpleNamespace(block_reason=None)
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=0, candidates_token_count=len(text.split())
+        )
+
+
+class FakeModel:
+    """
+    Offline stand-in for genai.GenerativeModel: replies "[<model>] <last prompt
+    line>" after LLM_FAKE_LATENCY_SECONDS, streamed word by word when asked.
+    """
+
+    def __init__(self, name: str, latency: float = 0.0):
+        self.name = name
+        self.latency = latency
+
+    def _reply(self, prompt: str) -> _FakeResponse:
+        lines = [line for line in (prompt or "").strip().splitlines() if line.strip()]
+        response = _FakeResponse(f"[{self.name}] {lines[-1] if lines else ''}")
+        response.usage_metadata.prompt_token_count = len((prompt or "").split())
+        return response
+
+    def generate_content(self, prompt: str, generation_config=None, stream: bool = False):
+        if self.latency:
+            time.sleep(self.latency)
+        response = self._reply(prompt)
+        if not stream:
+            return response
+        return [_FakeResponse(word + " ") for word in response.text.split()]
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._reply(prompt)
+
+
+class LLMRegistry:
+    """
+    Process-wide registry of LLM model handles. The backend is configured once
+    (the API key is resolved on first use), and handles are reused across
+    requests, keyed by model name and generation config.
+    """
+
+    def __init__(self, backend: str = LLM_BACKEND, api_key: Optional[str] = None):
+        self.backend = backend
+        self._api_key = api_key
+        self._configured = False
+        self._models: Dict[Tuple[str, str], LLMModel] = {}
+        self._metrics: Dict[str, ModelMetrics] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """True when models can be created (fake backend, or Gemini installed with a key)."""
+        if self.backend == "fake":
+            return True
+        return genai is not None and bool(self._api_key or resolve_api_key())
+
+    def configure(self, api_key: Optional[str] = None) -> None:
+        """Configure the backend once; later calls are no-ops unless the key changes."""
+        with self._lock:
+            self._configure(api_key)
+
+    def _configure(self, api_key: Optional[str] = None) -> None:
+        if self.backend == "fake":
+            self._configured = True
+            return
+        key = api_key or self._api_key or resolve_api_key()
+        if self._configured and key == self._api_key:
+            return
+        if genai is None:
+            raise RuntimeError("google-generativeai is not installed.")
+        if not key:
+            raise RuntimeError("Gemini API key not configured. Set GOOGLE_API_KEY or GEMINI_API_KEY.")
+        genai.configure(api_key=key)
+        self._api_key = key
+        self._configured = True
+
+    def model(self, name: str, generation_config: Optional[Dict[str, Any]] = None) -> LLMModel:
+        key = (name, json.dumps(generation_config or {}, sort_keys=True, default=str))
+        with self._lock:
+            handle = self._models.get(key)
+            if handle is None:
+                if not self._configured:
+                    self._configure()
+                if self.backend == "fake":
+                    raw = FakeModel(name, latency=float(os.getenv("LLM_FAKE_LATENCY_SECONDS", "0")))
+                else:
+                    raw = genai.GenerativeModel(name)
+                metrics = self._metrics.setdefault(name, ModelMetrics())
+                handle = self._models[key] = LLMModel(name, raw, generation_config, metrics)
+            return handle
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model call counts, latency and token totals."""
+        with self._lock:
+            items = list(self._metrics.items())
+        return {name: m.snapshot() for name, m in items}
+
+
+_registry: Optional[LLMRegistry] = None
+_registry_guard = threading.Lock()
+
+
+def get_llm_registry() -> LLMRegistry:
+    global _registry
+    with _registry_guard:
+        if _registry is None:
+            _registry = LLMRegistry()
+        return _registry
+
+
+def get_model(name: str, generation_config: Optional[Dict[str, Any]] = None) -> LLMModel:
+    """Shared handle for model name and generation_config (see LLMRegistry)."""
+    return get_llm_registry().model(name, generation_config)
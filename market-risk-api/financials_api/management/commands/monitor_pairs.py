@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from financials_api.pairs_monitor import (
+    ENTRY_Z,
+    EXIT_Z,
+    FEED,
+    FORGETTING,
+    WATCHLIST,
+    WINDOW,
+    FileReplayFeed,
+    PairsMonitor,
+    make_feed,
+    parse_watchlist,
+)
+
+
+class Command(BaseCommand):
+    help = "Run the live pairs monitor in the foreground and print entry/exit signals as JSON lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pairs", nargs="*", help="Pairs as A/B (default: PAIRS_MONITOR_WATCHLIST).")
+        parser.add_argument("--feed", default=FEED, help="yfinance, replay:<csv>, or a dotted path to a BarFeed class.")
+        parser.add_argument("--replay", help="Replay bars from a CSV file (shortcut for --feed replay:<csv>).")
+        parser.add_argument("--speed", type=float, default=0.0, help="Replay speed-up over the file's timestamps (0: no waiting).")
+        parser.add_argument("--window", type=int, default=WINDOW, help="Rolling z-score window, in bars.")
+        parser.add_argument("--entry-z", type=float, default=ENTRY_Z)
+        parser.add_argument("--exit-z", type=float, default=EXIT_Z)
+        parser.add_argument("--forgetting", type=float, default=FORGETTING, help="RLS forgetting factor for the hedge ratio.")
+
+    def handle(self, *args, **options):
+        try:
+            pairs = parse_watchlist(",".join(options["pairs"]) if options["pairs"] else WATCHLIST)
+            feed = FileReplayFeed(options["replay"], speed=options["speed"]) if options["replay"] else make_feed(options["feed"])
+        except (ValueError, ImportError) as e:
+            raise CommandError(str(e))
+        if not pairs:
+            raise CommandError("No pairs given. Use --pairs KO/PEP ... or set PAIRS_MONITOR_WATCHLIST.")
+
+        monitor = PairsMonitor(
+            pairs,
+            feed,
+            window=options["window"],
+            entry_z=options["entry_z"],
+            exit_z=options["exit_z"],
+            forgetting=options["forgetting"],
+        )
+        self.stdout.write(f"Monitoring {len(monitor.pairs)} pairs on {feed.describe()}...")
+        try:
+            monitor.run(on_signal=lambda signal: self.stdout.write(json.dumps(signal)))
+        except KeyboardInterrupt:
+            feed.stop()
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+
+        for pair in monitor.snapshot()["pairs"]:
+            self.stdout.write(
+                f"{pair['pair']}: {pair['bars']} bars, beta={pair['hedgeRatio']}, z={pair['zscore']}, "
+                f"{pair['position']}, {pair['signals']} signals"
+            )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from financials_api.fundamentals_cache import get_fundamentals_cache
+from financials_api.ticker_utils import VALID_TICKERS
+
+
+class Command(BaseCommand):
+    help = "Warm the fundamentals cache for a list of tickers with bounded concurrency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickers", nargs="*", help="Tickers to warm (default: ticker_utils.VALID_TICKERS).")
+        parser.add_argument("--workers", type=int, default=8, help="Maximum concurrent yfinance fetches.")
+        parser.add_argument("--refresh", action="store_true", help="Drop cached entries first so every ticker is refetched.")
+
+    def handle(self, *args, **options):
+        tickers = sorted({t.upper().strip() for t in (options["tickers"] or VALID_TICKERS)})
+        cache = get_fundamentals_cache()
+        if options["refresh"]:
+            for ticker in tickers:
+                cache.invalidate(ticker)
+
+        self.stdout.write(f"Prefetching fundamentals for {len(tickers)} tickers ({options['workers']} workers)...")
+        errors = {t: e for t, e in cache.prefetch(tickers, max_workers=options["workers"]).items() if e}
+        for ticker, error in sorted(errors.items()):
+            self.stderr.write(f"{ticker}: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Warmed {len(tickers) - len(errors)} of {len(tickers)} tickers."))
@@ -0,0 +1,73 @@
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from financials_api.models import PairScan, PairScanResult
+from financials_api.pairs_scanner import MIN_COVERAGE, scan_universe
+from financials_api.ticker_utils import VALID_TICKERS
+
+
+class Command(BaseCommand):
+    help = "Screen a ticker universe for cointegrated pairs and store the ranked results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickers", nargs="*", help="Universe to scan (default: ticker_utils.VALID_TICKERS).")
+        parser.add_argument("--start", help="Start date YYYY-MM-DD (default: 2 years before --end).")
+        parser.add_argument("--end", help="End date YYYY-MM-DD (default: today).")
+        parser.add_argument("--min-correlation", type=float, default=0.8, help="Log-price correlation pre-filter.")
+        parser.add_argument(
+            "--min-coverage", type=float, default=MIN_COVERAGE,
+            help="Leave out tickers with prices on less than this share of dates.",
+        )
+        parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count).")
+        parser.add_argument("--top", type=int, default=20, help="Number of ranked pairs to print.")
+
+    def handle(self, *args, **options):
+        tickers = sorted({t.upper().strip() for t in (options["tickers"] or VALID_TICKERS)})
+        try:
+            end = pd.to_datetime(options["end"]).normalize() if options["end"] else pd.Timestamp.today().normalize()
+            start = pd.to_datetime(options["start"]).normalize() if options["start"] else end - pd.DateOffset(years=2)
+        except Exception:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD.")
+
+        self.stdout.write(f"Scanning {len(tickers)} tickers ({len(tickers) * (len(tickers) - 1) // 2} pairs) from {start.date()} to {end.date()}...")
+        try:
+            table = scan_universe(
+                tickers,
+                start,
+                end,
+                min_correlation=options["min_correlation"],
+                max_workers=options["workers"],
+                min_coverage=options["min_coverage"],
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        with transaction.atomic():
+            scan = PairScan.objects.create(
+                start_date=start.date(),
+                end_date=end.date(),
+                universe=tickers,
+                min_correlation=options["min_correlation"],
+                pairs_tested=table.attrs.get("pairsTested", 0),
+            )
+            PairScanResult.objects.bulk_create([
+                PairScanResult(
+                    scan=scan,
+                    rank=int(row.rank),
+                    symbol_a=row.symbolA,
+                    symbol_b=row.symbolB,
+                    correlation=float(row.correlation),
+                    p_value=float(row.pValue),
+                    test_statistic=float(row.testStatistic),
+                    hedge_ratio=float(row.hedgeRatio),
+                    observations=int(row.observations),
+                )
+                for row in table.itertuples(index=False)
+            ])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved scan {scan.pk}: {scan.pairs_tested} pairs passed the correlation filter and were tested; {len(table)} ranked."
+        ))
+        for row in table.head(options["top"]).itertuples(index=False):
+            self.stdout.write(f"{int(row.rank):>3}. {row.symbolA}/{row.symbolB}  p={row.pValue:.4f}  corr={row.correlation:.3f}  beta={row.hedgeRatio:.4f}")
@@ -1,10 +1,8 @@
 # market_data.py
 
-import warnings
-import yfinance as yf
 import pandas as pd
 
-warnings.filterwarnings("ignore", category=FutureWarning, module="yfinance")
+from .price_store import get_price_store
 
 
 def _to_float(x):
@@ -22,27 +20,19 @@ def get_market_snapshot(ticker: str, period: str = "6mo") -> str:
     """
     Fetch a clean market snapshot for a given ticker.
     Always returns readable, scalar float values.
+    Prices come from the local price store, which only hits the network for dates it has not seen.
     """
     ticker = ticker.upper().strip()
 
     try:
-        data = yf.download(
-            ticker,
-            period=period,
-            interval="1d",
-            progress=False,
-            auto_adjust=False,
-        )
+        data = get_price_store().get_period(ticker, period)
     except Exception as e:
         return f"Error fetching data for {ticker}: {e}"
 
     if data.empty:
         return f"No market data available for {ticker}."
 
-    if isinstance(data.columns, pd.MultiIndex):
-        close = data["Close"].iloc[:, 0].dropna()
-    else:
-        close = data["Close"].dropna()
+    close = data["Close"].dropna()
 
     if close.empty:
         return f"No valid close prices for {ticker}."
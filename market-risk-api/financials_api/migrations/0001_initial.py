@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-17 00:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PairScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('universe', models.JSONField(default=list)),
+                ('min_correlation', models.FloatField()),
+                ('pairs_tested', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PairScanResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('symbol_a', models.CharField(max_length=16)),
+                ('symbol_b', models.CharField(max_length=16)),
+                ('correlation', models.FloatField()),
+                ('p_value', models.FloatField()),
+                ('test_statistic', models.FloatField()),
+                ('hedge_ratio', models.FloatField()),
+                ('observations', models.PositiveIntegerField()),
+                ('scan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='financials_api.pairscan')),
+            ],
+            options={
+                'ordering': ['scan', 'rank'],
+                'indexes': [models.Index(fields=['scan', 'rank'], name='financials__scan_id_2f1069_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,39 @@
 from django.db import models
 
-# Create your models here.
+
+class PairScan(models.Model):
+    """One run of the universe-wide cointegration scanner."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    universe = models.JSONField(default=list)
+    min_correlation = models.FloatField()
+    pairs_tested = models.PositiveIntegerField(default=0)  # passed the correlation filter and were tested
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Pair scan {self.pk} ({self.start_date} to {self.end_date}, {len(self.universe)} tickers)"
+
+
+class PairScanResult(models.Model):
+    """A cointegration-tested pair from a PairScan, ranked by p-value."""
+
+    scan = models.ForeignKey(PairScan, on_delete=models.CASCADE, related_name="results")
+    rank = models.PositiveIntegerField()
+    symbol_a = models.CharField(max_length=16)
+    symbol_b = models.CharField(max_length=16)
+    correlation = models.FloatField()
+    p_value = models.FloatField()
+    test_statistic = models.FloatField()
+    hedge_ratio = models.FloatField()
+    observations = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["scan", "rank"]
+        indexes = [models.Index(fields=["scan", "rank"])]
+
+    def __str__(self):
+        return f"{self.symbol_a}/{self.symbol_b} p={self.p_value:.4f}"
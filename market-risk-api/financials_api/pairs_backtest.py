@@ -0,0 +1,269 @@
+# pairs_backtest.py
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .rolling_stats import fill_bands, rolling_bands
+
+
+@dataclass
+class BacktestResult:
+    """
+    Array form of a mean-reversion pairs backtest.
+
+    stats (rolling_stats.ROLLING_DTYPE: spread, mean, std, z-score and the
+    entry/exit bands) is aligned with `index`; spread / rolling_mean /
+    rolling_std / zscore are views of its columns.
+    positions / daily_pnl / cumulative are aligned with `index[1:]`
+    (the first bar has no return to trade on).
+    """
+
+    index: pd.DatetimeIndex
+    stats: np.ndarray
+    positions: np.ndarray
+    daily_pnl: np.ndarray
+    cumulative: np.ndarray
+    trades: int
+
+    @property
+    def spread(self) -> np.ndarray:
+        return self.stats["spread"]
+
+    @property
+    def rolling_mean(self) -> np.ndarray:
+        return self.stats["mean"]
+
+    @property
+    def rolling_std(self) -> np.ndarray:
+        return self.stats["std"]
+
+    @property
+    def zscore(self) -> np.ndarray:
+        return self.stats["zscore"]
+
+    @property
+    def cumulative_return(self) -> float:
+        return float(self.cumulative[-1] - 1) if len(self.cumulative) else 0.0
+
+    @property
+    def latest_zscore(self) -> Optional[float]:
+        return float(self.zscore[-1]) if len(self.zscore) else None
+
+
+def rolling_zscore(spread: pd.Series, rolling_window: int):
+    """
+    Rolling mean, std (zeros as NaN) and z-score of the spread.
+    Missing std values are filled with the mean std so early bars still get a z-score.
+    """
+    stats = rolling_bands(np.asarray(spread, dtype=float), rolling_window, 0.0, 0.0)
+    return stats["mean"], stats["std"], stats["zscore"]
+
+
+def _positions_loop(z: np.ndarray, entry_z: float, exit_z: float):
+    """
+    Reference state machine, used when entry and exit zones overlap
+    (then whether a bar enters or exits depends on the position held).
+    """
+    positions = np.zeros(len(z))
+    position = 0
+    trades = 0
+    for i, value in enumerate(z):
+        if position == 0:
+            if value > entry_z:
+                position = -1
+                trades += 1
+            elif value < -entry_z:
+                position = 1
+                trades += 1
+        elif abs(value) < exit_z:
+            position = 0
+        positions[i] = position
+    return positions, trades
+
+
+def positions_from_zscore(z: np.ndarray, entry_z: float, exit_z: float):
+    """
+    Position per bar (1 = long spread, -1 = short spread, 0 = flat) and trade count.
+
+    Flat -> short when z > entry_z, flat -> long when z < -entry_z, and any
+    position -> flat when |z| < exit_z; NaN z leaves the position unchanged.
+    Exit bars split the series into segments; within a segment the position is
+    the first entry signal, forward-filled.
+    """
+    z = np.asarray(z, dtype=float)
+    n = len(z)
+    if n == 0:
+        return np.zeros(0), 0
+
+    with np.errstate(invalid="ignore"):
+        entries = np.where(z > entry_z, -1.0, np.where(z < -entry_z, 1.0, 0.0))
+        exits = np.abs(z) < exit_z
+
+    if np.any(exits & (entries != 0)):
+        return _positions_loop(z, entry_z, exit_z)
+
+    segment = np.cumsum(exits)
+    entry_idx = np.flatnonzero(entries)
+    if len(entry_idx):
+        # Only the first entry signal after each exit opens a position.
+        first = np.ones(len(entry_idx), dtype=bool)
+        first[1:] = segment[entry_idx[1:]] != segment[entry_idx[:-1]]
+        opens = entry_idx[first]
+    else:
+        opens = entry_idx
+
+    marks = np.full(n + 1, np.nan)
+    marks[0] = 0.0
+    marks[np.flatnonzero(exits) + 1] = 0.0
+    marks[opens + 1] = entries[opens]
+
+    last = np.where(np.isnan(marks), 0, np.arange(n + 1))
+    np.maximum.accumulate(last, out=last)
+    return marks[last][1:], int(len(opens))
+
+
+def run_backtest(series_a: pd.Series, series_b: pd.Series, beta: float, entry_z: float, exit_z: float, rolling_window: int) -> BacktestResult:
+    """
+    Backtest long/short-spread positions on spread = A - beta * B.
+    Daily PnL is position * (ret_a - beta * ret_b), compounded with cumprod.
+    """
+    spread = series_a - beta * series_b
+    # One pass for the rolling mean/std, z-score and bands (see rolling_stats.py)
+    stats = rolling_bands(spread.to_numpy(), rolling_window, entry_z, exit_z)
+    zscore = stats["zscore"]
+
+    returns_a = series_a.pct_change().fillna(0.0).to_numpy()[1:]
+    returns_b = series_b.pct_change().fillna(0.0).to_numpy()[1:]
+
+    positions, trades = positions_from_zscore(zscore[1:], entry_z, exit_z)
+    daily_pnl = positions * (returns_a - beta * returns_b)
+    cumulative = np.cumprod(1 + daily_pnl)
+
+    return BacktestResult(
+        index=spread.index,
+        stats=stats,
+        positions=positions,
+        daily_pnl=daily_pnl,
+        cumulative=cumulative,
+        trades=trades,
+    )
+
+
+def sharpe_ratio(daily_pnl: np.ndarray, periods_per_year: int = 252) -> Optional[float]:
+    """Annualized Sharpe ratio of daily PnL (zero risk-free rate); None when undefined."""
+    if len(daily_pnl) < 2:
+        return None
+    std = float(np.std(daily_pnl, ddof=1))
+    if not np.isfinite(std) or std == 0:
+        return None
+    return float(np.mean(daily_pnl) / std * np.sqrt(periods_per_year))
+
+
+def sweep_grid(
+    series_a: pd.Series,
+    series_b: pd.Series,
+    beta: float,
+    entry_zs: Iterable[float],
+    exit_zs: Iterable[float],
+    rolling_windows: Iterable[int],
+) -> List[dict]:
+    """
+    Evaluate every (entryZ, exitZ, rollingWindow) combination on one aligned pair.
+
+    The spread and returns are computed once, the rolling z-score once per window,
+    and each threshold pair only reruns the vectorized position state machine.
+    """
+    spread = series_a - beta * series_b
+    hedged_returns = (
+        series_a.pct_change().fillna(0.0).to_numpy()[1:]
+        - beta * series_b.pct_change().fillna(0.0).to_numpy()[1:]
+    )
+
+    rows = []
+    for window in rolling_windows:
+        _, _, zscore = rolling_zscore(spread, int(window))
+        z = zscore[1:]
+        for entry_z in entry_zs:
+            for exit_z in exit_zs:
+                positions, trades = positions_from_zscore(z, entry_z, exit_z)
+                daily_pnl = positions * hedged_returns
+                cumulative = np.cumprod(1 + daily_pnl)
+                rows.append({
+                    "entryZ": float(entry_z),
+                    "exitZ": float(exit_z),
+                    "rollingWindow": int(window),
+                    "trades": trades,
+                    "cumulativeReturn": float(cumulative[-1] - 1) if len(cumulative) else 0.0,
+                    "sharpe": sharpe_ratio(daily_pnl),
+                })
+    return rows
+
+
+# --- column-wise serialization ---------------------------------------------
+
+def _dates(index: pd.DatetimeIndex) -> List[str]:
+    return list(index.strftime("%Y-%m-%d"))
+
+
+def _column(values: np.ndarray, finite_only: bool = False) -> List[Optional[float]]:
+    """
+    Convert an array to JSON-friendly floats, with None for NaN
+    (and for +/-inf when finite_only is set).
+    """
+    values = np.asarray(values, dtype=float)
+    missing = ~np.isfinite(values) if finite_only else np.isnan(values)
+    out = values.astype(object)
+    out[missing] = None
+    return out.tolist()
+
+
+def _records(dates: List[str], columns: Dict[str, List]) -> List[dict]:
+    keys = ["date"] + list(columns)
+    return [dict(zip(keys, row)) for row in zip(dates, *columns.values())]
+
+
+def spread_records(result: BacktestResult, entry_z: float, exit_z: float, tail: int = 300) -> List[dict]:
+    """Spread, rolling mean and entry/exit bands for the last `tail` bars."""
+    # Bands are recomputed on a copy of the tail (the stats hold the backtest's thresholds)
+    rows = fill_bands(result.stats[-tail:].copy(), entry_z, exit_z)
+    return _records(
+        _dates(result.index[-tail:]),
+        {
+            "spread": _column(rows["spread"]),
+            "mean": _column(rows["mean"]),
+            "entryUpper": _column(rows["entry_upper"]),
+            "entryLower": _column(rows["entry_lower"]),
+            "exitUpper": _column(rows["exit_upper"]),
+            "exitLower": _column(rows["exit_lower"]),
+        },
+    )
+
+
+def zscore_records(result: BacktestResult, tail: int = 200) -> List[dict]:
+    """Z-score history (from the second bar on) for the last `tail` bars."""
+    return _records(
+        _dates(result.index[1:][-tail:]),
+        {"z": _column(result.zscore[1:][-tail:], finite_only=True)},
+    )
+
+
+def pnl_records(result: BacktestResult, tail: int = 300) -> List[dict]:
+    """Cumulative return series for the last `tail` bars."""
+    return _records(
+        _dates(result.index[1:][-tail:]),
+        {"cumulativeReturn": (result.cumulative[-tail:] - 1).tolist()},
+    )
+
+
+def price_records(series_a: pd.Series, series_b: pd.Series, tail: int = 300) -> List[dict]:
+    """Aligned prices of both legs for the last `tail` bars."""
+    return _records(
+        _dates(series_a.index[-tail:]),
+        {
+            "priceA": _column(series_a.to_numpy()[-tail:], finite_only=True),
+            "priceB": _column(series_b.to_numpy()[-tail:], finite_only=True),
+        },
+    )
@@ -0,0 +1,507 @@
+# pairs_monitor.py
+
+import abc
+import asyncio
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from django.utils.module_loading import import_string
+
+from .rolling_stats import RollingStats
+
+logger = logging.getLogger(__name__)
+
+# Pairs to watch, e.g. "KO/PEP,XOM/CVX"
+WATCHLIST = os.getenv("PAIRS_MONITOR_WATCHLIST", "")
+# yfinance (polls intraday bars), replay:<path to CSV>, or a dotted path to a BarFeed class
+FEED = os.getenv("PAIRS_MONITOR_FEED", "yfinance")
+WINDOW = int(os.getenv("PAIRS_MONITOR_WINDOW", "60"))
+ENTRY_Z = float(os.getenv("PAIRS_MONITOR_ENTRY_Z", "2.0"))
+EXIT_Z = float(os.getenv("PAIRS_MONITOR_EXIT_Z", "0.5"))
+# Recursive least squares forgetting factor for the hedge ratio (memory of about 1 / (1 - f) bars)
+FORGETTING = float(os.getenv("PAIRS_MONITOR_FORGETTING", "0.999"))
+POLL_SECONDS = float(os.getenv("PAIRS_MONITOR_POLL_SECONDS", "60"))
+BAR_INTERVAL = os.getenv("PAIRS_MONITOR_INTERVAL", "1m")
+# Replay speed-up over the file's timestamps; 0 replays as fast as possible
+REPLAY_SPEED = float(os.getenv("PAIRS_MONITOR_REPLAY_SPEED", "0"))
+RECENT_SIGNALS = 200
+MAX_HISTORY = 4096  # rolling rows kept per pair
+
+
+@dataclass(frozen=True)
+class Bar:
+    """One closed bar. history=True marks catch-up bars: they update state but never signal."""
+
+    symbol: str
+    timestamp: pd.Timestamp
+    price: float
+    history: bool = False
+
+
+class BarFeed(abc.ABC):
+    """
+    Source of bars for the monitor. bars(symbols) yields Bars in time order,
+    with all symbols of one timestamp before the next; stop() ends it and
+    reset() lets it run again.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+
+    @abc.abstractmethod
+    def bars(self, symbols: Sequence[str]) -> Iterator[Bar]:
+        """Yield bars for symbols until the source ends or stop() is called."""
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def reset(self) -> None:
+        self._stop.clear()
+
+    def describe(self) -> str:
+        return type(self).__name__
+
+
+class FileReplayFeed(BarFeed):
+    """
+    Replays bars from a CSV file, either long (timestamp, symbol, price) or
+    wide (timestamp, then one price column per symbol). With speed > 0 the
+    gaps between timestamps are replayed speed times faster; 0 does not wait.
+    """
+
+    def __init__(self, path, speed: float = REPLAY_SPEED):
+        super().__init__()
+        self.path = Path(path)
+        self.speed = speed
+
+    def describe(self) -> str:
+        return f"replay:{self.path}"
+
+    def _load(self, symbols: Set[str]) -> pd.DataFrame:
+        frame = pd.read_csv(self.path)
+        frame.columns = [str(c).strip() for c in frame.columns]
+        lower = {c.lower(): c for c in frame.columns}
+        if {"timestamp", "symbol", "price"} <= set(lower):
+            frame = frame.rename(columns={lower["timestamp"]: "timestamp", lower["symbol"]: "symbol", lower["price"]: "price"})
+            frame = frame[["timestamp", "symbol", "price"]]
+        else:
+            frame = frame.rename(columns={frame.columns[0]: "timestamp"}).melt(
+                id_vars="timestamp", var_name="symbol", value_name="price"
+            )
+        frame["symbol"] = frame["symbol"].astype(str).str.upper().str.strip()
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+        frame = frame[frame["symbol"].isin(symbols)].dropna(subset=["price"])
+        return frame.sort_values("timestamp", kind="stable")
+
+    def bars(self, symbols: Sequence[str]) -> Iterator[Bar]:
+        frame = self._load(set(symbols))
+        previous = None
+        for timestamp, symbol, price in frame.itertuples(index=False):
+            if self._stop.is_set():
+                return
+            if self.speed > 0 and previous is not None and timestamp > previous:
+                if self._stop.wait((timestamp - previous).total_seconds() / self.speed):
+                    return
+            previous = timestamp
+            yield Bar(symbol, timestamp, float(price))
+
+
+class YFinancePollingFeed(BarFeed):
+    """
+    Polls yfinance for intraday bars every poll_seconds. The last bar of each
+    download is still forming, so it is held back until the next poll. The
+    first download is yielded as history, which warms the pairs up.
+    """
+
+    def __init__(self, interval: str = BAR_INTERVAL, poll_seconds: float = POLL_SECONDS, history_period: str = "5d"):
+        super().__init__()
+        self.interval = interval
+        self.poll_seconds = poll_seconds
+        self.history_period = history_period
+
+    def describe(self) -> str:
+        return f"yfinance:{self.interval}"
+
+    def _download(self, symbols: List[str], period: str) -> pd.DataFrame:
+        raw = yf.download(symbols, period=period, interval=self.interval, auto_adjust=True, progress=False)
+        if raw is None or raw.empty:
+            return pd.DataFrame()
+        closes = raw["Close"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(symbols[0])
+        index = pd.DatetimeIndex(closes.index)
+        closes.index = index.tz_convert(None) if index.tz is not None else index
+        return closes.iloc[:-1]  # drop the bar that is still forming
+
+    def bars(self, symbols: Sequence[str]) -> Iterator[Bar]:
+        symbols = list(symbols)
+        last_seen = None
+        while not self._stop.is_set():
+            history = last_seen is None
+            try:
+                closes = self._download(symbols, self.history_period if history else "1d")
+            except Exception as e:
+                logger.warning("Intraday download failed: %s", e)
+                closes = pd.DataFrame()
+            if last_seen is not None and not closes.empty:
+                closes = closes[closes.index > last_seen]
+            for timestamp, row in closes.iterrows():
+                for symbol, price in row.items():
+                    if price == price:
+                        yield Bar(str(symbol), timestamp, float(price), history=history)
+            if not closes.empty:
+                last_seen = closes.index[-1]
+            self._stop.wait(self.poll_seconds)
+
+
+def make_feed(spec: str = FEED) -> BarFeed:
+    """Feed from a spec: "yfinance", "replay:<path>", or a dotted path to a BarFeed subclass."""
+    if spec == "yfinance":
+        return YFinancePollingFeed()
+    if spec.startswith("replay:"):
+        return FileReplayFeed(spec[len("replay:"):])
+    feed = import_string(spec)()
+    if not isinstance(feed, BarFeed):
+        raise ValueError(f"{spec} is not a BarFeed")
+    return feed
+
+
+def parse_watchlist(text: str) -> List[Tuple[str, str]]:
+    """[("KO", "PEP"), ...] from "KO/PEP, XOM/CVX"."""
+    pairs = []
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        legs = [leg.strip().upper() for leg in item.split("/")]
+        if len(legs) != 2 or not all(legs) or legs[0] == legs[1]:
+            raise ValueError(f"Invalid pair '{item.strip()}'; use SYMBOL_A/SYMBOL_B.")
+        pairs.append((legs[0], legs[1]))
+    return pairs
+
+
+class RecursiveHedgeRatio:
+    """
+    Hedge ratio fitted by recursive least squares on A = alpha + beta * B:
+    an exponentially weighted version of the pairs view's polyfit, updated in
+    O(1) per bar. forgetting < 1 discounts old bars so beta can drift.
+    """
+
+    def __init__(self, forgetting: float = FORGETTING, initial_variance: float = 1e4):
+        self.forgetting = forgetting
+        self.coef = np.zeros(2)  # (beta, alpha)
+        self.cov = np.eye(2) * initial_variance
+        self.count = 0
+
+    @property
+    def beta(self) -> float:
+        return float(self.coef[0])
+
+    @property
+    def alpha(self) -> float:
+        return float(self.coef[1])
+
+    def update(self, price_a: float, price_b: float) -> float:
+        """Fold in one bar; returns the prediction error A - (alpha + beta * B) before the update."""
+        x = np.array([price_b, 1.0])
+        px = self.cov @ x
+        gain = px / (self.forgetting + x @ px)
+        error = price_a - x @ self.coef
+        self.coef += gain * error
+        self.cov = (self.cov - np.outer(gain, px)) / self.forgetting
+        self.count += 1
+        return float(error)
+
+
+class PairMonitor:
+    """
+    Live state of one pair. Each bar where both legs have a price updates the
+    hedge ratio (RecursiveHedgeRatio) and the spread's rolling z-score
+    (RollingStats), both in O(1), and runs the backtest's state machine:
+    flat -> short when z > entry_z, flat -> long when z < -entry_z, and back
+    to flat when |z| < exit_z. The spread is A - beta * B with beta as fitted
+    before the bar. The first `window` bars only fit the hedge ratio and the
+    next `window` only fill the rolling window; signals start after that.
+    """
+
+    def __init__(self, symbol_a: str, symbol_b: str, window: int = WINDOW, entry_z: float = ENTRY_Z, exit_z: float = EXIT_Z, forgetting: float = FORGETTING):
+        self.symbol_a = symbol_a
+        self.symbol_b = symbol_b
+        self.name = f"{symbol_a}/{symbol_b}"
+        self.window = window
+        self.entry_z = entry_z
+        self.exit_z = exit_z
+        self.hedge = RecursiveHedgeRatio(forgetting)
+        self.rolling = RollingStats(window, entry_z, exit_z, min_periods=window, max_history=MAX_HISTORY)
+        self.position = 0  # 1 = long spread, -1 = short spread
+        self.bars = 0
+        self.signals = 0
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        self._last: Dict[str, Tuple[pd.Timestamp, float]] = {}
+
+    @property
+    def warm(self) -> bool:
+        return self.bars >= 2 * self.window
+
+    def on_bar(self, bar: Bar) -> Optional[dict]:
+        """Record a bar for either leg; updates once both legs have a bar for its timestamp."""
+        self._last[bar.symbol] = (bar.timestamp, bar.price)
+        leg_a, leg_b = self._last.get(self.symbol_a), self._last.get(self.symbol_b)
+        if leg_a is None or leg_b is None or leg_a[0] != leg_b[0] or leg_a[0] == self.last_timestamp:
+            return None
+        signal = self.update(bar.timestamp, leg_a[1], leg_b[1])
+        return None if bar.history else signal
+
+    def update(self, timestamp: pd.Timestamp, price_a: float, price_b: float) -> Optional[dict]:
+        self.last_timestamp = timestamp
+        self.bars += 1
+        beta = self.hedge.beta
+        if self.hedge.count >= self.window:
+            self.rolling.append(price_a - beta * price_b)
+        self.hedge.update(price_a, price_b)
+        if not self.warm:
+            return None
+
+        z = float(self.rolling.latest["zscore"])
+        if z != z:
+            return None
+        if self.position == 0:
+            if z > self.entry_z:
+                return self._signal("entry", -1, z)
+            if z < -self.entry_z:
+                return self._signal("entry", 1, z)
+        elif abs(z) < self.exit_z:
+            return self._signal("exit", 0, z)
+        return None
+
+    def _signal(self, kind: str, position: int, z: float) -> dict:
+        side = position if kind == "entry" else self.position
+        self.position = position
+        self.signals += 1
+        latest = self.rolling.latest
+        return {
+            "pair": self.name,
+            "symbolA": self.symbol_a,
+            "symbolB": self.symbol_b,
+            "signal": kind,
+            "side": "long_spread" if side == 1 else "short_spread",
+            "timestamp": self.last_timestamp.isoformat(),
+            "zscore": z,
+            "spread": float(latest["spread"]),
+            "hedgeRatio": self.hedge.beta,
+        }
+
+    def snapshot(self) -> dict:
+        latest = self.rolling.latest
+
+        def num(name):
+            value = float(latest[name]) if latest is not None else np.nan
+            return value if np.isfinite(value) else None
+
+        return {
+            "pair": self.name,
+            "symbolA": self.symbol_a,
+            "symbolB": self.symbol_b,
+            "warm": self.warm,
+            "bars": self.bars,
+            "lastTimestamp": self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            "hedgeRatio": self.hedge.beta if self.hedge.count else None,
+            "spread": num("spread"),
+            "zscore": num("zscore"),
+            "position": {1: "long_spread", -1: "short_spread"}.get(self.position, "flat"),
+            "signals": self.signals,
+        }
+
+
+class Subscription:
+    """
+    Bounded event queue for one subscriber: an asyncio.Queue fed through its
+    event loop when loop is given, otherwise a queue.Queue. When a slow
+    subscriber's queue is full, its oldest event is dropped.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None, maxsize: int = 1000):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize) if loop is not None else queue.Queue(maxsize)
+        self.dropped = 0
+
+    def put(self, event: dict) -> bool:
+        """Called from the monitor thread; False once the subscriber's loop is closed."""
+        if self.loop is None:
+            self._put_nowait(event)
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._put_nowait, event)
+            return True
+        except RuntimeError:
+            return False
+
+    def _put_nowait(self, event: dict) -> None:
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except (queue.Full, asyncio.QueueFull):
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except (queue.Empty, asyncio.QueueEmpty):
+                    pass
+
+
+class SignalBroadcaster:
+    """Fans monitor events out to subscribers and keeps the most recent ones."""
+
+    def __init__(self, recent: int = RECENT_SIGNALS):
+        self.recent: deque = deque(maxlen=recent)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        subscription = Subscription(loop)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: dict) -> None:
+        with self._lock:
+            self.recent.append(event)
+            subscribers = list(self._subscribers)
+        closed = [s for s in subscribers if not s.put(event)]
+        if closed:
+            with self._lock:
+                self._subscribers.difference_update(closed)
+
+
+class PairsMonitor:
+    """
+    Long-running monitor for a watchlist of pairs. One background thread
+    reads bars from the feed and hands each to the pairs that contain its
+    symbol; entry/exit crossings are published to the broadcaster.
+    """
+
+    def __init__(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        feed: BarFeed,
+        window: int = WINDOW,
+        entry_z: float = ENTRY_Z,
+        exit_z: float = EXIT_Z,
+        forgetting: float = FORGETTING,
+        broadcaster: Optional[SignalBroadcaster] = None,
+    ):
+        self.pairs: Dict[str, PairMonitor] = {}
+        self._by_symbol: Dict[str, List[PairMonitor]] = {}
+        for a, b in pairs:
+            pair = PairMonitor(a, b, window, entry_z, exit_z, forgetting)
+            if pair.name in self.pairs:
+                continue
+            self.pairs[pair.name] = pair
+            for symbol in (a, b):
+                self._by_symbol.setdefault(symbol, []).append(pair)
+        self.feed = feed
+        self.broadcaster = broadcaster or SignalBroadcaster()
+        self.bars_processed = 0
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(self._by_symbol)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def process(self, bar: Bar) -> List[dict]:
+        """Apply one bar; returns (and publishes) the signals it triggered."""
+        signals = []
+        with self._lock:
+            self.bars_processed += 1
+            for pair in self._by_symbol.get(bar.symbol, ()):
+                signal = pair.on_bar(bar)
+                if signal is not None:
+                    signals.append(signal)
+        for signal in signals:
+            self.broadcaster.publish(signal)
+        return signals
+
+    def run(self, on_signal: Optional[Callable[[dict], None]] = None) -> None:
+        """Consume the feed in the calling thread until it ends or stop() is called."""
+        for bar in self.feed.bars(self.symbols):
+            for signal in self.process(bar):
+                if on_signal is not None:
+                    on_signal(signal)
+
+    def _run(self) -> None:
+        try:
+            self.run()
+        except Exception as e:
+            self.error = str(e)
+            logger.exception("Pairs monitor feed failed")
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self.error = None
+            self.feed.reset()  # a previous stop() would end the new run at once
+            self._thread = threading.Thread(target=self._run, name="pairs-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self.feed.stop()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pairs = [pair.snapshot() for pair in self.pairs.values()]
+            bars = self.bars_processed
+        return {
+            "running": self.running,
+            "feed": self.feed.describe(),
+            "error": self.error,
+            "barsProcessed": bars,
+            "subscribers": self.broadcaster.subscribers,
+            "pairs": pairs,
+            "recentSignals": list(self.broadcaster.recent),
+        }
+
+
+_monitor: Optional[PairsMonitor] = None
+_monitor_guard = threading.Lock()
+
+
+def get_pairs_monitor() -> Optional[PairsMonitor]:
+    """
+    Process-wide monitor for PAIRS_MONITOR_WATCHLIST on PAIRS_MONITOR_FEED,
+    started on first use; None when no watchlist is configured.
+    """
+    global _monitor
+    with _monitor_guard:
+        if _monitor is None:
+            pairs = parse_watchlist(WATCHLIST)
+            if not pairs:
+                return None
+            _monitor = PairsMonitor(pairs, make_feed(FEED))
+            _monitor.start()
+        return _monitor
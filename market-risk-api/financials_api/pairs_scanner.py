@@ -0,0 +1,152 @@
+# pairs_scanner.py
+
+import logging
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from statsmodels.tsa.stattools import coint
+except Exception:
+    coint = None
+
+from .price_store import get_price_store
+
+logger = logging.getLogger(__name__)
+
+MIN_OBSERVATIONS = 30
+# Tickers with prices on fewer than this share of the universe's dates are left
+# out, so one late-listed or gappy ticker cannot shorten every pair's sample
+MIN_COVERAGE = 0.9
+
+# Set in each pool worker by _init_worker so tasks only ship (i, j) index pairs.
+_worker_prices: Optional[np.ndarray] = None
+_worker_log_prices: Optional[np.ndarray] = None
+
+
+def load_price_matrix(tickers: Iterable[str], start, end, store=None, min_coverage: float = MIN_COVERAGE) -> pd.DataFrame:
+    """
+    Adjusted closes for the universe as one date x ticker frame.
+    Tickers priced on less than min_coverage of the dates are dropped first;
+    then only dates where every remaining ticker has a positive price are kept.
+    """
+    store = store or get_price_store()
+    prices = store.get_many(tickers, start, end, field="Adj Close")
+    if prices.empty:
+        return prices
+    prices = prices.where(prices > 0)
+    coverage = prices.notna().mean()
+    sparse = coverage.index[coverage < min_coverage]
+    if len(sparse):
+        logger.warning(
+            "Pair scan: leaving out %d ticker(s) with prices on under %.0f%% of dates: %s",
+            len(sparse), 100 * min_coverage, ", ".join(map(str, sparse)),
+        )
+    return prices.drop(columns=sparse).dropna(axis=0, how="any")
+
+
+def correlated_pairs(log_prices: np.ndarray, min_correlation: float) -> List[Tuple[int, int, float]]:
+    """
+    Cheap pre-filter: (i, j, corr) for every column pair with |corr| >= min_correlation,
+    from one correlation matrix over the log-price columns.
+    """
+    if log_prices.shape[1] < 2:
+        return []
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.corrcoef(log_prices, rowvar=False)
+    rows, cols = np.triu_indices_from(corr, k=1)
+    values = corr[rows, cols]
+    keep = np.abs(np.nan_to_num(values)) >= min_correlation
+    return list(zip(rows[keep].tolist(), cols[keep].tolist(), values[keep].tolist()))
+
+
+def _init_worker(prices: np.ndarray, log_prices: np.ndarray) -> None:
+    global _worker_prices, _worker_log_prices
+    _worker_prices = prices
+    _worker_log_prices = log_prices
+
+
+def _test_pair(task: Tuple[int, int]) -> Tuple[int, int, Optional[float], Optional[float], Optional[float]]:
+    """Engle-Granger test (log prices) and hedge ratio A ~ beta * B (prices) for one pair."""
+    i, j = task
+    try:
+        beta, _ = np.polyfit(_worker_prices[:, j], _worker_prices[:, i], 1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # CollinearityWarning on near-identical series
+            test_stat, p_value, _ = coint(_worker_log_prices[:, i], _worker_log_prices[:, j], trend="c")
+    except Exception:
+        return i, j, None, None, None
+    # Degenerate (perfectly collinear) pairs give an infinite statistic; leave them out.
+    if not np.isfinite([test_stat, p_value, beta]).all():
+        return i, j, None, None, None
+    return i, j, float(p_value), float(test_stat), float(beta)
+
+
+def scan_universe(
+    tickers: Iterable[str],
+    start,
+    end,
+    min_correlation: float = 0.8,
+    max_workers: Optional[int] = None,
+    store=None,
+    min_coverage: float = MIN_COVERAGE,
+) -> pd.DataFrame:
+    """
+    Screen every pair in the universe for cointegration.
+
+    Prices are loaded once into an aligned matrix, pairs are pre-filtered by
+    log-price correlation, and the surviving Engle-Granger tests run across a
+    process pool. Returns one row per pair with a valid test result, ranked
+    by p-value; table.attrs["pairsTested"] is the number of pairs that passed
+    the correlation filter and were tested.
+    """
+    if coint is None:
+        raise RuntimeError("statsmodels is required for the cointegration scan.")
+
+    prices = load_price_matrix(tickers, start, end, store=store, min_coverage=min_coverage)
+    columns = ["symbolA", "symbolB", "correlation", "pValue", "testStatistic", "hedgeRatio", "observations", "rank"]
+    empty = pd.DataFrame(columns=columns)
+    empty.attrs["pairsTested"] = 0
+    if prices.shape[0] < MIN_OBSERVATIONS or prices.shape[1] < 2:
+        return empty
+
+    symbols = list(prices.columns)
+    values = np.ascontiguousarray(prices.to_numpy(dtype=float))
+    log_values = np.log(values)
+
+    candidates = correlated_pairs(log_values, min_correlation)
+    if not candidates:
+        return empty
+
+    tasks = [(i, j) for i, j, _ in candidates]
+    workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1:
+        _init_worker(values, log_values)
+        results = list(map(_test_pair, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(values, log_values)) as pool:
+            results = list(pool.map(_test_pair, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    correlations = {(i, j): c for i, j, c in candidates}
+    rows = [
+        {
+            "symbolA": symbols[i],
+            "symbolB": symbols[j],
+            "correlation": correlations[(i, j)],
+            "pValue": p_value,
+            "testStatistic": test_stat,
+            "hedgeRatio": beta,
+            "observations": len(values),
+        }
+        for i, j, p_value, test_stat, beta in results
+        if p_value is not None
+    ]
+    table = pd.DataFrame(rows, columns=columns[:-1])
+    table = table.sort_values(["pValue", "testStatistic"]).reset_index(drop=True)
+    table["rank"] = np.arange(1, len(table) + 1)
+    table.attrs["pairsTested"] = len(tasks)
+    return table
@@ -0,0 +1,257 @@
+# pairs_walkforward.py
+
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from statsmodels.tsa.stattools import coint
+except Exception:
+    coint = None
+
+from .pairs_backtest import positions_from_zscore, sharpe_ratio
+from .rolling_stats import rolling_bands
+
+logger = logging.getLogger(__name__)
+
+# Fold workers; 1 runs every fold in the calling process
+WORKERS = int(os.getenv("WALKFORWARD_WORKERS", str(os.cpu_count() or 1)))
+# Below this many folds the pool's dispatch overhead outweighs the parallelism
+MIN_PARALLEL_FOLDS = int(os.getenv("WALKFORWARD_MIN_PARALLEL_FOLDS", "8"))
+# Where the shared price arrays are written; RAM-backed /dev/shm when available
+SHARED_DIR = os.getenv("WALKFORWARD_SHARED_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+MIN_TRAIN_SIZE = 30
+
+# Per worker process: recently opened price arrays, keyed by file path
+_worker_arrays: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_WORKER_CACHE_SIZE = 4
+
+
+@dataclass
+class WalkForwardResult:
+    """
+    Out-of-sample walk-forward backtest. folds holds one summary per fold;
+    index / positions / daily_pnl / cumulative cover the test windows
+    stitched together in order.
+    """
+
+    folds: List[dict]
+    index: pd.DatetimeIndex
+    positions: np.ndarray
+    daily_pnl: np.ndarray
+    cumulative: np.ndarray
+    trades: int
+
+    @property
+    def cumulative_return(self) -> float:
+        return float(self.cumulative[-1] - 1) if len(self.cumulative) else 0.0
+
+
+def make_folds(n: int, train_size: int, test_size: int, anchored: bool = False) -> List[Tuple[int, int, int]]:
+    """
+    (train_start, train_end, test_end) index bounds for each fold; the test
+    window is [train_end, test_end). Rolling windows keep train_size bars,
+    anchored ones grow from bar 0. Consecutive test windows do not overlap.
+    """
+    folds = []
+    train_end = train_size
+    while train_end < n:
+        test_end = min(train_end + test_size, n)
+        folds.append((0 if anchored else train_end - train_size, train_end, test_end))
+        train_end = test_end
+    return folds
+
+
+def run_fold(
+    prices: np.ndarray,
+    train_start: int,
+    train_end: int,
+    test_end: int,
+    entry_z: float,
+    exit_z: float,
+    rolling_window: int,
+    rerun_coint: bool = True,
+    max_p_value: float = 0.05,
+) -> dict:
+    """
+    One fold over a (2, n) array of aligned prices (A, B): fit the hedge ratio
+    (and, with rerun_coint, the Engle-Granger test on log prices) on the
+    training bars, then trade the test bars with run_backtest's rules. The
+    rolling z-score is warmed up on the last rolling_window training bars, and
+    each fold starts flat. A fold whose p-value is above max_p_value is not traded.
+    """
+    train_a = prices[0, train_start:train_end]
+    train_b = prices[1, train_start:train_end]
+    beta, _ = np.polyfit(train_b, train_a, 1)
+
+    p_value = None
+    if rerun_coint and coint is not None:
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                _, p_value, _ = coint(np.log(train_a), np.log(train_b), trend="c")
+            p_value = float(p_value)
+        except Exception:
+            p_value = None
+    traded = not rerun_coint or coint is None or (p_value is not None and p_value <= max_p_value)
+
+    test_len = test_end - train_end
+    positions, trades = np.zeros(test_len), 0
+    if traded:
+        warmup = min(rolling_window, train_end)
+        spread = prices[0, train_end - warmup:test_end] - beta * prices[1, train_end - warmup:test_end]
+        zscore = rolling_bands(spread, rolling_window, entry_z, exit_z)["zscore"][warmup:]
+        positions, trades = positions_from_zscore(zscore, entry_z, exit_z)
+
+    # Same convention as run_backtest: the position at bar i earns the return into bar i
+    returns = prices[:, train_end:test_end] / prices[:, train_end - 1:test_end - 1] - 1
+    daily_pnl = positions * (returns[0] - beta * returns[1])
+    return {
+        "beta": float(beta),
+        "p_value": p_value,
+        "traded": traded,
+        "trades": int(trades),
+        "positions": positions,
+        "daily_pnl": daily_pnl,
+    }
+
+
+def _worker_prices(path: str) -> np.ndarray:
+    prices = _worker_arrays.get(path)
+    if prices is None:
+        prices = _worker_arrays[path] = np.load(path, mmap_mode="r")
+        while len(_worker_arrays) > _WORKER_CACHE_SIZE:
+            _worker_arrays.popitem(last=False)
+    else:
+        _worker_arrays.move_to_end(path)
+    return prices
+
+
+def _run_fold_task(task) -> dict:
+    path, bounds, kwargs = task
+    return run_fold(_worker_prices(path), *bounds, **kwargs)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_guard = threading.Lock()
+
+
+def get_walkforward_pool() -> ProcessPoolExecutor:
+    """
+    Process-wide pool for fold tasks, created on first use. Workers are
+    spawned rather than forked, since the server process has threads running.
+    """
+    global _pool
+    with _pool_guard:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, WORKERS), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _run_parallel(prices: np.ndarray, folds, kwargs: dict) -> List[dict]:
+    """
+    Fold tasks only carry their bounds and the path of one .npy file holding
+    the price array; workers memory-map it, so all of them read the same
+    pages instead of each receiving a copy. If a worker died, the pool is
+    replaced for the next call and this one runs in-process.
+    """
+    global _pool
+    path = Path(SHARED_DIR or tempfile.gettempdir()) / f"walkforward-{uuid.uuid4().hex}.npy"
+    np.save(path, prices)
+    try:
+        pool = get_walkforward_pool()
+        tasks = [(str(path), bounds, kwargs) for bounds in folds]
+        chunksize = max(1, len(tasks) // (max(1, WORKERS) * 4))
+        return list(pool.map(_run_fold_task, tasks, chunksize=chunksize))
+    except BrokenProcessPool as e:
+        logger.warning("Walk-forward pool failed (%s); running folds in-process.", e)
+        with _pool_guard:
+            if _pool is pool:
+                _pool = None
+        return [run_fold(prices, *bounds, **kwargs) for bounds in folds]
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def walk_forward(
+    series_a: pd.Series,
+    series_b: pd.Series,
+    train_size: int,
+    test_size: int,
+    entry_z: float,
+    exit_z: float,
+    rolling_window: int,
+    anchored: bool = False,
+    rerun_coint: bool = True,
+    max_p_value: float = 0.05,
+    max_workers: Optional[int] = None,
+) -> WalkForwardResult:
+    """
+    Rolling-origin backtest: refit on each training window and trade only the
+    following test window, so every PnL bar is out of sample. Folds are
+    independent and run across the process pool when there are enough of them;
+    max_workers=1 (or WALKFORWARD_WORKERS=1) keeps them in the calling process.
+    """
+    if train_size < MIN_TRAIN_SIZE:
+        raise ValueError(f"train_size must be at least {MIN_TRAIN_SIZE} bars.")
+    if test_size < 1:
+        raise ValueError("test_size must be at least 1 bar.")
+
+    prices = np.ascontiguousarray(np.vstack([series_a.to_numpy(dtype=float), series_b.to_numpy(dtype=float)]))
+    folds = make_folds(prices.shape[1], train_size, test_size, anchored)
+    kwargs = {
+        "entry_z": entry_z,
+        "exit_z": exit_z,
+        "rolling_window": rolling_window,
+        "rerun_coint": rerun_coint,
+        "max_p_value": max_p_value,
+    }
+
+    workers = WORKERS if max_workers is None else max_workers
+    if workers > 1 and len(folds) >= MIN_PARALLEL_FOLDS:
+        results = _run_parallel(prices, folds, kwargs)
+    else:
+        results = [run_fold(prices, *bounds, **kwargs) for bounds in folds]
+
+    index = series_a.index
+    summaries = []
+    for number, ((train_start, train_end, test_end), fold) in enumerate(zip(folds, results), start=1):
+        cumulative = np.cumprod(1 + fold["daily_pnl"])
+        summaries.append({
+            "fold": number,
+            "trainStart": index[train_start],
+            "trainEnd": index[train_end - 1],
+            "testStart": index[train_end],
+            "testEnd": index[test_end - 1],
+            "hedgeRatio": fold["beta"],
+            "cointegrationPValue": fold["p_value"],
+            "traded": fold["traded"],
+            "trades": fold["trades"],
+            "cumulativeReturn": float(cumulative[-1] - 1),
+            "sharpe": sharpe_ratio(fold["daily_pnl"]),
+        })
+
+    daily_pnl = np.concatenate([f["daily_pnl"] for f in results]) if results else np.zeros(0)
+    return WalkForwardResult(
+        folds=summaries,
+        index=index[folds[0][1]:folds[-1][2]] if folds else index[:0],
+        positions=np.concatenate([f["positions"] for f in results]) if results else np.zeros(0),
+        daily_pnl=daily_pnl,
+        cumulative=np.cumprod(1 + daily_pnl),
+        trades=sum(f["trades"] for f in results),
+    )
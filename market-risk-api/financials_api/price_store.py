@@ -0,0 +1,336 @@
+# price_store.py
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+warnings.filterwarnings("ignore", category=FutureWarning, module="yfinance")
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_STORE_DIR = Path(os.getenv("PRICE_STORE_DIR", BASE_DIR / "price_store"))
+
+# How long the (still changing) bar for the current session is served before it is refetched.
+LIVE_REFRESH_SECONDS = int(os.getenv("PRICE_STORE_REFRESH_SECONDS", "900"))
+
+COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+RECORD_DTYPE = np.dtype(
+    [("date", "M8[D]")] + [(col, "f8") for col in COLUMNS]
+)
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def period_to_range(period: str, today: Optional[pd.Timestamp] = None) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Translate a yfinance-style period ("6mo", "1y", "5d", "ytd") into a
+    [start, end) date range that ends after today's session.
+    """
+    today = today if today is not None else pd.Timestamp.today().normalize()
+    end = today + pd.Timedelta(days=1)
+    period = (period or "").strip().lower()
+    if period == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1), end
+
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period '{period}'.")
+    n, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        "d": pd.DateOffset(days=n),
+        "wk": pd.DateOffset(weeks=n),
+        "mo": pd.DateOffset(months=n),
+        "y": pd.DateOffset(years=n),
+    }
+    return today - offsets[unit], end
+
+
+def _normalize_download(raw: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Split a yf.download() result into one OHLCV frame per ticker.
+    Handles both flat and (Price, Ticker) MultiIndex column layouts.
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    if raw is None or raw.empty:
+        return frames
+
+    for ticker in tickers:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if ticker not in raw.columns.get_level_values(-1):
+                continue
+            frame = raw.xs(ticker, axis=1, level=-1)
+        else:
+            frame = raw
+        frame = frame.reindex(columns=COLUMNS).dropna(how="all")
+        if frame.empty:
+            continue
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        frame.index = index.normalize()
+        frames[ticker] = frame[~frame.index.duplicated(keep="last")]
+    return frames
+
+
+def download_prices(tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, pd.DataFrame]:
+    """
+    Default network fetcher: one yf.download() call for all tickers over [start, end).
+    """
+    raw = yf.download(
+        tickers,
+        start=start,
+        end=end,
+        interval="1d",
+        auto_adjust=False,  # keep Adj Close
+        actions=False,
+        progress=False,
+    )
+    return _normalize_download(raw, tickers)
+
+
+class PriceStore:
+    """
+    On-disk daily OHLCV store backed by one memory-mapped .npy file per ticker.
+
+    Each ticker keeps a contiguous covered date range in a small JSON sidecar.
+    Requests are served from disk and only the dates outside that range are
+    downloaded. Bars before the day of the last fetch are treated as final;
+    the current session's bar is refetched once it is older than
+    LIVE_REFRESH_SECONDS.
+    """
+
+    def __init__(
+        self,
+        root: Path | str = DEFAULT_STORE_DIR,
+        fetcher=download_prices,
+        refresh_seconds: int = LIVE_REFRESH_SECONDS,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._fetcher = fetcher
+        self.refresh_seconds = refresh_seconds
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # --- file layout -------------------------------------------------------
+
+    def _key(self, ticker: str) -> str:
+        return ticker.upper().strip().replace("/", "_")
+
+    def _data_path(self, ticker: str) -> Path:
+        return self.root / f"{self._key(ticker)}.npy"
+
+    def _meta_path(self, ticker: str) -> Path:
+        return self.root / f"{self._key(ticker)}.json"
+
+    def _lock(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(self._key(ticker), threading.Lock())
+
+    def _read_meta(self, ticker: str) -> Optional[dict]:
+        try:
+            with open(self._meta_path(ticker), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _read_records(self, ticker: str) -> np.ndarray:
+        try:
+            return np.load(self._data_path(ticker), mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+    def _write(self, ticker: str, records: np.ndarray, meta: dict) -> None:
+        # Write to temp files and swap in, so readers never see a half-written file.
+        data_tmp = self._data_path(ticker).with_suffix(f".npy.{os.getpid()}.tmp")
+        meta_tmp = self._meta_path(ticker).with_suffix(f".json.{os.getpid()}.tmp")
+        with open(data_tmp, "wb") as f:
+            np.save(f, records)
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(data_tmp, self._data_path(ticker))
+        os.replace(meta_tmp, self._meta_path(ticker))
+
+    # --- record <-> frame --------------------------------------------------
+
+    @staticmethod
+    def _frame_to_records(frame: pd.DataFrame) -> np.ndarray:
+        records = np.empty(len(frame), dtype=RECORD_DTYPE)
+        records["date"] = frame.index.values.astype("M8[D]")
+        for col in COLUMNS:
+            records[col] = frame[col].to_numpy(dtype="f8", na_value=np.nan)
+        return records
+
+    @staticmethod
+    def _records_to_frame(records: np.ndarray) -> pd.DataFrame:
+        index = pd.DatetimeIndex(records["date"].astype("M8[ns]"), name="Date")
+        return pd.DataFrame({col: np.asarray(records[col]) for col in COLUMNS}, index=index)
+
+    @staticmethod
+    def _merge(existing: np.ndarray, new: np.ndarray) -> np.ndarray:
+        if len(existing) == 0:
+            return np.sort(new, order="date")
+        # New rows win on overlapping dates (e.g. a refreshed live bar).
+        keep = ~np.isin(existing["date"], new["date"])
+        merged = np.concatenate([np.asarray(existing[keep]), new])
+        return np.sort(merged, order="date")
+
+    # --- coverage ----------------------------------------------------------
+
+    def _missing_ranges(self, meta: Optional[dict], start: pd.Timestamp, end: pd.Timestamp, today: pd.Timestamp):
+        """
+        Return (ranges_to_fetch, live_only) for a request over [start, end).
+        live_only is True when the only gap is a stale refresh of the current session.
+        """
+        if meta is None:
+            return [(start, end)], False
+
+        cov_start = pd.Timestamp(meta["start"])
+        settled_end = pd.Timestamp(meta["settled_end"])
+        cov_end = pd.Timestamp(meta["end"])
+
+        ranges = []
+        if start < cov_start:
+            ranges.append((start, cov_start))
+
+        live_only = False
+        if end > cov_end:
+            ranges.append((min(settled_end, cov_end), end))
+        elif end > settled_end:
+            stale = (time.time() - meta.get("fetched_at", 0)) > self.refresh_seconds
+            if stale or settled_end < today:
+                ranges.append((settled_end, end))
+                live_only = not ranges[:-1]
+        return ranges, live_only
+
+    def _update_many(self, tickers: List[str], start: pd.Timestamp, end: pd.Timestamp, today: pd.Timestamp) -> None:
+        """
+        Fetch whatever each ticker is missing for [start, end), batching tickers
+        that share the same missing range into one download.
+        """
+        plans: Dict[Tuple[pd.Timestamp, pd.Timestamp], List[str]] = {}
+        live_only: Dict[str, bool] = {}
+        metas: Dict[str, Optional[dict]] = {}
+        for ticker in tickers:
+            meta = self._read_meta(ticker)
+            metas[ticker] = meta
+            ranges, live = self._missing_ranges(meta, start, end, today)
+            live_only[ticker] = live
+            for rng in ranges:
+                plans.setdefault(rng, []).append(ticker)
+
+        for (fetch_start, fetch_end), group in plans.items():
+            try:
+                frames = self._fetcher(group, fetch_start, fetch_end)
+            except Exception as e:
+                # Serve a slightly stale live bar rather than fail on a refresh.
+                if all(live_only[t] for t in group):
+                    logger.warning("Price refresh failed for %s (%s); serving stored data.", group, e)
+                    continue
+                raise
+
+            for ticker in group:
+                frame = frames.get(ticker)
+                # Empty short gaps are weekends/holidays; empty long gaps are more
+                # likely throttled responses and are left uncovered so they are retried.
+                if frame is None or frame.empty:
+                    if (fetch_end - fetch_start).days > 5:
+                        continue
+                    frame = pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([]))
+                with self._lock(ticker):
+                    self._apply(ticker, frame, fetch_start, fetch_end, today)
+
+    def _apply(self, ticker: str, frame: pd.DataFrame, fetch_start: pd.Timestamp, fetch_end: pd.Timestamp, today: pd.Timestamp) -> None:
+        meta = self._read_meta(ticker)
+        records = self._merge(self._read_records(ticker), self._frame_to_records(frame))
+
+        if meta is None:
+            cov_start, cov_end, settled_end = fetch_start, fetch_end, min(fetch_end, today)
+        else:
+            cov_start = min(pd.Timestamp(meta["start"]), fetch_start)
+            cov_end = max(pd.Timestamp(meta["end"]), fetch_end)
+            settled_end = pd.Timestamp(meta["settled_end"])
+            if fetch_end >= settled_end and fetch_start <= settled_end:
+                settled_end = min(fetch_end, today)
+
+        new_meta = {
+            "start": str(cov_start.date()),
+            "end": str(cov_end.date()),
+            "settled_end": str(settled_end.date()),
+            "fetched_at": time.time() if fetch_end > today else (meta or {}).get("fetched_at", 0),
+        }
+        self._write(ticker, records, new_meta)
+
+    # --- public API --------------------------------------------------------
+
+    def get_history(self, ticker: str, start, end) -> pd.DataFrame:
+        """
+        Return daily OHLCV rows for ticker over [start, end), fetching only missing dates.
+        """
+        ticker = ticker.upper().strip()
+        start, end, today = self._bounds(start, end)
+        self._update_many([ticker], start, end, today)
+        return self._slice(ticker, start, end)
+
+    def get_period(self, ticker: str, period: str = "6mo") -> pd.DataFrame:
+        start, end = period_to_range(period)
+        return self.get_history(ticker, start, end)
+
+    def get_many(self, tickers: Iterable[str], start, end, field: str = "Adj Close") -> pd.DataFrame:
+        """
+        Return one column of `field` per ticker over [start, end).
+        Tickers with no stored or downloadable data are left out of the result.
+        """
+        tickers = list(dict.fromkeys(t.upper().strip() for t in tickers))
+        start, end, today = self._bounds(start, end)
+        self._update_many(tickers, start, end, today)
+
+        columns = {}
+        for ticker in tickers:
+            frame = self._slice(ticker, start, end)
+            if not frame.empty:
+                columns[ticker] = frame[field]
+        if not columns:
+            return pd.DataFrame()
+        return pd.DataFrame(columns).sort_index()
+
+    def _bounds(self, start, end):
+        today = pd.Timestamp.today().normalize()
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end).normalize() if end is not None else today + pd.Timedelta(days=1)
+        return start, end, today
+
+    def _slice(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        records = self._read_records(ticker)
+        if len(records) == 0:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+        dates = records["date"]
+        lo = np.searchsorted(dates, np.datetime64(start.date(), "D"), side="left")
+        hi = np.searchsorted(dates, np.datetime64(end.date(), "D"), side="left")
+        return self._records_to_frame(records[lo:hi])
+
+
+_store: Optional[PriceStore] = None
+_store_guard = threading.Lock()
+
+
+def get_price_store() -> PriceStore:
+    """
+    Process-wide PriceStore shared by the views and the market snapshot helper.
+    """
+    global _store
+    with _store_guard:
+        if _store is None:
+            _store = PriceStore()
+        return _store
@@ -0,0 +1,163 @@
+# prompt_builder.py
+
+import functools
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Set, Tuple
+
+# Whole-prompt budget, in approximate tokens (see count_tokens)
+TOKEN_BUDGET = int(os.getenv("RAG_PROMPT_TOKEN_BUDGET", "900"))
+# Longer answers are compressed to their most relevant sentences
+MAX_PASSAGE_TOKENS = int(os.getenv("RAG_PASSAGE_MAX_TOKENS", "60"))
+# Word-set Jaccard similarity above which two answers count as duplicates
+DEDUP_SIMILARITY = float(os.getenv("RAG_DEDUP_SIMILARITY", "0.8"))
+# A passage is only squeezed into the leftover budget if at least this much is left
+MIN_PASSAGE_TOKENS = 40
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_WORD_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = {
+    "the", "and", "for", "are", "was", "with", "that", "this", "what", "how", "why",
+    "does", "did", "his", "her", "its", "you", "your", "from", "about", "into", "have",
+    "has", "had", "can", "would", "could", "should", "will", "not", "but", "they", "their",
+}
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate LLM token count: words and punctuation marks. Runs locally,
+    unlike Gemini's count_tokens call, and errs on the high side for English.
+    """
+    return len(_TOKEN_RE.findall(text or ""))
+
+
+@functools.lru_cache(maxsize=32)
+def static_token_count(text: str) -> int:
+    """count_tokens() for static text (system instructions, templates), computed once per string."""
+    return count_tokens(text)
+
+
+def _terms(text: str) -> Set[str]:
+    return {w for w in _WORD_RE.findall((text or "").lower()) if len(w) > 2 and w not in _STOPWORDS}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    tokens = list(_TOKEN_RE.finditer(text))
+    if len(tokens) <= max_tokens:
+        return text
+    return text[:tokens[max_tokens - 1].end()].rstrip() + " …"
+
+
+def compress(text: str, question_terms: Set[str], max_tokens: int) -> str:
+    """
+    Extractive compression: keep the sentences sharing the most terms with the
+    question (in their original order) within max_tokens; a single overlong
+    sentence is truncated.
+    """
+    text = (text or "").strip()
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    sentences = [s for s in _SENTENCE_RE.split(text) if s.strip()]
+    by_relevance = sorted(
+        range(len(sentences)),
+        key=lambda i: (-len(_terms(sentences[i]) & question_terms), i),
+    )
+    kept, used = [], 0
+    for i in by_relevance:
+        n = count_tokens(sentences[i])
+        if used + n <= max_tokens:
+            kept.append(i)
+            used += n
+    if not kept:
+        return _truncate(sentences[by_relevance[0]], max_tokens)
+    return " ".join(sentences[i] for i in sorted(kept))
+
+
+@dataclass
+class BuiltContext:
+    text: str
+    tokens: int
+    used: int
+    dropped: int
+    compressed: int
+
+
+class PromptBuilder:
+    """
+    Fits retrieved Q&A passages into what is left of a token budget once the
+    static prefix, question and market snapshot are accounted for.
+
+    Passages are re-ranked by retrieval order plus term overlap with the
+    question, near-duplicate answers are dropped, long answers are compressed
+    to their most relevant sentences, and passages are added in rank order
+    until the budget runs out.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = TOKEN_BUDGET,
+        max_passage_tokens: int = MAX_PASSAGE_TOKENS,
+        dedup_similarity: float = DEDUP_SIMILARITY,
+        min_passage_tokens: int = MIN_PASSAGE_TOKENS,
+    ):
+        self.token_budget = token_budget
+        self.max_passage_tokens = max_passage_tokens
+        self.dedup_similarity = dedup_similarity
+        self.min_passage_tokens = min_passage_tokens
+
+    def rank(self, question: str, pairs: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        question_terms = _terms(question)
+
+        def score(item):
+            rank, (q, a) = item
+            # Retrieval order stays the main signal; overlap breaks near-ties
+            overlap = _jaccard(question_terms, _terms(q)) + 0.5 * _jaccard(question_terms, _terms(a))
+            return 1.0 / (1 + rank) + overlap
+
+        return [pair for _, pair in sorted(enumerate(pairs), key=score, reverse=True)]
+
+    def dedupe(self, pairs: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        kept: List[Tuple[str, str]] = []
+        kept_terms: List[Set[str]] = []
+        for q, a in pairs:
+            terms = _terms(a)
+            if any(_jaccard(terms, other) >= self.dedup_similarity for other in kept_terms):
+                continue
+            kept.append((q, a))
+            kept_terms.append(terms)
+        return kept
+
+    def build_context(self, question: str, pairs: Optional[Sequence[Tuple[str, str]]], reserved_tokens: int) -> BuiltContext:
+        """Context block for pairs within token_budget - reserved_tokens."""
+        pairs = list(pairs or [])
+        remaining = self.token_budget - reserved_tokens
+        question_terms = _terms(question)
+        unique = self.dedupe(self.rank(question, pairs))
+
+        blocks, used_tokens, compressed = [], 0, 0
+        for q, a in unique:
+            header = f"Q: {q}\nA: "
+            header_tokens = count_tokens(header)
+            room = min(self.max_passage_tokens, remaining - used_tokens - header_tokens)
+            if room < self.min_passage_tokens:
+                break
+            answer = compress(a, question_terms, room)
+            if answer != (a or "").strip():
+                compressed += 1
+            blocks.append(header + answer)
+            used_tokens += header_tokens + count_tokens(answer)
+
+        return BuiltContext(
+            text="\n\n".join(blocks),
+            tokens=used_tokens,
+            used=len(blocks),
+            dropped=len(pairs) - len(blocks),
+            compressed=compressed,
+        )
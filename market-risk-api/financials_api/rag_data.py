@@ -1,35 +1,162 @@
 # rag_data.py
 
+import hashlib
+import json
 import os
 from pathlib import Path
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_PATH = BASE_DIR / "Soros_Questions.xlsx"
+# Compiled snapshots of the Excel corpus (see load_qa_dataframe)
+SNAPSHOT_DIR = Path(os.getenv("QA_SNAPSHOT_DIR", BASE_DIR / "corpus_cache"))
+SNAPSHOT_VERSION = 2
+
+EXPECTED_COLS = ["Label", "Question", "Answer"]
+
+
+def _read_excel(path: Path) -> pd.DataFrame:
+    df = pd.read_excel(path)
+
+    for col in EXPECTED_COLS:
+        if col not in df.columns:
+            raise ValueError(f"Expected column '{col}' not found in Excel file.")
+
+    df = df[EXPECTED_COLS].copy()
+    df = df.dropna(subset=["Question", "Answer"]).reset_index(drop=True)
+
+    return df
+
+
+def _file_hash(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def _atomic_save(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _snapshot_paths(snapshot_dir: Path, stem: str, digest: str):
+    base = snapshot_dir / f"{stem}-{digest}"
+    return base.with_suffix(".text.npy"), base.with_suffix(".index.npy")
+
+
+def _write_snapshot(df: pd.DataFrame, snapshot_dir: Path, stem: str, digest: str) -> None:
+    """
+    Store the corpus as two arrays: every cell's UTF-8 bytes concatenated into
+    one uint8 buffer, and an int64 (column, row, [start, end)) index of byte
+    offsets into it, with (-1, -1) for missing cells.
+    """
+    parts = []
+    index = np.full((len(EXPECTED_COLS), len(df), 2), -1, dtype=np.int64)
+    pos = 0
+    for c, col in enumerate(EXPECTED_COLS):
+        for i, value in enumerate(df[col].tolist()):
+            if pd.isna(value):
+                continue
+            data = str(value).encode("utf-8")
+            parts.append(data)
+            index[c, i] = (pos, pos + len(data))
+            pos += len(data)
 
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    text_path, index_path = _snapshot_paths(snapshot_dir, stem, digest)
+    _atomic_save(text_path, np.frombuffer(b"".join(parts), dtype=np.uint8))
+    _atomic_save(index_path, index)
 
-def load_qa_dataframe(path: Path | str = DATA_PATH) -> pd.DataFrame:
+
+def _read_snapshot(snapshot_dir: Path, stem: str, digest: str, rows: int) -> pd.DataFrame:
+    """Rebuild the table cell by cell from slices of the memory-mapped buffer (never copied whole)."""
+    text_path, index_path = _snapshot_paths(snapshot_dir, stem, digest)
+    index = np.load(index_path, mmap_mode="r")
+    if index.shape != (len(EXPECTED_COLS), rows, 2):
+        raise ValueError(f"Corpus snapshot at {index_path} does not match its metadata")
+    buffer = np.load(text_path, mmap_mode="r")
+
+    return pd.DataFrame({
+        col: [buffer[start:end].tobytes().decode("utf-8") if start >= 0 else np.nan for start, end in index[c].tolist()]
+        for c, col in enumerate(EXPECTED_COLS)
+    })
+
+
+def _load_via_snapshot(path: Path, snapshot_dir: Path) -> pd.DataFrame:
+    """
+    Corpus from its compiled snapshot. The snapshot is keyed on the file's
+    content hash; the hash is only recomputed when the file's mtime or size
+    changes, and the Excel file is only parsed when the content did change.
+    """
+    stat = path.stat()
+    meta_path = snapshot_dir / f"{path.stem}.json"
+    try:
+        meta: Optional[dict] = json.loads(meta_path.read_text())
+        if meta.get("version") != SNAPSHOT_VERSION:
+            meta = None
+    except (OSError, ValueError):
+        meta = None
+
+    if meta and meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+        digest = meta["hash"]
+    else:
+        digest = _file_hash(path)
+
+    if meta and meta["hash"] == digest:
+        try:
+            df = _read_snapshot(snapshot_dir, path.stem, digest, meta["rows"])
+        except (OSError, ValueError) as e:
+            print(f"Warning: rebuilding corpus snapshot ({e})")
+            df = None
+    else:
+        df = None
+
+    if df is None:
+        df = _read_excel(path)
+        _write_snapshot(df, snapshot_dir, path.stem, digest)
+        for stale in snapshot_dir.glob(f"{path.stem}-*.npy"):
+            if not stale.name.startswith(f"{path.stem}-{digest}."):
+                stale.unlink(missing_ok=True)
+
+    if not meta or (meta["hash"], meta["mtime_ns"], meta["size"]) != (digest, stat.st_mtime_ns, stat.st_size):
+        tmp = meta_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "hash": digest,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "rows": len(df),
+        }))
+        os.replace(tmp, meta_path)
+
+    return df
+
+
+def load_qa_dataframe(path: Path | str = DATA_PATH, snapshot_dir: Path | str | None = SNAPSHOT_DIR) -> pd.DataFrame:
     """
     Load Soros Q&A from the Excel file and clean it.
 
     Assumes columns: 'Label', 'Question', 'Answer'.
     Drops rows with missing Question/Answer.
+    The cleaned table is served from a compiled snapshot in snapshot_dir,
+    rebuilt only when the Excel content changes; pass snapshot_dir=None to
+    always parse the Excel file.
     """
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Could not find data file at: {path}")
 
-    df = pd.read_excel(path)
-
-    expected_cols = ["Label", "Question", "Answer"]
-    for col in expected_cols:
-        if col not in df.columns:
-            raise ValueError(f"Expected column '{col}' not found in Excel file.")
-
-    df = df[expected_cols].copy()
-    df = df.dropna(subset=["Question", "Answer"]).reset_index(drop=True)
-
-    return df
+    if snapshot_dir is None:
+        return _read_excel(path)
+    try:
+        return _load_via_snapshot(path, Path(snapshot_dir))
+    except OSError as e:
+        print(f"Warning: corpus snapshot unavailable ({e}); reading {path.name} directly.")
+        return _read_excel(path)
 
 
 if __name__ == "__main__":
@@ -1,28 +1,65 @@
 # rag_generator.py
 
-import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple
 
-import google.generativeai as genai
+from .concurrency import run_cpu
+from .llm_clients import get_llm_registry
 
 DEFAULT_MODEL_NAME = "models/gemini-2.5-flash"
 
 
-def _resolve_api_key() -> Optional[str]:
-    key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-    if key:
-        return key
-    try:
-        from buffet_backend import secrets  # type: ignore
+def _blocked_message(response) -> str:
+    """Explanation returned when Gemini produced no text (usually safety filters)."""
+    finish_reasons = []
+    for cand in getattr(response, "candidates", []) or []:
+        fr = getattr(cand, "finish_reason", None)
+        if fr is not None:
+            finish_reasons.append(str(fr))
+
+    fr_info = ", ".join(sorted(set(finish_reasons))) if finish_reasons else "unknown"
+
+    return (
+        "The model could not return a normal answer (finish_reason="
+        + fr_info
+        + "). This often happens due to safety filters or content restrictions.\n\n"
+        "For your demo, you can explain that the underlying LLM refused to answer "
+        "this exact phrasing. Try rephrasing the question in more general, "
+        "educational terms and avoid asking for explicit buy/sell/hold advice."
+    )
 
-        return getattr(secrets, "GEMINI_API_KEY", None)
+
+def _response_text(response) -> Tuple[str, bool]:
+    """Text of a Gemini response; the flag is False when only the fallback message could be returned."""
+    text = None
+    try:
+        text = response.text
     except Exception:
-        return None
+        text = None
+
+    if text:
+        return text.strip(), True
+
+    parts = []
+    for cand in getattr(response, "candidates", []) or []:
+        content = getattr(cand, "content", None)
+        if not content:
+            continue
+        for part in getattr(content, "parts", []) or []:
+            t = getattr(part, "text", None)
+            if t:
+                parts.append(t)
+
+    if parts:
+        return "\n".join(parts).strip(), True
+
+    return _blocked_message(response), False
 
 
 class GeminiAnswerGenerator:
     """
     Wrapper around a Gemini model used as the generator in the RAG pipeline.
+    With an AnswerCache, normal answers are cached and reused for identical
+    prompts or similar questions.
     """
 
     def __init__(
@@ -30,67 +67,95 @@ class GeminiAnswerGenerator:
         model_name: str = DEFAULT_MODEL_NAME,
         api_key: Optional[str] = None,
         generation_config: Optional[Dict[str, Any]] = None,
+        cache=None,
     ):
-        key = api_key or _resolve_api_key()
-        if not key:
-            raise RuntimeError(
-                "Gemini API key not configured. Set GOOGLE_API_KEY or GEMINI_API_KEY."
-            )
-
-        genai.configure(api_key=key)
-        self.model = genai.GenerativeModel(model_name)
+        registry = get_llm_registry()
+        # Raises RuntimeError when no Gemini API key is configured
+        registry.configure(api_key)
         self.generation_config: Dict[str, Any] = generation_config or {
             "temperature": 0.4,
             "top_p": 0.9,
             "top_k": 40,
             "max_output_tokens": 1024,
         }
-
-    def generate(self, prompt: str) -> str:
+        # Shared with every other generator using the same model and config
+        self.model = registry.model(model_name, self.generation_config)
+        self.cache = cache
+
+    def generate(self, prompt: str, question: Optional[str] = None, tickers: Iterable[str] = ()) -> str:
+        """
+        Answer for prompt. question and tickers are only used by the cache:
+        the semantic tier compares questions among entries with the same tickers.
+        """
         prompt = (prompt or "").strip()
         if not prompt:
             raise ValueError("Prompt is empty in GeminiAnswerGenerator.generate().")
 
-        response = self.model.generate_content(
-            prompt,
-            generation_config=self.generation_config,
-        )
+        if self.cache is not None:
+            cached = self.cache.get(prompt, question=question, tickers=tickers)
+            if cached is not None:
+                return cached
+
+        text, ok = self._generate(prompt)
+        if ok and self.cache is not None:
+            self.cache.put(prompt, text, question=question, tickers=tickers)
+        return text
+
+    def generate_stream(self, prompt: str, question: Optional[str] = None, tickers: Iterable[str] = ()) -> Iterator[str]:
+        """
+        Streaming form of generate(): yields text chunks as Gemini produces them
+        (a cached answer is yielded as one chunk). The full answer is cached at the end.
+        """
+        prompt = (prompt or "").strip()
+        if not prompt:
+            raise ValueError("Prompt is empty in GeminiAnswerGenerator.generate_stream().")
 
-        text = None
-        try:
-            text = response.text
-        except Exception:
-            text = None
+        if self.cache is not None:
+            cached = self.cache.get(prompt, question=question, tickers=tickers)
+            if cached is not None:
+                yield cached
+                return
 
-        if text:
-            return text.strip()
+        response = self.model.generate_content(prompt, stream=True)
 
         parts = []
-        for cand in getattr(response, "candidates", []) or []:
-            content = getattr(cand, "content", None)
-            if not content:
-                continue
-            for part in getattr(content, "parts", []) or []:
-                t = getattr(part, "text", None)
-                if t:
-                    parts.append(t)
-
-        if parts:
-            return "\n".join(parts).strip()
-
-        finish_reasons = []
-        for cand in getattr(response, "candidates", []) or []:
-            fr = getattr(cand, "finish_reason", None)
-            if fr is not None:
-                finish_reasons.append(str(fr))
-
-        fr_info = ", ".join(sorted(set(finish_reasons))) if finish_reasons else "unknown"
-
-        return (
-            "The model could not return a normal answer (finish_reason="
-            + fr_info
-            + "). This often happens due to safety filters or content restrictions.\n\n"
-            "For your demo, you can explain that the underlying LLM refused to answer "
-            "this exact phrasing. Try rephrasing the question in more general, "
-            "educational terms and avoid asking for explicit buy/sell/hold advice."
-        )
+        for chunk in response:
+            try:
+                text = chunk.text
+            except Exception:
+                text = None
+            if text:
+                parts.append(text)
+                yield text
+
+        if not parts:
+            yield _blocked_message(response)
+        elif self.cache is not None:
+            self.cache.put(prompt, "".join(parts).strip(), question=question, tickers=tickers)
+
+    async def generate_async(self, prompt: str, question: Optional[str] = None, tickers: Iterable[str] = ()) -> str:
+        """
+        generate() for async views: awaits Gemini's async client instead of
+        blocking a thread for the whole call. Cache lookups (which may embed
+        the question) run on the CPU pool.
+        """
+        prompt = (prompt or "").strip()
+        if not prompt:
+            raise ValueError("Prompt is empty in GeminiAnswerGenerator.generate_async().")
+
+        if self.cache is not None:
+            cached = await run_cpu(self.cache.get, prompt, question=question, tickers=tickers)
+            if cached is not None:
+                return cached
+
+        response = await self.model.generate_content_async(prompt)
+        text, ok = _response_text(response)
+        if ok and self.cache is not None:
+            await run_cpu(self.cache.put, prompt, text, question=question, tickers=tickers)
+        return text
+
+    def _generate(self, prompt: str) -> Tuple[str, bool]:
+        """Call Gemini; the flag is False when only the fallback message could be returned."""
+        response = self.model.generate_content(prompt)
+        return _response_text(response)
+
@@ -1,12 +1,18 @@
 # rag_retriever.py
 
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import os
 
+import numpy as np
+import pandas as pd
+
 import chromadb
 from chromadb.utils import embedding_functions
 
 from .rag_data import load_qa_dataframe
+from .tracing import span
+
+SYNC_BATCH_SIZE = int(os.getenv("CHROMA_SYNC_BATCH_SIZE", "256"))
 
 
 class ChromaEmbeddingRetriever:
@@ -16,8 +22,10 @@ class ChromaEmbeddingRetriever:
     Returns (question, answer) pairs for the top_k most relevant documents.
     """
 
-    def __init__(self, persist_dir: str, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, persist_dir: str, model_name: str = "all-MiniLM-L6-v2", batch_size: int = SYNC_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
         self.df = load_qa_dataframe()
+        self._documents = self._document_frame(self.df)
 
         use_st = os.getenv("ENABLE_SENTENCE_TRANSFORMER", "0") == "1"
         if use_st:
@@ -39,49 +47,96 @@ class ChromaEmbeddingRetriever:
             embedding_function=self._embedding_fn,
         )
 
-        if self._collection.count() == 0:
-            self._build_index()
-
-    def _build_index(self) -> None:
-        documents = []
-        metadatas = []
-        ids = []
-
-        for i, row in self.df.iterrows():
-            q = str(row["Question"])
-            a = str(row["Answer"])
-            label = str(row.get("Label", ""))
-
-            doc_text = f"Q: {q}\nA: {a}"
-            documents.append(doc_text)
-            metadatas.append({"row_index": i, "label": label})
-            ids.append(str(i))
-
-        self._collection.add(documents=documents, metadatas=metadatas, ids=ids)
+        self.sync_index()
+
+    @staticmethod
+    def _document_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        One row per Q&A pair (document text, label, question, answer, row
+        position) indexed by a content-hash id.
+        The id changes whenever the question, answer or label does; repeated
+        identical rows get an occurrence suffix so ids stay unique.
+        """
+        docs = pd.DataFrame({
+            "document": "Q: " + df["Question"].astype(str) + "\nA: " + df["Answer"].astype(str),
+            "label": df["Label"].astype(str) if "Label" in df.columns else "",
+            "question": df["Question"].to_numpy(),
+            "answer": df["Answer"].to_numpy(),
+            "position": np.arange(len(df)),
+        })
+        digest = pd.util.hash_pandas_object(docs[["document", "label"]], index=False).map("{:016x}".format)
+        docs.index = digest + "-" + digest.groupby(digest).cumcount().astype(str)
+        return docs
+
+    def sync_index(self) -> Dict[str, int]:
+        """
+        Upsert rows whose content hash is not in the collection yet and delete
+        ids that no longer match a row, in batches of batch_size. The ids in
+        the collection are the manifest, so unchanged rows are never re-embedded.
+        """
+        existing = pd.Index(self._collection.get(include=[])["ids"])
+        wanted = self._documents
+        stale = existing.difference(wanted.index)
+        new = wanted.loc[~wanted.index.isin(existing)]
+
+        for start in range(0, len(stale), self.batch_size):
+            self._collection.delete(ids=stale[start:start + self.batch_size].tolist())
+        for start in range(0, len(new), self.batch_size):
+            chunk = new.iloc[start:start + self.batch_size]
+            self._collection.upsert(
+                ids=chunk.index.tolist(),
+                documents=chunk["document"].tolist(),
+                metadatas=chunk[["label"]].to_dict("records"),
+            )
+
+        summary = {"added": len(new), "deleted": len(stale), "unchanged": len(wanted) - len(new)}
+        if summary["added"] or summary["deleted"]:
+            print(f"Chroma index synced: {summary}")
+        return summary
+
+    def refresh(self) -> Dict[str, int]:
+        """Reload the Q&A file and sync the collection with it."""
+        df = load_qa_dataframe()
+        self._documents = self._document_frame(df)
+        self.df = df
+        return self.sync_index()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Unit-normalized embeddings from the collection's embedding function."""
+        vectors = np.asarray(self._embedding_fn(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _fallback(self, top_k: int) -> List[Tuple[str, str]]:
+        rows = self.df.head(top_k)
+        return list(zip(rows["Question"], rows["Answer"]))
 
     def retrieve(self, query: str, top_k: int = 5) -> List[Tuple[str, str]]:
-        query = (query or "").strip()
-        if not query:
-            rows = self.df.head(top_k)
-            return list(zip(rows["Question"], rows["Answer"]))
-
-        result = self._collection.query(
-            query_texts=[query],
-            n_results=top_k,
-        )
-
-        ids = result.get("ids", [[]])[0]
-        if not ids:
-            rows = self.df.head(top_k)
-            return list(zip(rows["Question"], rows["Answer"]))
-
-        pairs: List[Tuple[str, str]] = []
-        for id_str in ids:
-            idx = int(id_str)
-            row = self.df.iloc[idx]
-            pairs.append((row["Question"], row["Answer"]))
-
-        return pairs
+        return self.retrieve_many([query], top_k=top_k)[0]
+
+    def retrieve_many(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[str, str]]]:
+        """
+        Batch form of retrieve(): one embedding pass and one collection query
+        for all non-empty queries. Returns one list of pairs per query.
+        """
+        queries = [(q or "").strip() for q in queries]
+        results: List[List[Tuple[str, str]]] = [[] for _ in queries]
+        positions = [i for i, q in enumerate(queries) if q]
+
+        if positions:
+            # Embedded here rather than by query(query_texts=...) so the two are timed separately
+            with span("chroma.embed", queries=len(positions)):
+                embeddings = self._embedding_fn([queries[i] for i in positions])
+            with span("chroma.query", queries=len(positions), top_k=top_k):
+                result = self._collection.query(query_embeddings=embeddings, n_results=top_k)
+            with span("chroma.remap"):
+                documents = self._documents
+                for pos, ids in zip(positions, result.get("ids") or []):
+                    rows = documents.reindex(ids).dropna(subset=["position"])
+                    results[pos] = list(zip(rows["question"], rows["answer"]))
+
+        # Empty queries and queries with no hits fall back to the first few rows
+        return [pairs or self._fallback(top_k) for pairs in results]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,286 @@
+# ratio_rules.py
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Column name -> (statement, line item, year offset from the evaluated period)
+LINE_ITEMS: Dict[str, Tuple[str, str, int]] = {
+    "grossProfit": ("income", "Gross Profit", 0),
+    "revenue": ("income", "Total Revenue", 0),
+    "sgAndA": ("income", "Selling General And Administration", 0),
+    "rAndD": ("income", "Research And Development", 0),
+    "depreciation": ("income", "Reconciled Depreciation", 0),
+    "interestExpense": ("income", "Interest Expense", 0),
+    "operatingIncome": ("income", "Operating Income", 0),
+    "taxProvision": ("income", "Tax Provision", 0),
+    "pretaxIncome": ("income", "Pretax Income", 0),
+    "netIncome": ("income", "Net Income", 0),
+    "eps": ("income", "Basic EPS", 0),
+    "epsPrevious": ("income", "Basic EPS", 1),
+    "cash": ("balance", "Cash And Cash Equivalents", 0),
+    "currentDebt": ("balance", "Current Debt", 0),
+    "totalLiabilities": ("balance", "Total Liabilities Net Minority Interest", 0),
+    "totalEquity": ("balance", "Total Equity Gross Minority Interest", 0),
+    "preferredStock": ("balance", "Preferred Stock Equity", 0),
+    "retainedEarnings": ("balance", "Retained Earnings", 0),
+    "retainedEarningsPrevious": ("balance", "Retained Earnings", 1),
+    "treasuryStock": ("balance", "Treasury Stock", 0),
+    "capex": ("cashflow", "Capital Expenditure", 0),
+}
+
+STATEMENT_POSITION = {"income": 0, "balance": 1, "cashflow": 2}
+
+COMPARISONS = (">", ">=", "<", "<=", "!=")
+
+
+@dataclass(frozen=True)
+class RatioRule:
+    """
+    One Soros check declared as data.
+
+    value = numerator / denominator (or the numerator alone), optionally abs().
+    The check compares value against `threshold`, or against the `benchmark`
+    column when one is given; comparison=None marks an informational row.
+    The remaining fields only control how the row is rendered.
+    """
+
+    key: str
+    name: str
+    rule: str
+    numerator: str
+    denominator: Optional[str] = None
+    comparison: Optional[str] = None
+    threshold: float = 0.0
+    benchmark: Optional[str] = None
+    absolute: bool = False
+    nonzero: Tuple[str, ...] = ()
+    min_periods: int = 1
+    fmt: str = "percent"  # percent | number | integer | labels
+    labels: Tuple[str, str] = ("", "")  # value text for pass / fail when fmt == "labels"
+    missing_value: str = "N/A"
+    missing_meets: object = "N/A"
+    value_if_absent: Tuple[Tuple[str, str], ...] = ()  # (column, text) checked in order
+    meets_if_absent: Tuple[Tuple[str, str], ...] = ()
+    short_history_value: str = "N/A (<2yrs data)"
+
+
+RULES: List[RatioRule] = [
+    RatioRule("grossMargin", "Gross Margin (resilience)", "> 40%", "grossProfit", "revenue", ">=", 0.40),
+    RatioRule("sgaToGrossProfit", "SG&A / Gross Profit (cost discipline)", "< 30%", "sgAndA", "grossProfit", "<=", 0.30),
+    RatioRule(
+        "rndToGrossProfit", "R&D / Gross Profit (innovation spend)", "< 30%", "rAndD", "grossProfit", "<=", 0.30,
+        meets_if_absent=(("rAndD", "N/A (No R&D)"),),
+    ),
+    RatioRule(
+        "depreciationToGrossProfit", "Depreciation / Gross Profit (asset intensity)", "< 10%", "depreciation", "grossProfit", "<=", 0.10,
+        meets_if_absent=(("depreciation", "N/A (No Depr.)"),),
+    ),
+    RatioRule("interestToOperatingIncome", "Interest Exp / Operating Income (debt burden)", "< 15%", "interestExpense", "operatingIncome", "<=", 0.15),
+    RatioRule("incomeTaxRate", "Income Tax Rate", "Current Corp Rate", "taxProvision", "pretaxIncome"),
+    RatioRule("netMargin", "Net Margin (profit capture)", "> 20%", "netIncome", "revenue", ">=", 0.20),
+    RatioRule(
+        "epsGrowth", "EPS Growth (YoY)", "Positive", "eps", comparison=">", benchmark="epsPrevious",
+        nonzero=("epsPrevious",), min_periods=2, fmt="labels", labels=("Positive", "Negative/Flat"),
+        missing_value="N/A (Data Missing)",
+    ),
+    RatioRule(
+        "cashExceedsCurrentDebt", "Cash vs Current Debt (liquidity buffer)", "Cash > Debt", "cash", comparison=">", benchmark="currentDebt",
+        fmt="labels", labels=("Cash > Debt", "Debt >= Cash"),
+        value_if_absent=(("currentDebt", "N/A (No Current Debt)"),),
+    ),
+    RatioRule("debtToEquity", "Debt to Equity (balance-sheet leverage)", "< 1.00", "totalLiabilities", "totalEquity", "<", 1.00, fmt="number"),
+    RatioRule(
+        "preferredStock", "Preferred Stock", "Flag capital structure complexity", "preferredStock",
+        fmt="integer", value_if_absent=(("preferredStock", "None Found"),),
+    ),
+    RatioRule(
+        "retainedEarningsGrowth", "Retained Earnings Growth (capacity to self-fund)", "Consistent Growth", "retainedEarnings",
+        comparison=">", benchmark="retainedEarningsPrevious", min_periods=2, fmt="labels", labels=("Growing", "Not Growing"),
+        missing_value="N/A (Data Missing)",
+    ),
+    RatioRule(
+        "treasuryStock", "Treasury Stock Exists?", "Exists (buyback signal)", "treasuryStock", comparison="!=", threshold=0.0,
+        fmt="labels", labels=("Yes", "No"), missing_value="No", missing_meets=False,
+    ),
+    RatioRule("capexToNetIncome", "CapEx / Net Income (cash demands)", "< 25%", "capex", "netIncome", "<", 0.25, absolute=True),
+]
+
+
+# --- statement stacking ----------------------------------------------------
+
+def _period_column(frame: pd.DataFrame, year_index: int, items: Iterable[str]) -> pd.Series:
+    """
+    One period of a statement restricted to `items`.
+    Items present with a NaN value become 0; absent items stay NaN. Any
+    numeric dtype counts, including numpy integers, which the original
+    per-symbol code did not recognise and reported as 'N/A'.
+    """
+    items = list(items)
+    if frame is None or not 0 <= year_index < len(frame.columns):
+        return pd.Series(np.nan, index=items)
+    column = frame.iloc[:, year_index]
+    column = column[~column.index.duplicated(keep="first")]
+    column = pd.to_numeric(column, errors="coerce").fillna(0)
+    return column.reindex(items)
+
+
+def stack_statements(
+    statements: Dict[str, Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]],
+    year_indices: Sequence[int] = (0,),
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Stack (income, balance, cashflow) statements for many symbols and periods
+    into one (symbol, yearIndex) x line-item frame.
+
+    Also returns, per row, how many income-statement periods exist from that
+    period back (used by rules that need a prior year).
+    """
+    needed: Dict[Tuple[str, int], Dict[str, str]] = {}
+    for name, (statement, item, offset) in LINE_ITEMS.items():
+        needed.setdefault((statement, offset), {})[item] = name
+
+    rows = {}
+    periods = []
+    for symbol, frames in statements.items():
+        income = frames[STATEMENT_POSITION["income"]]
+        for year_index in year_indices:
+            values = {}
+            for (statement, offset), items in needed.items():
+                column = _period_column(frames[STATEMENT_POSITION[statement]], year_index + offset, items)
+                for item, name in items.items():
+                    values[name] = column[item]
+            rows[(symbol, year_index)] = values
+            periods.append(len(income.columns) - year_index)
+
+    index = pd.MultiIndex.from_arrays(
+        [[symbol for symbol, _ in rows], [year for _, year in rows]], names=["symbol", "yearIndex"]
+    )
+    items = pd.DataFrame(list(rows.values()), index=index, columns=list(LINE_ITEMS), dtype=float)
+    return items, np.asarray(periods, dtype=int)
+
+
+# --- compiled evaluator ----------------------------------------------------
+
+class CompiledRules:
+    """
+    A rule list turned into index arrays, so every rule is evaluated for every
+    row in a handful of matrix operations with no per-rule Python branching.
+    """
+
+    def __init__(self, rules: Sequence[RatioRule], columns: Sequence[str] = tuple(LINE_ITEMS)):
+        self.rules = list(rules)
+        self.columns = list(columns)
+        col = {name: i for i, name in enumerate(self.columns)}
+        ones = len(self.columns)  # index of an appended column of 1.0
+
+        self.num_idx = np.array([col[r.numerator] for r in self.rules])
+        self.den_idx = np.array([col[r.denominator] if r.denominator else ones for r in self.rules])
+        self.bench_idx = np.array([col[r.benchmark] if r.benchmark else ones for r in self.rules])
+        self.has_bench = np.array([r.benchmark is not None for r in self.rules])
+        self.thresholds = np.array([r.threshold for r in self.rules], dtype=float)
+        self.absolute = np.array([r.absolute for r in self.rules])
+        self.min_periods = np.array([r.min_periods for r in self.rules])
+        self.op = np.array([COMPARISONS.index(r.comparison) if r.comparison else -1 for r in self.rules])
+
+        self.nonzero = np.zeros((len(self.columns) + 1, len(self.rules)), dtype=int)
+        for j, rule in enumerate(self.rules):
+            for name in rule.nonzero:
+                self.nonzero[col[name], j] = 1
+
+    def evaluate(self, items: pd.DataFrame, periods: Optional[np.ndarray] = None):
+        """
+        Returns (values, defined, passed), each rows x rules.
+        passed is only meaningful where defined is True and the rule has a comparison.
+        """
+        x = items[self.columns].to_numpy(dtype=float)
+        x = np.hstack([x, np.ones((len(x), 1))])
+        periods = np.full(len(x), np.iinfo(int).max) if periods is None else np.asarray(periods)
+
+        num = x[:, self.num_idx]
+        den = x[:, self.den_idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(den != 0, num / den, np.nan)
+        values = np.where(self.absolute, np.abs(values), values)
+
+        bench = np.where(self.has_bench, x[:, self.bench_idx], self.thresholds)
+        zero_hits = (x == 0).astype(int) @ self.nonzero
+        defined = (
+            ~np.isnan(values)
+            & ~np.isnan(bench)
+            & (zero_hits == 0)
+            & (periods[:, None] >= self.min_periods)
+        )
+
+        with np.errstate(invalid="ignore"):
+            outcomes = np.stack([values > bench, values >= bench, values < bench, values <= bench, values != bench])
+        rows = np.arange(len(x))[:, None]
+        cols = np.arange(len(self.rules))[None, :]
+        passed = outcomes[np.maximum(self.op, 0)[None, :], rows, cols] & (self.op >= 0)
+        return values, defined, passed
+
+    def table(self, items: pd.DataFrame, periods: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Screening matrix: one value column per rule plus a nullable boolean
+        `<key>Meets` column per check, and pass / evaluated counts.
+        """
+        values, defined, passed = self.evaluate(items, periods)
+        table = pd.DataFrame(values, index=items.index, columns=[r.key for r in self.rules])
+
+        checks = np.flatnonzero(self.op >= 0)
+        fallback = np.array([isinstance(self.rules[j].missing_meets, bool) for j in checks])
+        fallback_value = np.array([bool(self.rules[j].missing_meets) if f else False for j, f in zip(checks, fallback)])
+        meets = np.where(defined[:, checks], passed[:, checks], fallback_value)
+        known = defined[:, checks] | fallback
+        for k, j in enumerate(checks):
+            table[f"{self.rules[j].key}Meets"] = pd.arrays.BooleanArray(meets[:, k].astype(bool), ~known[:, k])
+
+        table["checksPassed"] = (meets & known).sum(axis=1)
+        table["checksEvaluated"] = known.sum(axis=1)
+        return table
+
+
+def _format(value: float, fmt: str) -> str:
+    if fmt == "percent":
+        return f"{value:.2%}"
+    if fmt == "integer":
+        return f"{value:,.0f}"
+    return f"{value:,.2f}"
+
+
+def _absent_text(row: pd.Series, pairs: Tuple[Tuple[str, str], ...]) -> Optional[str]:
+    return next((text for column, text in pairs if np.isnan(row[column])), None)
+
+
+def render_ratios(compiled: CompiledRules, items: pd.DataFrame, periods: np.ndarray) -> List[List[dict]]:
+    """
+    Display rows ({name, value, rule, meets}) in the FinancialDataView format,
+    one list per row of `items`. The numbers come from a single evaluate() call.
+    """
+    values, defined, passed = compiled.evaluate(items, periods)
+    rendered = []
+    for i, (_, row) in enumerate(items.iterrows()):
+        ratios = []
+        for j, rule in enumerate(compiled.rules):
+            ok = bool(passed[i, j]) if defined[i, j] else rule.missing_meets
+            if rule.fmt == "labels":
+                if periods[i] < rule.min_periods:
+                    value = rule.short_history_value
+                elif defined[i, j]:
+                    value = rule.labels[0] if ok else rule.labels[1]
+                else:
+                    value = _absent_text(row, rule.value_if_absent) or rule.missing_value
+                meets = ok
+            else:
+                value = _absent_text(row, rule.value_if_absent) or (
+                    rule.missing_value if np.isnan(values[i, j]) else _format(values[i, j], rule.fmt)
+                )
+                meets = "N/A" if rule.comparison is None else (_absent_text(row, rule.meets_if_absent) or ok)
+            ratios.append({"name": rule.name, "value": value, "rule": rule.rule, "meets": meets})
+        rendered.append(ratios)
+    return rendered
+
+
+COMPILED_RULES = CompiledRules(RULES)
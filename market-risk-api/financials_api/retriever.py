@@ -1,6 +1,9 @@
 
 import os
 import csv
+import hashlib
+from pathlib import Path
+
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 
@@ -9,18 +12,55 @@ try:
 except Exception:
     SentenceTransformer = None
 
+try:
+    import hnswlib
+except Exception:
+    hnswlib = None
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+BASE_DIR = Path(__file__).resolve().parent.parent
+EMBEDDING_CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", BASE_DIR / "embedding_cache"))
+# Exact top-k over a memory-mapped matrix is fast well past the current corpus size;
+# the HNSW index (optional hnswlib) only pays off for much larger corpora.
+ANN_MIN_DOCS = int(os.getenv("RETRIEVER_ANN_MIN_DOCS", "50000"))
+
+
+def top_k_indices(sims: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores, best first, without sorting the whole array.
+    For a 2-D array the selection runs along the last axis (one row per query).
+    """
+    sims = np.asarray(sims)
+    n = sims.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(sims.shape[:-1] + (0,), dtype=int)
+    if k < n:
+        part = np.argpartition(sims, -k, axis=-1)[..., -k:]
+    else:
+        part = np.broadcast_to(np.arange(n), sims.shape).copy()
+    order = np.argsort(np.take_along_axis(sims, part, axis=-1), axis=-1)[..., ::-1]
+    return np.take_along_axis(part, order, axis=-1)
+
+
 class SimpleQARetriever:
-    def __init__(self, corpus_path: str):
+    def __init__(self, corpus_path: str, cache_dir=EMBEDDING_CACHE_DIR, model_name: str = MODEL_NAME):
         self.corpus_path = corpus_path
+        self.cache_dir = Path(cache_dir)
+        self.model_name = model_name
         self.questions = []
         self.answers = []
         self.vectorizer = TfidfVectorizer(stop_words='english')
         self.question_vectors = None
         self.semantic_model = None
         self.question_embeddings = None
+        self.ann_index = None
+        self.corpus_hash = None
 
         # print(f"Loading Q&A corpus from: {self.corpus_path}") # Minimal Comments
         try:
+            with open(self.corpus_path, 'rb') as f:
+                self.corpus_hash = hashlib.sha256(f.read() + model_name.encode('utf-8')).hexdigest()[:16]
             with open(self.corpus_path, 'r', encoding='utf-8') as f:
                 reader = csv.reader(f, quotechar='"', delimiter=',', skipinitialspace=True)
                 for i, row in enumerate(reader):
@@ -37,44 +77,105 @@ class SimpleQARetriever:
                  # print("TF-IDF Vectorizer fitted on questions.") # Minimal Comments
                  if SentenceTransformer is not None:
                      try:
-                         self.semantic_model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-                         self.question_embeddings = self.semantic_model.encode(self.questions, convert_to_numpy=True, normalize_embeddings=True)
+                         self.semantic_model = SentenceTransformer(model_name)
+                         self.question_embeddings = self._load_embeddings()
+                         self.ann_index = self._load_ann_index()
                      except Exception as e:
-                         print(f"Warning: Failed to load sentence-transformer model: {e}")
+                         print(f"Warning: Failed to load sentence-transformer embeddings: {e}")
                          self.semantic_model = None
+                         self.question_embeddings = None
 
         except FileNotFoundError:
             print(f"Error: Corpus file not found at {self.corpus_path}")
             raise
 
+    def _cache_path(self, suffix: str) -> Path:
+        slug = self.model_name.replace("/", "_")
+        return self.cache_dir / f"{slug}-{self.corpus_hash}{suffix}"
+
+    def _load_embeddings(self) -> np.ndarray:
+        """
+        Question embeddings memory-mapped from <cache_dir>/<model>-<corpus hash>.npy.
+        The corpus is only encoded when no file exists for its current content.
+        """
+        path = self._cache_path(".npy")
+        if not path.exists():
+            embeddings = self.semantic_model.encode(self.questions, convert_to_numpy=True, normalize_embeddings=True)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, 'wb') as f:
+                np.save(f, np.ascontiguousarray(embeddings, dtype=np.float32))
+            os.replace(tmp, path)
+        embeddings = np.load(path, mmap_mode='r')
+        if embeddings.shape[0] != len(self.questions):
+            raise ValueError(f"Cached embeddings at {path} do not match the corpus")
+        return embeddings
+
+    def _load_ann_index(self):
+        """Inner-product HNSW index for large corpora (needs hnswlib), persisted next to the embeddings."""
+        if hnswlib is None or len(self.questions) < ANN_MIN_DOCS:
+            return None
+        dim = self.question_embeddings.shape[1]
+        index = hnswlib.Index(space='ip', dim=dim)
+        path = self._cache_path(".hnsw")
+        if path.exists():
+            index.load_index(str(path), max_elements=len(self.questions))
+        else:
+            index.init_index(max_elements=len(self.questions), ef_construction=200, M=16)
+            index.add_items(np.asarray(self.question_embeddings), np.arange(len(self.questions)))
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            index.save_index(str(tmp))
+            os.replace(tmp, path)
+        return index
+
+    def _result(self, idx: int, similarity: float) -> dict:
+        return {
+            "doc_name": os.path.basename(self.corpus_path),
+            "similarity": float(similarity),
+            "text": self.answers[idx], # Answer text for context
+            "matched_question": self.questions[idx]
+        }
+
     def retrieve_top_k(self, query: str, k: int = 3):
-        results = []
-        if not self.questions:
-            return results
+        return self.retrieve_many([query], top_k=k)[0]
+
+    def retrieve_many(self, queries, top_k: int = 3):
+        """
+        Batch form of retrieve_top_k(): all queries are encoded in one call and
+        scored with one matrix product. Returns one result list per query.
+        top_k is named as in the Chroma retrievers, so callers can swap them.
+        """
+        queries = list(queries)
+        if not self.questions or not queries:
+            return [[] for _ in queries]
 
         try:
+            actual_k = min(top_k, len(self.questions))
+            if actual_k <= 0:
+                return [[] for _ in queries]
+
             if self.semantic_model is not None and self.question_embeddings is not None:
-                q_emb = self.semantic_model.encode([query], convert_to_numpy=True, normalize_embeddings=True)[0]
-                sims = np.dot(self.question_embeddings, q_emb)
+                q_embs = self.semantic_model.encode(queries, convert_to_numpy=True, normalize_embeddings=True)
+                if self.ann_index is not None:
+                    self.ann_index.set_ef(max(50, 2 * actual_k))
+                    labels, distances = self.ann_index.knn_query(q_embs, k=actual_k)
+                    # hnswlib 'ip' distance is 1 - dot product
+                    return [
+                        [self._result(int(i), 1.0 - d) for i, d in zip(row_labels, row_distances)]
+                        for row_labels, row_distances in zip(labels, distances)
+                    ]
+                sims = q_embs @ self.question_embeddings.T
             else:
                 if self.question_vectors is None:
-                    return results
-                query_vec = self.vectorizer.transform([query])
-                sims = (query_vec * self.question_vectors.T).toarray()[0]
-
-            num_docs = len(self.questions)
-            actual_k = min(k, num_docs)
-            if actual_k > 0:
-                top_indices = np.argsort(sims)[::-1][:actual_k]
-                for idx in top_indices:
-                    results.append({
-                        "doc_name": os.path.basename(self.corpus_path),
-                        "similarity": float(sims[idx]),
-                        "text": self.answers[idx], # Answer text for context
-                        "matched_question": self.questions[idx]
-                    })
+                    return [[] for _ in queries]
+                query_vecs = self.vectorizer.transform(queries)
+                sims = (query_vecs * self.question_vectors.T).toarray()
+
+            top = top_k_indices(sims, actual_k)
+            return [
+                [self._result(idx, row_sims[idx]) for idx in row_top]
+                for row_sims, row_top in zip(sims, top)
+            ]
         except Exception as e:
             print(f"Error during retrieval: {e}")
-            return []
-
-        return results
+            return [[] for _ in queries]
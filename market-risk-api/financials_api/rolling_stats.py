@@ -0,0 +1,230 @@
+# rolling_stats.py
+
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# One row per bar; bands are mean +/- threshold * std
+ROLLING_DTYPE = np.dtype([
+    ("spread", "f8"),
+    ("mean", "f8"),
+    ("std", "f8"),
+    ("zscore", "f8"),
+    ("entry_upper", "f8"),
+    ("entry_lower", "f8"),
+    ("exit_upper", "f8"),
+    ("exit_lower", "f8"),
+])
+
+
+def default_min_periods(window: int) -> int:
+    return max(2, window // 2)
+
+
+def rolling_mean_std(values: np.ndarray, window: int, min_periods: Optional[int] = None):
+    """
+    Rolling mean and sample std (ddof=1) of a 1-D array. The batch path stays
+    on pandas' C rolling kernels (compensated add/remove updates), which beat
+    any NumPy cumsum or stride-tricks version at equal accuracy; RollingStats
+    uses the same updates for streaming appends. NaN values are skipped and
+    windows with fewer than min_periods values give NaN.
+    """
+    min_periods = max(default_min_periods(window) if min_periods is None else min_periods, 1)
+    rolling = pd.Series(np.asarray(values, dtype=float)).rolling(window, min_periods=min_periods)
+    return rolling.mean().to_numpy(), rolling.std().to_numpy()
+
+
+def fill_bands(stats: np.ndarray, entry_z: float, exit_z: float) -> np.ndarray:
+    """Write the entry/exit band columns of a ROLLING_DTYPE array in place."""
+    for name, sign, threshold in (
+        ("entry_upper", 1, entry_z), ("entry_lower", -1, entry_z),
+        ("exit_upper", 1, exit_z), ("exit_lower", -1, exit_z),
+    ):
+        np.multiply(stats["std"], sign * threshold, out=stats[name])
+        stats[name] += stats["mean"]
+    return stats
+
+
+def rolling_bands(
+    spread: np.ndarray,
+    window: int,
+    entry_z: float,
+    exit_z: float,
+    min_periods: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Spread, rolling mean/std, z-score and entry/exit bands in one ROLLING_DTYPE
+    array (preallocated, or `out`).
+
+    A zero std is treated as missing, and missing stds are replaced by the
+    mean std for the z-score so early bars still get one (as the backtest
+    always has).
+    """
+    spread = np.asarray(spread, dtype=float)
+    stats = np.empty(len(spread), dtype=ROLLING_DTYPE) if out is None else out
+    stats["spread"] = spread
+    mean, std = rolling_mean_std(spread, window, min_periods)
+    std[std == 0] = np.nan
+    stats["mean"] = mean
+    stats["std"] = std
+
+    # Zero stds are already NaN, so the fill is positive whenever any std exists
+    missing = np.isnan(std)
+    fill = np.mean(std[~missing]) if not missing.all() else np.nan
+    std[missing] = fill
+    np.subtract(spread, mean, out=mean)
+    np.divide(mean, std, out=stats["zscore"])
+    return fill_bands(stats, entry_z, exit_z)
+
+
+class RollingStats:
+    """
+    Streaming form of rolling_bands(): append() adds one bar in O(1) using
+    Welford updates over a ring buffer of the last `window` values, and
+    writes its row into a growable ROLLING_DTYPE array (history is never
+    recomputed). The std fill for the z-score is the running mean of the
+    stds seen so far.
+
+    With max_history set, the array stops growing at that many rows and the
+    older half is dropped when it fills (for long-running streams).
+    """
+
+    RESYNC_EVERY = 1000  # recompute the window sums from the buffer to bound drift
+
+    def __init__(
+        self,
+        window: int,
+        entry_z: float,
+        exit_z: float,
+        min_periods: Optional[int] = None,
+        capacity: int = 256,
+        max_history: Optional[int] = None,
+    ):
+        self.window = window
+        self.entry_z = entry_z
+        self.exit_z = exit_z
+        self.min_periods = default_min_periods(window) if min_periods is None else min_periods
+        self._buffer: deque = deque()
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._run = 0  # trailing run of equal values; a window of them has std 0
+        self._prev = np.nan
+        self._std_sum = 0.0
+        self._std_count = 0
+        self._updates = 0
+        self.max_history = max(2, max_history) if max_history else None
+        if self.max_history:
+            capacity = min(capacity, self.max_history)
+        self._stats = np.empty(max(1, capacity), dtype=ROLLING_DTYPE)
+        self._size = 0
+
+    @classmethod
+    def from_history(cls, spread: np.ndarray, window: int, entry_z: float, exit_z: float, min_periods: Optional[int] = None) -> "RollingStats":
+        """Seed from a historical spread (one vectorized pass), ready for append()."""
+        spread = np.asarray(spread, dtype=float)
+        rolling = cls(window, entry_z, exit_z, min_periods, capacity=max(256, 2 * len(spread)))
+        rolling_bands(spread, window, entry_z, exit_z, rolling.min_periods, out=rolling._stats[:len(spread)])
+        rolling._size = len(spread)
+        stds = rolling._stats["std"][:len(spread)]
+        finite = np.isfinite(stds)
+        rolling._std_sum = float(stds[finite].sum())
+        rolling._std_count = int(finite.sum())
+        rolling._buffer.extend(spread[-window:].tolist())
+        rolling._resync()
+        return rolling
+
+    @property
+    def stats(self) -> np.ndarray:
+        """Rows so far (a view; valid until the next append grows the array)."""
+        return self._stats[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    # Welford updates with a compensated mean, as in pandas' rolling kernels
+    def _add(self, x: float) -> None:
+        self._run = self._run + 1 if x == self._prev else 1
+        self._prev = x
+        self._count += 1
+        prev_mean = self._mean - self._comp_add
+        y = x - self._comp_add
+        t = y - self._mean
+        self._comp_add = t + self._mean - y
+        self._mean += t / self._count
+        self._m2 += (x - prev_mean) * (x - self._mean)
+
+    def _remove(self, x: float) -> None:
+        self._count -= 1
+        if self._count == 0:
+            self._mean, self._m2 = 0.0, 0.0
+            return
+        prev_mean = self._mean - self._comp_remove
+        y = x - self._comp_remove
+        t = y - self._mean
+        self._comp_remove = t + self._mean - y
+        self._mean -= t / self._count
+        self._m2 -= (x - prev_mean) * (x - self._mean)
+
+    def _resync(self) -> None:
+        self._count, self._mean, self._m2 = 0, 0.0, 0.0
+        self._comp_add = self._comp_remove = 0.0
+        self._run, self._prev = 0, np.nan
+        for x in self._buffer:
+            if x == x:
+                self._add(x)
+        self._updates = 0
+
+    def append(self, value: float) -> np.void:
+        """Add one bar; returns its row (spread, mean, std, zscore, bands)."""
+        value = float(value)
+        if len(self._buffer) >= self.window:
+            old = self._buffer.popleft()
+            if old == old:
+                self._remove(old)
+        self._buffer.append(value)
+        if value == value:  # NaN bars occupy the window but are skipped, as in pandas
+            self._add(value)
+        self._updates += 1
+        if self._updates >= self.RESYNC_EVERY:
+            self._resync()
+
+        same = self._run >= self._count
+        mean = np.nan
+        if self._count >= max(self.min_periods, 1):
+            mean = self._prev if same else self._mean
+        std = np.nan
+        if self._count >= max(self.min_periods, 2) and not same:
+            std = float(np.sqrt(max(self._m2, 0.0) / (self._count - 1))) or np.nan
+        if std == std:
+            self._std_sum += std
+            self._std_count += 1
+        fill = self._std_sum / self._std_count if self._std_count else np.nan
+
+        if self._size == len(self._stats):
+            if self.max_history and self._size >= self.max_history:
+                keep = self.max_history // 2
+                self._stats[:keep] = self._stats[self._size - keep:self._size]
+                self._size = keep
+            else:
+                size = 2 * len(self._stats)
+                grown = np.empty(min(size, self.max_history) if self.max_history else size, dtype=ROLLING_DTYPE)
+                grown[:self._size] = self._stats[:self._size]
+                self._stats = grown
+        row = self._stats[self._size:self._size + 1]
+        row["spread"] = value
+        row["mean"] = mean
+        row["std"] = std
+        row["zscore"] = (value - mean) / (std if std == std else fill)
+        fill_bands(row, self.entry_z, self.exit_z)
+        self._size += 1
+        return self._stats[self._size - 1]
+
+    @property
+    def latest(self) -> Optional[np.void]:
+        return self._stats[self._size - 1] if self._size else None
@@ -0,0 +1,84 @@
+# sse.py
+
+import json
+import logging
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+def wants_stream(request, data: Optional[dict] = None) -> bool:
+    """
+    True for {"stream": true} in the body, ?stream=1, or an Accept: text/event-stream header.
+    Plain Django views (no request.data) pass their parsed body as data.
+    """
+    if data is None:
+        data = getattr(request, "data", None) or {}
+    flag = data.get("stream")
+    if flag is None:
+        params = getattr(request, "query_params", request.GET)
+        flag = params.get("stream")
+    if isinstance(flag, str):
+        flag = flag.lower() in {"1", "true", "yes"}
+    return bool(flag) or "text/event-stream" in request.META.get("HTTP_ACCEPT", "")
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def answer_events(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    SSE stream for an answer: one {"delta": ...} event per chunk, then a
+    `done` event with the full reply (or an `error` event if generation fails).
+    """
+    parts = []
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            yield sse_event({"delta": chunk})
+    except Exception:
+        logger.exception("Error while streaming answer")
+        yield sse_event({"error": "An error occurred while generating the answer."}, event="error")
+        return
+    yield sse_event({"reply": "".join(parts).strip()}, event="done")
+
+
+async def _iterate_in_thread(iterator: Iterator[str]):
+    # Each blocking next() (a Gemini chunk) runs off the event loop.
+    done = object()
+    next_chunk = sync_to_async(next, thread_sensitive=False)
+    while True:
+        chunk = await next_chunk(iterator, done)
+        if chunk is done:
+            break
+        yield chunk
+
+
+def sse_response(request, events: Iterator[str]) -> StreamingHttpResponse:
+    """
+    text/event-stream response. Under ASGI the events are served from an async
+    iterator so chunks reach the client as they are produced; under WSGI the
+    plain iterator streams directly.
+    """
+    django_request = getattr(request, "_request", request)
+    content = _iterate_in_thread(iter(events)) if isinstance(django_request, ASGIRequest) else events
+    return _event_stream(content)
+
+
+def async_sse_response(events: AsyncIterator[str]) -> StreamingHttpResponse:
+    """text/event-stream response for an async iterator of events (ASGI only)."""
+    return _event_stream(events)
+
+
+def _event_stream(content) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
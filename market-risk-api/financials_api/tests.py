@@ -1,3 +1,289 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from . import fundamentals_cache, price_store
+from .fundamentals_cache import FundamentalsCache
+from .pairs_monitor import BarFeed, FileReplayFeed, PairsMonitor
+from .pairs_scanner import scan_universe
+from .price_store import COLUMNS, PriceStore
+from .ratio_rules import LINE_ITEMS
+from .transformer_client import CircuitBreaker, CircuitOpenError, MockPredictor, TransformerClient, TransformerError
+from .views.pairs_scan_view import PairScanView
+from .views.pairs_sweep_view import PairSweepView
+from .views.screen_view import FinancialScreenView
+
+
+def fake_prices(tickers, start, end):
+    """PriceStore fetcher: a shared random walk plus stationary noise per ticker, so every pair cointegrates."""
+    days = pd.bdate_range(start, end - pd.Timedelta(days=1))
+    factor = np.cumsum(np.random.default_rng(0).normal(0.0, 0.01, len(days)))
+    frames = {}
+    for n, ticker in enumerate(tickers):
+        noise = np.random.default_rng(n + 1).normal(0.0, 0.005, len(days))
+        close = (50 + 10 * n) * np.exp(factor + noise)
+        frame = pd.DataFrame({col: close for col in COLUMNS}, index=days)
+        frame["Volume"] = 1_000_000.0
+        frames[ticker] = frame
+    return frames
+
+
+def fake_statements(symbol, kinds):
+    """FundamentalsCache fetcher: two annual periods with every line item the ratio rules read; EMPTY has none."""
+    if symbol == "EMPTY":
+        return {kind: pd.DataFrame() for kind in kinds}
+    periods = pd.DatetimeIndex(["2024-09-30", "2023-09-30"])
+    statements = {}
+    for kind in kinds:
+        items = sorted({item for statement, item, _ in LINE_ITEMS.values() if statement == kind})
+        statements[kind] = pd.DataFrame(
+            np.random.default_rng(len(symbol)).uniform(1e8, 1e10, (len(items), len(periods))),
+            index=items,
+            columns=periods,
+        )
+    return statements
+
+
+class CountingFetcher:
+    def __init__(self, fetcher):
+        self.fetcher = fetcher
+        self.calls = []
+
+    def __call__(self, symbol, kinds):
+        self.calls.append((symbol, tuple(kinds)))
+        return self.fetcher(symbol, kinds)
+
+
+class PairSweepViewTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(price_store, "_store", PriceStore(self.tmp.name, fetcher=fake_prices))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, **data):
+        body = {"symbolA": "AAA", "symbolB": "BBB", "startDate": "2022-01-01", "endDate": "2023-01-01", **data}
+        request = APIRequestFactory().post("/api/pairs/sweep/", body, format="json")
+        return PairSweepView.as_view()(request)
+
+    def test_grid_is_ranked_by_sort_key(self):
+        response = self.post(entryZ=[1.0, 2.0], exitZ="0,0.5", rollingWindow=20, sortBy="trades")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["combinations"], 4)
+        rows = response.data["results"]
+        self.assertEqual([row["rank"] for row in rows], [1, 2, 3, 4])
+        self.assertEqual([row["trades"] for row in rows], sorted((row["trades"] for row in rows), reverse=True))
+        self.assertEqual({(row["entryZ"], row["exitZ"]) for row in rows}, {(1.0, 0.0), (1.0, 0.5), (2.0, 0.0), (2.0, 0.5)})
+
+    def test_limit_truncates_results(self):
+        response = self.post(limit=3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_invalid_grids_are_rejected(self):
+        for data in (
+            {"entryZ": [1.0], "exitZ": [1.5]},  # exit above entry
+            {"entryZ": [-1.0]},
+            {"exitZ": [-0.25]},
+            {"entryZ": []},
+            {"rollingWindow": [1]},
+            {"entryZ": "abc"},
+            {"sortBy": "nope"},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(self.post(**data).status_code, 400)
+
+
+class FinancialScreenViewTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(fundamentals_cache, "_cache", FundamentalsCache(self.tmp.name, fetcher=fake_statements))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **params):
+        request = APIRequestFactory().get("/api/financials/screen/", params)
+        return FinancialScreenView.as_view()(request)
+
+    def test_screens_every_symbol_and_reports_missing(self):
+        response = self.get(symbols="aapl,MSFT,EMPTY,aapl")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(row["symbol"] for row in response.data["rows"]), ["AAPL", "MSFT"])
+        self.assertEqual(response.data["missing"], ["EMPTY"])
+        passed = [row["checksPassed"] for row in response.data["rows"]]
+        self.assertEqual(passed, sorted(passed, reverse=True))
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.get().status_code, 400)
+        self.assertEqual(self.get(symbols="AAPL", yearIndex="-1").status_code, 400)
+        self.assertEqual(self.get(symbols="AAPL", yearIndex="x").status_code, 400)
+        self.assertEqual(self.get(symbols="AAPL", sortBy="nope").status_code, 400)
+
+
+class PairScannerTests(SimpleTestCase):
+    class Store:
+        def __init__(self, prices):
+            self.prices = prices
+
+        def get_many(self, tickers, start, end, field="Adj Close"):
+            return self.prices[list(tickers)]
+
+    def prices(self):
+        days = pd.bdate_range("2022-01-03", periods=250)
+        frames = fake_prices(["AAA", "BBB", "CCC"], days[0], days[-1] + pd.Timedelta(days=1))
+        prices = pd.DataFrame({ticker: frame["Adj Close"] for ticker, frame in frames.items()})
+        prices["LATE"] = prices["AAA"].where(prices.index >= days[200])  # listed late
+        return prices
+
+    def test_ranks_tested_pairs_and_drops_sparse_tickers(self):
+        with self.assertLogs("financials_api.pairs_scanner", "WARNING") as logs:
+            table = scan_universe(["AAA", "BBB", "CCC", "LATE"], None, None, max_workers=1, store=self.Store(self.prices()))
+        self.assertIn("LATE", logs.output[0])
+        self.assertEqual(table.attrs["pairsTested"], 3)
+        self.assertNotIn("LATE", set(table["symbolA"]) | set(table["symbolB"]))
+        self.assertEqual(list(table["rank"]), list(range(1, len(table) + 1)))
+        self.assertTrue(table["pValue"].is_monotonic_increasing)
+        self.assertTrue((table["observations"] == 250).all())
+
+    def test_correlation_filter_limits_pairs_tested(self):
+        prices = self.prices()[["AAA", "BBB"]]
+        prices["CCC"] = np.exp(np.random.default_rng(9).normal(0, 0.02, len(prices)).cumsum()) * 20
+        table = scan_universe(["AAA", "BBB", "CCC"], None, None, min_correlation=0.9, max_workers=1, store=self.Store(prices))
+        self.assertEqual(table.attrs["pairsTested"], 1)
+        self.assertEqual(list(zip(table["symbolA"], table["symbolB"])), [("AAA", "BBB")])
+
+    def test_scan_view_rejects_non_integer_scan_id(self):
+        request = APIRequestFactory().get("/api/pairs/scan/", {"scan": "abc"})
+        self.assertEqual(PairScanView.as_view()(request).status_code, 400)
+
+
+class PairsMonitorTests(SimpleTestCase):
+    def test_bar_feed_is_abstract(self):
+        with self.assertRaises(TypeError):
+            BarFeed()
+
+    def test_restarts_after_stop(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("timestamp,AAA,BBB\n")
+            for i in range(100):
+                f.write(f"2024-01-02 10:{i // 60:02d}:{i % 60:02d},{100 + i % 7},{50 + i % 5}\n")
+        self.addCleanup(os.unlink, f.name)
+        monitor = PairsMonitor([("AAA", "BBB")], FileReplayFeed(f.name), window=20)
+        for expected in (200, 400):
+            monitor.start()
+            monitor._thread.join(5)
+            self.assertEqual(monitor.bars_processed, expected)
+            monitor.stop()
+
+
+class FundamentalsCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.fetcher = CountingFetcher(fake_statements)
+
+    def test_memory_and_disk_hits_skip_the_fetcher(self):
+        cache = FundamentalsCache(self.tmp.name, fetcher=self.fetcher)
+        income, balance, cashflow = cache.get_statements(" aapl ")
+        self.assertFalse(income.empty)
+        self.assertEqual(self.fetcher.calls, [("AAPL", ("income", "balance", "cashflow"))])
+
+        cache.get_statements("AAPL")
+        FundamentalsCache(self.tmp.name, fetcher=self.fetcher).get_statements("AAPL")  # from disk
+        self.assertEqual(len(self.fetcher.calls), 1)
+
+    def test_only_missing_kinds_are_fetched(self):
+        cache = FundamentalsCache(self.tmp.name, fetcher=self.fetcher)
+        cache.get_statements("AAPL", kinds=("income",))
+        cache.get_statements("AAPL")
+        self.assertEqual(self.fetcher.calls, [("AAPL", ("income",)), ("AAPL", ("balance", "cashflow"))])
+
+    def test_expired_and_invalidated_entries_are_refetched(self):
+        cache = FundamentalsCache(self.tmp.name, ttl_seconds=60, fetcher=self.fetcher)
+        cache.get_statements("AAPL")
+        with mock.patch.object(fundamentals_cache.time, "time", return_value=time.time() + 120):
+            cache.get_statements("AAPL")
+        self.assertEqual(len(self.fetcher.calls), 2)
+
+        cache.invalidate("aapl")
+        cache.get_statements("AAPL")
+        self.assertEqual(len(self.fetcher.calls), 3)
+
+    def test_empty_results_use_the_short_ttl(self):
+        cache = FundamentalsCache(self.tmp.name, ttl_seconds=3600, fetcher=self.fetcher)
+        cache.get_statements("EMPTY")
+        later = time.time() + fundamentals_cache.EMPTY_TTL_SECONDS + 1
+        with mock.patch.object(fundamentals_cache.time, "time", return_value=later):
+            cache.get_statements("EMPTY")
+        self.assertEqual(len(self.fetcher.calls), 2)
+
+    def test_prefetch_reports_errors_per_symbol(self):
+        def fetcher(symbol, kinds):
+            if symbol == "BAD":
+                raise RuntimeError("boom")
+            return fake_statements(symbol, kinds)
+
+        cache = FundamentalsCache(self.tmp.name, fetcher=fetcher)
+        self.assertEqual(cache.prefetch(["aapl", "BAD", "AAPL"], max_workers=2), {"AAPL": None, "BAD": "boom"})
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def make_client(self, session, breaker):
+        return TransformerClient(url="http://predict", session=session, max_retries=0, breaker=breaker, batch_window_ms=0)
+
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        predictor = MockPredictor(fail_first=2)
+        client = self.make_client(predictor, CircuitBreaker(failure_threshold=2, reset_seconds=60))
+        for _ in range(2):
+            with self.assertRaises(TransformerError):
+                client.predict("q", "token")
+        with self.assertRaises(CircuitOpenError) as raised:
+            client.predict("q", "token")
+        self.assertEqual(raised.exception.status_code, 503)
+        self.assertEqual(len(predictor.calls), 2)  # the open circuit never reached the endpoint
+
+    def test_half_open_trial_closes_or_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        client = self.make_client(MockPredictor(fail_first=2), breaker)
+        with self.assertRaises(TransformerError):
+            client.predict("q", "token")
+        self.assertEqual(breaker.state, "half-open")
+        with self.assertRaises(TransformerError):
+            client.predict("q", "token")  # the trial fails: reopened
+        self.assertEqual(breaker.failures, 2)
+        self.assertEqual(client.predict("q", "token"), "Mock answer: q")
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.failures, 0)
+
+    def test_client_errors_do_not_open_the_circuit(self):
+        session = mock.Mock()
+        session.post.return_value = mock.Mock(ok=False, status_code=401, text="bad token")
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        with self.assertRaises(TransformerError):
+            self.make_client(session, breaker).predict("q", "token")
+        self.assertEqual(breaker.state, "closed")
+
+    def test_unexpected_errors_settle_the_trial(self):
+        session = mock.Mock()
+        session.post.side_effect = KeyError("unexpected")
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+        with self.assertRaises(KeyError):
+            self.make_client(session, breaker).predict("q", "token")
+        # The half-open trial was recorded, so the next call is let through again
+        breaker.before_call()
+
+    def test_malformed_bodies_are_transformer_errors(self):
+        for body in (["not", "an", "object"], {"predictions": "text"}, {"predictions": []}, {"predictions": [1, 2]}):
+            session = mock.Mock()
+            session.post.return_value = mock.Mock(ok=True, status_code=200, json=mock.Mock(return_value=body))
+            with self.subTest(body=body), self.assertRaises(TransformerError):
+                self.make_client(session, CircuitBreaker()).predict("q", "token")
@@ -0,0 +1,282 @@
+# tracing.py
+
+import bisect
+import contextlib
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from opentelemetry import trace as otel_trace
+except Exception:
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+# none: spans only feed the stage histograms; otel: they are also exported
+# through whatever OpenTelemetry SDK/exporter the process has configured
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+TRACER_NAME = "financials_api"
+# Upper bounds (seconds) of the stage latency histogram buckets
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(
+    float(b) for b in os.getenv(
+        "TRACING_BUCKETS", "0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30"
+    ).split(",")
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, cumulative like Prometheus' histogram type."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[slot] += 1
+            self._sum += seconds
+            self._errors += int(error)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """(cumulative bucket counts ending with +Inf, sum, errors)."""
+        with self._lock:
+            counts, total, errors = list(self._counts), self._sum, self._errors
+        running = 0
+        for i, c in enumerate(counts):
+            running += c
+            counts[i] = running
+        return counts, total, errors
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate of the q-quantile, interpolated linearly inside its bucket
+        (Prometheus' histogram_quantile). Values past the last finite bucket
+        are reported as that bound.
+        """
+        counts, _, _ = self.snapshot()
+        count = counts[-1]
+        if not count:
+            return None
+        rank = q * count
+        slot = bisect.bisect_left(counts, rank)
+        if slot >= len(self.buckets):
+            return self.buckets[-1]
+        lower = self.buckets[slot - 1] if slot else 0.0
+        below = counts[slot - 1] if slot else 0
+        in_bucket = counts[slot] - below
+        if not in_bucket:
+            return self.buckets[slot]
+        return lower + (self.buckets[slot] - lower) * (rank - below) / in_bucket
+
+
+class StageMetrics:
+    """One latency histogram per span name."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, error: bool = False) -> None:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, Histogram(self.buckets))
+        histogram.observe(seconds, error)
+
+    def items(self) -> List[Tuple[str, Histogram]]:
+        with self._lock:
+            return sorted(self._histograms.items())
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Count, mean and estimated p50/p90/p99 per stage."""
+        out = {}
+        for stage, histogram in self.items():
+            counts, total, errors = histogram.snapshot()
+            out[stage] = {
+                "count": counts[-1],
+                "errors": errors,
+                "meanSeconds": total / counts[-1] if counts[-1] else None,
+                "p50Seconds": histogram.quantile(0.5),
+                "p90Seconds": histogram.quantile(0.9),
+                "p99Seconds": histogram.quantile(0.99),
+            }
+        return out
+
+    def prometheus_lines(self) -> List[str]:
+        """stage_duration_seconds histograms and stage_errors_total counters, in the text exposition format."""
+        items = self.items()
+        lines = [
+            "# HELP stage_duration_seconds Latency of traced request stages.",
+            "# TYPE stage_duration_seconds histogram",
+        ]
+        errors = []
+        for stage, histogram in items:
+            label = f'stage="{escape_label(stage)}"'
+            counts, total, error_count = histogram.snapshot()
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'stage_duration_seconds_bucket{{{label},le="{le}"}} {count}')
+            lines.append(f"stage_duration_seconds_sum{{{label}}} {total!r}")
+            lines.append(f"stage_duration_seconds_count{{{label}}} {counts[-1]}")
+            errors.append(f"stage_errors_total{{{label}}} {error_count}")
+        lines += [
+            "# HELP stage_errors_total Traced stages that raised.",
+            "# TYPE stage_errors_total counter",
+        ] + errors
+        return lines
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopTracer:
+    """Default tracer: spans are timed into the histograms and nothing is exported."""
+
+    def start(self, name: str, attributes: Dict[str, Any]):
+        return contextlib.nullcontext(_NOOP_SPAN)
+
+    def open(self, name: str, attributes: Dict[str, Any], parent=None):
+        return _NOOP_SPAN
+
+    def activate(self, current):
+        return contextlib.nullcontext(current)
+
+
+class OpenTelemetryTracer:
+    """
+    Spans go through the OpenTelemetry API, so nesting follows the current
+    context and the exporter is whatever the process set up (e.g. OTLP via
+    opentelemetry-instrument and the OTEL_* variables).
+    """
+
+    def __init__(self, name: str = TRACER_NAME):
+        self._tracer = otel_trace.get_tracer(name)
+
+    def start(self, name: str, attributes: Dict[str, Any]):
+        return self._tracer.start_as_current_span(name, attributes=attributes or None)
+
+    def open(self, name: str, attributes: Dict[str, Any], parent=None):
+        context = otel_trace.set_span_in_context(parent) if parent is not None else None
+        return self._tracer.start_span(name, context=context, attributes=attributes or None)
+
+    def activate(self, current):
+        return otel_trace.use_span(current, end_on_exit=False)
+
+
+_tracer = None
+_stage_metrics: Optional[StageMetrics] = None
+_guard = threading.Lock()
+
+
+def get_tracer():
+    global _tracer
+    with _guard:
+        if _tracer is None:
+            if TRACING_EXPORTER == "otel" and otel_trace is not None:
+                _tracer = OpenTelemetryTracer()
+            else:
+                if TRACING_EXPORTER not in {"none", "otel"}:
+                    logger.warning("Unknown TRACING_EXPORTER=%r; spans are not exported.", TRACING_EXPORTER)
+                elif TRACING_EXPORTER == "otel":
+                    logger.warning("TRACING_EXPORTER=otel but opentelemetry-api is not installed; spans are not exported.")
+                _tracer = NoopTracer()
+        return _tracer
+
+
+def get_stage_metrics() -> StageMetrics:
+    global _stage_metrics
+    with _guard:
+        if _stage_metrics is None:
+            _stage_metrics = StageMetrics()
+        return _stage_metrics
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """
+    Time the enclosed block as stage `name` into the stage histograms and
+    open a span for it on the configured tracer. Yields the span
+    (set_attribute() works with either tracer).
+    """
+    metrics = _stage_metrics or get_stage_metrics()
+    started = time.perf_counter()
+    error = False
+    try:
+        with (_tracer or get_tracer()).start(name, attributes) as current:
+            yield current
+    except Exception:
+        error = True
+        raise
+    finally:
+        metrics.observe(name, time.perf_counter() - started, error)
+
+
+class OpenSpan:
+    """
+    A stage opened and ended explicitly rather than by a with block, for work
+    that outlives the block that starts it (a streamed answer). It is only
+    made current inside activate(), so its chunks may be pulled from other
+    threads and contexts; end() records it once.
+    """
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["OpenSpan"] = None):
+        self.name = name
+        self._tracer = _tracer or get_tracer()
+        self._span = self._tracer.open(name, attributes, parent._span if parent is not None else None)
+        self._started = time.perf_counter()
+        self._ended = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._span.set_attribute(key, value)
+
+    def activate(self):
+        """Make this the current span for the enclosed block (spans opened in it nest under it)."""
+        return self._tracer.activate(self._span)
+
+    def child(self, name: str, **attributes) -> "OpenSpan":
+        return OpenSpan(name, attributes, parent=self)
+
+    def end(self, error: bool = False) -> None:
+        if self._ended:
+            return
+        self._ended = True
+        (_stage_metrics or get_stage_metrics()).observe(self.name, time.perf_counter() - self._started, error)
+        self._span.end()
+
+
+def open_span(name: str, **attributes) -> OpenSpan:
+    return OpenSpan(name, attributes)
+
+
+def end_with(chunks: Iterable[Any], *spans: OpenSpan) -> Iterator[Any]:
+    """Yield from chunks, then end spans (in the order given) once they are exhausted, fail or are closed."""
+    error = False
+    try:
+        yield from chunks
+    except Exception:
+        error = True
+        raise
+    finally:
+        for current in spans:
+            current.end(error)
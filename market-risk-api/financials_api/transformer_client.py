@@ -0,0 +1,347 @@
+# transformer_client.py
+
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_ENDPOINT_URL = (
+    "https://us-central1-aiplatform.googleapis.com/v1/projects/csye7380soros-glcoud-project"
+    "/locations/us-central1/endpoints/6095682568785494016:predict"
+)
+ENDPOINT_URL = os.getenv("TRANSFORMER_ENDPOINT_URL", DEFAULT_ENDPOINT_URL)
+CONNECT_TIMEOUT = float(os.getenv("TRANSFORMER_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("TRANSFORMER_READ_TIMEOUT", "30"))
+POOL_SIZE = int(os.getenv("TRANSFORMER_POOL_SIZE", "20"))
+MAX_RETRIES = int(os.getenv("TRANSFORMER_MAX_RETRIES", "2"))
+# Retry n sleeps a random time in [0, BACKOFF_SECONDS * 2**n] ("full jitter")
+BACKOFF_SECONDS = float(os.getenv("TRANSFORMER_BACKOFF_SECONDS", "0.25"))
+# Consecutive failed calls that open the circuit, and how long it stays open
+BREAKER_FAILURES = int(os.getenv("TRANSFORMER_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("TRANSFORMER_BREAKER_RESET_SECONDS", "30"))
+# Concurrent questions are sent as one multi-instance :predict call: a batch closes
+# BATCH_WINDOW_MS after its first question or at BATCH_MAX_SIZE questions (window 0 disables)
+BATCH_WINDOW_MS = float(os.getenv("TRANSFORMER_BATCH_WINDOW_MS", "15"))
+BATCH_MAX_SIZE = int(os.getenv("TRANSFORMER_BATCH_MAX_SIZE", "16"))
+# TRANSFORMER_MOCK=1 answers locally with MockPredictor instead of calling the endpoint
+USE_MOCK = os.getenv("TRANSFORMER_MOCK", "0") == "1"
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TransformerError(Exception):
+    """A failed prediction; status_code is the HTTP status the view should return."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(TransformerError):
+    def __init__(self, retry_in: float):
+        super().__init__(
+            f"Transformer API is unavailable after repeated failures; retry in {retry_in:.0f}s.",
+            status_code=503,
+        )
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. After failure_threshold failed calls
+    the circuit opens and calls fail fast for reset_seconds; then one trial
+    call is let through (half-open) and its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_seconds or self._trial_running:
+                raise CircuitOpenError(max(self.reset_seconds - waited, 0.0))
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class _MockResponse:
+    def __init__(self, status_code: int, body: Dict[str, Any]):
+        self.status_code = status_code
+        self.ok = 200 <= status_code < 300
+        self._body = body
+        self.text = str(body)
+
+    def json(self) -> Dict[str, Any]:
+        return self._body
+
+
+class MockPredictor:
+    """
+    Local stand-in for the predict endpoint with the requests.Session.post()
+    interface, so it can replace the session of a TransformerClient.
+    Answers each instance with "Mock answer: <question>" after latency seconds;
+    fail_first makes the first N calls return 503.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_first: int = 0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.calls: List[List[Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        instances = (json or {}).get("instances", [])
+        with self._lock:
+            self.calls.append(instances)
+            failing = len(self.calls) <= self.fail_first
+        if self.latency:
+            time.sleep(self.latency)
+        if failing:
+            return _MockResponse(503, {"error": "mock predictor unavailable"})
+        return _MockResponse(200, {"predictions": [f"Mock answer: {i.get('question', '')}" for i in instances]})
+
+    def close(self) -> None:
+        pass
+
+
+class PredictBatcher:
+    """
+    Micro-batching queue in front of TransformerClient.predict_instances().
+
+    submit() enqueues one instance and returns a Future. A collector thread
+    takes the first waiting instance, keeps collecting for window_seconds or
+    until max_size instances, and sends each bearer token's instances as one
+    :predict call on a dispatch pool (so a slow call does not hold up the next
+    window). Prediction i resolves the Future of instance i; a failed call
+    fails every Future in its batch.
+    """
+
+    def __init__(self, client: "TransformerClient", window_seconds: float, max_size: int, dispatch_workers: int = POOL_SIZE):
+        self.client = client
+        self.window_seconds = window_seconds
+        self.max_size = max(1, max_size)
+        self.calls = 0
+        self.instances = 0
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any], Future]]" = queue.Queue()
+        self._dispatch = ThreadPoolExecutor(max_workers=max(1, dispatch_workers), thread_name_prefix="transformer-batch")
+        self._collector = threading.Thread(target=self._collect_forever, name="transformer-batcher", daemon=True)
+        self._collector.start()
+
+    def submit(self, instance: Dict[str, Any], bearer: str) -> Future:
+        future: Future = Future()
+        self._queue.put((bearer, instance, future))
+        return future
+
+    def _collect_forever(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window_seconds
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            by_bearer: Dict[str, List[Tuple[Dict[str, Any], Future]]] = {}
+            for bearer, instance, future in batch:
+                by_bearer.setdefault(bearer, []).append((instance, future))
+            for bearer, items in by_bearer.items():
+                self._dispatch.submit(self._send, bearer, items)
+
+    def _send(self, bearer: str, items: List[Tuple[Dict[str, Any], Future]]) -> None:
+        self.calls += 1
+        self.instances += len(items)
+        try:
+            predictions = self.client.predict_instances([instance for instance, _ in items], bearer)
+        except BaseException as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+        for (_, future), prediction in zip(items, predictions):
+            future.set_result(prediction)
+
+
+def _session(pool_size: int) -> requests.Session:
+    # Keep-alive connections are reused across requests, so the TLS handshake is
+    # paid once per pooled connection rather than once per question.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class TransformerClient:
+    """
+    Client for the external transformer :predict endpoint.
+
+    One pooled session is shared by all requests. Every call has connect and
+    read timeouts, retries connection errors, timeouts and 429/5xx answers with
+    jittered exponential backoff, and goes through a circuit breaker. Identical
+    questions already in flight are coalesced onto one upstream call, and with
+    a batch window distinct concurrent questions share one :predict call
+    (PredictBatcher).
+    """
+
+    def __init__(
+        self,
+        url: str = ENDPOINT_URL,
+        session=None,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        backoff_seconds: float = BACKOFF_SECONDS,
+        breaker: Optional[CircuitBreaker] = None,
+        pool_size: int = POOL_SIZE,
+        batch_window_ms: float = BATCH_WINDOW_MS,
+        batch_max_size: int = BATCH_MAX_SIZE,
+    ):
+        self.url = url
+        self.session = session if session is not None else _session(pool_size)
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self.batcher = (
+            PredictBatcher(self, batch_window_ms / 1000.0, batch_max_size, dispatch_workers=pool_size)
+            if batch_window_ms > 0 and batch_max_size > 1 else None
+        )
+
+    def predict(self, question: str, bearer: str) -> Any:
+        """Prediction for one question. Raises TransformerError."""
+        key = (bearer, question)
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            instance = {"question": question}
+            if self.batcher is not None:
+                future.set_result(self.batcher.submit(instance, bearer).result())
+            else:
+                future.set_result(self.predict_instances([instance], bearer)[0])
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+        return future.result()
+
+    def predict_instances(self, instances: List[Dict[str, Any]], bearer: str) -> List[Any]:
+        """One :predict call for instances; returns one prediction per instance."""
+        self.breaker.before_call()
+        try:
+            predictions = self._post_with_retries(instances, bearer)
+        except TransformerError as e:
+            # Client errors (bad token, bad payload) say nothing about upstream health
+            if e.status_code >= 500 or e.status_code == 429:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except Exception:
+            # Anything unexpected still settles the call, so a half-open trial cannot hang
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return predictions
+
+    def _post_with_retries(self, instances: List[Dict[str, Any]], bearer: str) -> List[Any]:
+        headers = {
+            "Authorization": f"Bearer {bearer}",
+            "Content-Type": "application/json",
+        }
+        payload = {"instances": instances}
+        attempt = 0
+        while True:
+            try:
+                resp = self.session.post(self.url, json=payload, headers=headers, timeout=self.timeout)
+            except requests.Timeout as e:
+                error = TransformerError(f"Transformer API request timed out: {e}", status_code=504)
+            except requests.RequestException as e:
+                error = TransformerError(f"Transformer API request failed: {e}", status_code=502)
+            else:
+                if resp.ok:
+                    return self._predictions(resp, len(instances))
+                error = TransformerError(f"Transformer API error: {resp.text}", status_code=resp.status_code)
+                if resp.status_code not in RETRY_STATUS_CODES:
+                    raise error
+
+            if attempt >= self.max_retries:
+                raise error
+            time.sleep(random.uniform(0, self.backoff_seconds * 2 ** attempt))
+            attempt += 1
+
+    @staticmethod
+    def _predictions(resp, expected: int) -> List[Any]:
+        try:
+            body = resp.json()
+        except ValueError:
+            raise TransformerError("Transformer API returned invalid JSON.")
+        if not isinstance(body, dict):
+            raise TransformerError("Transformer API returned JSON that is not an object.")
+        preds = body.get("predictions", [])
+        if not isinstance(preds, list):
+            raise TransformerError("Transformer API returned predictions that are not a list.")
+        if not preds:
+            raise TransformerError("Transformer API returned no predictions.")
+        if len(preds) != expected:
+            raise TransformerError(f"Transformer API returned {len(preds)} predictions for {expected} instances.")
+        return preds
+
+
+_client: Optional[TransformerClient] = None
+_client_guard = threading.Lock()
+
+
+def get_transformer_client() -> TransformerClient:
+    """
+    Process-wide TransformerClient shared by the TransformerView requests
+    (backed by MockPredictor when TRANSFORMER_MOCK=1).
+    """
+    global _client
+    with _client_guard:
+        if _client is None:
+            _client = TransformerClient(session=MockPredictor() if USE_MOCK else None)
+        return _client
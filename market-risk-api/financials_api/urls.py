@@ -1,15 +1,35 @@
+import os
+
 from django.urls import path
 
 from financials_api.views.chatbot_views import ChatbotView
 from financials_api.views.financial_views import FinancialDataView
+from financials_api.views.screen_view import FinancialScreenView
 from financials_api.views.rag_view import RAGView
 from financials_api.views.pairs_view import PairTradingView
+from financials_api.views.pairs_sweep_view import PairSweepView
+from financials_api.views.pairs_monitor_view import PairsMonitorView
+from financials_api.views.pairs_walkforward_view import PairWalkForwardView
+from financials_api.views.pairs_scan_view import PairScanView
 from financials_api.views.transformer_view import TransformerView
+from financials_api.views.metrics_view import MetricsView
+
+# soros_backend/asgi.py sets ASYNC_VIEWS=1: under ASGI the RAG and pairs routes
+# are served by async views; under WSGI the DRF views are kept.
+if os.getenv("ASYNC_VIEWS", "0") == "1":
+    from financials_api.views.rag_async_view import RAGAsyncView as RAGView
+    from financials_api.views.pairs_async_view import PairTradingAsyncView as PairTradingView
 
 urlpatterns = [
+    path('financials/screen/', FinancialScreenView.as_view(), name='financial-screen'),  # Must precede the symbol route
     path('financials/<str:stock_symbol>/', FinancialDataView.as_view(), name='financial-data'),
     path('chatbot/', ChatbotView.as_view(), name='chatbot'), # Gemini endpoint
     path('ragbot/', RAGView.as_view(), name='ragbot'),    # RAG endpoint
     path('pairs/', PairTradingView.as_view(), name='pair-trading'),  # Pair trading backtest
+    path('pairs/sweep/', PairSweepView.as_view(), name='pair-sweep'),  # entryZ x exitZ x rollingWindow grid
+    path('pairs/walkforward/', PairWalkForwardView.as_view(), name='pair-walkforward'),  # Out-of-sample refit per fold
+    path('pairs/scan/', PairScanView.as_view(), name='pair-scan'),  # Latest universe cointegration scan
+    path('pairs/monitor/', PairsMonitorView.as_view(), name='pairs-monitor'),  # Live watchlist signals (SSE under ASGI)
     path('transformerbot/', TransformerView.as_view(), name='transformer-bot'),  # External transformer
+    path('metrics/', MetricsView.as_view(), name='metrics'),  # Prometheus stage latency histograms
 ]
@@ -0,0 +1,39 @@
+import json
+
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+
+class AsyncJSONView(View):
+    """
+    Base for the async (ASGI) variants of the API views. DRF's APIView has no
+    async support, so these are plain Django views that parse the JSON body
+    themselves and answer with JsonResponse, keeping the DRF views' payloads
+    and status codes. Like APIView, they are exempt from CSRF checks.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def parse_body(self, request):
+        """Return (data, error_response) for a JSON request body."""
+        if not request.body:
+            return {}, None
+        try:
+            data = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            return None, JsonResponse({"error": "Request body must be valid JSON."}, status=400)
+        if not isinstance(data, dict):
+            return None, JsonResponse({"error": "Request body must be a JSON object."}, status=400)
+        return data, None
+
+    @staticmethod
+    def json_response(data, status=200):
+        return JsonResponse(data, status=status, safe=False, json_dumps_params={"ensure_ascii": False})
+
+    @classmethod
+    def from_drf(cls, response):
+        """JsonResponse for an error Response returned by a shared DRF helper."""
+        return cls.json_response(response.data, status=response.status_code)
@@ -2,42 +2,36 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 import time
-import google.generativeai as genai
 from django.conf import settings
-import os
-
-# Load the Gemini key from env first, then from project-level secrets.py
-GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
-    try:
-        from buffet_backend import secrets  # sibling project package
-        GEMINI_API_KEY = getattr(secrets, 'GEMINI_API_KEY', None)
-    except ImportError:
-        print("Warning: secrets.py not found or GEMINI_API_KEY not set within it.")
-        GEMINI_API_KEY = None
+
+from ..answer_cache import get_answer_cache
+from ..llm_clients import get_llm_registry
+from ..sse import answer_events, sse_response, wants_stream
+from ..ticker_utils import extract_ticker
+
+CHAT_MODEL_NAME = 'gemini-2.0-flash'  # ('gemini-1.5-flash')
 
 class ChatbotView(APIView):
     """
     API View for the chatbot.
     Accepts a POST request with a user message, calls the Gemini API,
     and returns the AI's response, styled like George Soros.
+    With "stream": true the reply is sent as server-sent events.
     """
     def post(self, request):
         """
         Handles POST requests to /api/chatbot/
         """
-        # --- Get API Key ---
-        api_key = GEMINI_API_KEY or os.environ.get('GEMINI_API_KEY')
-
-        if not api_key:
+        # --- Get the shared Gemini model (configured once per process) ---
+        registry = get_llm_registry()
+        if not registry.available:
             return Response(
                 {"error": "Gemini API key not configured."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        # --- Configure Gemini ---
         try:
-            genai.configure(api_key=api_key)
+            model = registry.model(CHAT_MODEL_NAME)
         except Exception as e:
              print(f"Error configuring Gemini: {e}")
              return Response(
@@ -63,10 +57,22 @@ class ChatbotView(APIView):
             "George Soros Style Answer:"
         )
 
+        # --- Answer Cache (same prompt, or a similar question about the same ticker) ---
+        cache = get_answer_cache("chatbot")
+        ticker = extract_ticker(user_message)
+        tickers = (ticker,) if ticker else ()
+        cached_reply = cache.get(prompt, question=user_message, tickers=tickers) if cache is not None else None
+
+        # --- Streaming Mode (server-sent events) ---
+        if wants_stream(request):
+            chunks = [cached_reply] if cached_reply is not None else self._stream_reply(model, prompt, cache, user_message, tickers)
+            return sse_response(request, answer_events(chunks))
+
+        if cached_reply is not None:
+            return Response({"reply": cached_reply}, status=status.HTTP_200_OK)
+
         # --- Call Gemini API ---
         try:
-            # ('gemini-1.5-flash')
-            model = genai.GenerativeModel('gemini-2.0-flash')
             response = model.generate_content(prompt)
 
             # Extract the text response
@@ -96,8 +102,24 @@ class ChatbotView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        if cache is not None and bot_reply_text:
+            cache.put(prompt, bot_reply_text, question=user_message, tickers=tickers)
+
         # --- Return Successful Response ---
         bot_reply = {
             "reply": bot_reply_text
         }
         return Response(bot_reply, status=status.HTTP_200_OK)
+
+    def _stream_reply(self, model, prompt, cache, user_message, tickers):
+        """Yield Gemini's reply chunk by chunk; the full reply is cached at the end."""
+        parts = []
+        for chunk in model.generate_content(prompt, stream=True):
+            text = chunk.text  # raises for blocked responses; reported as an SSE error event
+            if text:
+                parts.append(text)
+                yield text
+
+        reply = "".join(parts)
+        if cache is not None and reply:
+            cache.put(prompt, reply, question=user_message, tickers=tickers)
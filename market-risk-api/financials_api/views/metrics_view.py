@@ -0,0 +1,47 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..llm_clients import get_llm_registry
+from ..tracing import escape_label, get_stage_metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (metric, snapshot key, type, help) for the per-model LLM counters
+LLM_METRICS = [
+    ("llm_calls_total", "calls", "counter", "LLM calls."),
+    ("llm_errors_total", "errors", "counter", "LLM calls that raised."),
+    ("llm_latency_seconds_total", "latencyTotalSeconds", "counter", "Total LLM call latency."),
+    ("llm_latency_max_seconds", "latencyMaxSeconds", "gauge", "Slowest LLM call."),
+    ("llm_prompt_tokens_total", "promptTokens", "counter", "Prompt tokens reported by the model."),
+    ("llm_output_tokens_total", "outputTokens", "counter", "Output tokens reported by the model."),
+]
+
+
+def llm_prometheus_lines(models: dict) -> list:
+    lines = []
+    for metric, key, kind, help_text in LLM_METRICS:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for name, snapshot in sorted(models.items()):
+            value = snapshot.get(key)
+            if value is not None:
+                lines.append(f'{metric}{{model="{escape_label(name)}"}} {value!r}')
+    return lines
+
+
+class MetricsView(APIView):
+    """
+    Prometheus scrape endpoint: per-stage latency histograms from the tracing
+    spans (stage_duration_seconds) and the LLM clients' call counters.
+    ?format=json returns the same data with estimated p50/p90/p99 per stage.
+    """
+
+    def get(self, request):
+        stages = get_stage_metrics()
+        models = get_llm_registry().metrics()
+        if request.query_params.get("format") == "json":
+            return Response({"stages": stages.summary(), "llm": models}, status=status.HTTP_200_OK)
+
+        lines = stages.prometheus_lines() + llm_prometheus_lines(models)
+        return HttpResponse("\n".join(lines) + "\n", content_type=PROMETHEUS_CONTENT_TYPE)
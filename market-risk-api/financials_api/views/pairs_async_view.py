@@ -0,0 +1,40 @@
+from ..concurrency import run_cpu, run_io
+from .async_base import AsyncJSONView
+from .pairs_view import PairTradingMixin
+
+
+class PairTradingAsyncView(PairTradingMixin, AsyncJSONView):
+    """
+    Async (ASGI) variant of PairTradingView with the same request and response.
+    Price loading runs on the I/O pool, the cointegration fit and backtest on
+    the CPU pool, and the Gemini insight is awaited instead of blocking a thread.
+    """
+
+    async def post(self, request):
+        data, error = self.parse_body(request)
+        if error is not None:
+            return error
+
+        params, error = self._parse_request(data)
+        if error is not None:
+            return self.from_drf(error)
+
+        series_a, series_b, params["start"], error = await run_io(
+            self._load_aligned_prices, params["symbol_a"], params["symbol_b"], params["start"], params["end"]
+        )
+        if error is not None:
+            return self.from_drf(error)
+
+        analysis = await run_cpu(self._analyze, params, series_a, series_b)
+        result = await run_cpu(self._result, analysis, await self._insight_async(analysis))
+        return self.json_response(result)
+
+    async def _insight_async(self, analysis):
+        try:
+            model = self._insight_model()
+            if model is None:
+                return None
+            resp = await model.generate_content_async(self._insight_prompt(analysis))
+            return resp.text.strip() if resp and hasattr(resp, "text") else None
+        except Exception:
+            return None
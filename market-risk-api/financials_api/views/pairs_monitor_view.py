@@ -0,0 +1,52 @@
+import asyncio
+import logging
+
+from django.core.handlers.asgi import ASGIRequest
+
+from ..concurrency import run_io
+from ..pairs_monitor import get_pairs_monitor
+from ..sse import async_sse_response, sse_event, wants_stream
+from .async_base import AsyncJSONView
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+
+
+class PairsMonitorView(AsyncJSONView):
+    """
+    Live pairs monitor (financials_api/pairs_monitor.py). GET returns a JSON
+    snapshot of every watched pair and the recent signals; with ?stream=1 (or
+    Accept: text/event-stream) it holds the connection open and sends a
+    `snapshot` event, then one `signal` event per entry/exit crossing.
+    Streaming needs the ASGI app; under WSGI the snapshot is returned.
+    """
+
+    async def get(self, request):
+        try:
+            monitor = await run_io(get_pairs_monitor)
+        except Exception as e:
+            logger.exception("Error starting pairs monitor")
+            return self.json_response({"error": f"Pairs monitor could not start: {e}"}, status=503)
+        if monitor is None:
+            return self.json_response({"error": "Pairs monitor is not configured. Set PAIRS_MONITOR_WATCHLIST."}, status=503)
+
+        if wants_stream(request) and isinstance(request, ASGIRequest):
+            return async_sse_response(self._events(monitor))
+        return self.json_response(monitor.snapshot())
+
+    @staticmethod
+    async def _events(monitor):
+        subscription = monitor.broadcaster.subscribe(asyncio.get_running_loop())
+        try:
+            yield sse_event(monitor.snapshot(), event="snapshot")
+            while True:
+                try:
+                    signal = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_event(signal, event="signal")
+        finally:
+            # Also runs when the client disconnects and Django cancels the stream
+            monitor.broadcaster.unsubscribe(subscription)
@@ -0,0 +1,61 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..models import PairScan
+
+
+class PairScanView(APIView):
+    """
+    Returns the ranked table from the latest (or a given) cointegration scan.
+    Scans are produced offline with `python manage.py scan_pairs`.
+    """
+
+    def get(self, request):
+        scan_id = request.query_params.get("scan")
+        try:
+            scan_id = int(scan_id) if scan_id else None
+            limit = int(request.query_params.get("limit", 50))
+            max_p = float(request.query_params.get("maxPValue", 1.0))
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "scan and limit must be integers and maxPValue a number."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        scans = PairScan.objects.all()
+        scan = scans.filter(pk=scan_id).first() if scan_id is not None else scans.first()
+        if scan is None:
+            return Response(
+                {"error": "No pair scan found.", "suggestion": "Run `python manage.py scan_pairs` to build one."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        results = scan.results.filter(p_value__lte=max_p).order_by("rank")
+        if limit > 0:
+            results = results[:limit]
+
+        return Response(
+            {
+                "scan": scan.pk,
+                "createdAt": scan.created_at.isoformat(),
+                "dateRange": {"start": str(scan.start_date), "end": str(scan.end_date)},
+                "universe": scan.universe,
+                "minCorrelation": scan.min_correlation,
+                "pairsTested": scan.pairs_tested,
+                "results": [
+                    {
+                        "rank": r.rank,
+                        "symbolA": r.symbol_a,
+                        "symbolB": r.symbol_b,
+                        "correlation": r.correlation,
+                        "pValue": r.p_value,
+                        "testStatistic": r.test_statistic,
+                        "hedgeRatio": r.hedge_ratio,
+                        "observations": r.observations,
+                    }
+                    for r in results
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
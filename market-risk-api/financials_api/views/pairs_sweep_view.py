@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from .pairs_view import PairDataMixin, _safe_num, _threshold_error
+from ..pairs_backtest import sweep_grid
+
+DEFAULT_ENTRY_Z = [0.75, 1.0, 1.5, 2.0]
+DEFAULT_EXIT_Z = [0.0, 0.25, 0.5]
+DEFAULT_ROLLING_WINDOWS = [20, 40, 60, 90]
+MAX_COMBINATIONS = 5000
+SORT_KEYS = {"sharpe", "cumulativeReturn", "trades"}
+
+
+def _as_list(value, default, cast):
+    """Accept a single value, a list, or a comma-separated string."""
+    if value is None or value == "":
+        return list(default)
+    if isinstance(value, str):
+        value = [v for v in value.split(",") if v.strip()]
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+    return sorted({cast(v) for v in value})
+
+
+class PairSweepView(PairDataMixin, APIView):
+    """
+    Evaluates a grid of entryZ x exitZ x rollingWindow settings for one pair.
+    Prices, hedge ratio and cointegration are computed once for the whole grid.
+    """
+
+    def post(self, request):
+        symbol_a = request.data.get("symbolA", "").upper().strip()
+        symbol_b = request.data.get("symbolB", "").upper().strip()
+        if not symbol_a or not symbol_b:
+            return Response({"error": "Both symbolA and symbolB are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            entry_zs = _as_list(request.data.get("entryZ"), DEFAULT_ENTRY_Z, float)
+            exit_zs = _as_list(request.data.get("exitZ"), DEFAULT_EXIT_Z, float)
+            windows = _as_list(request.data.get("rollingWindow"), DEFAULT_ROLLING_WINDOWS, int)
+        except (TypeError, ValueError):
+            return Response({"error": "entryZ, exitZ and rollingWindow must be numbers or lists of numbers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not entry_zs or not exit_zs or not windows:
+            return Response({"error": "entryZ, exitZ and rollingWindow lists must not be empty."}, status=status.HTTP_400_BAD_REQUEST)
+        error = _threshold_error(entry_zs, exit_zs)
+        if error is not None:
+            return error
+        if any(w < 2 for w in windows):
+            return Response({"error": "rollingWindow values must be at least 2."}, status=status.HTTP_400_BAD_REQUEST)
+
+        combinations = len(entry_zs) * len(exit_zs) * len(windows)
+        if combinations > MAX_COMBINATIONS:
+            return Response(
+                {"error": f"Grid has {combinations} combinations; the limit is {MAX_COMBINATIONS}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        sort_by = request.data.get("sortBy", "sharpe")
+        if sort_by not in SORT_KEYS:
+            return Response({"error": f"sortBy must be one of: {', '.join(sorted(SORT_KEYS))}."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.data.get("limit", 50))
+        except (TypeError, ValueError):
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = pd.Timestamp.today().normalize()
+        start, end, error = self._parse_date_range(request.data.get("startDate"), request.data.get("endDate"), today)
+        if error is not None:
+            return error
+
+        series_a, series_b, start, error = self._load_aligned_prices(symbol_a, symbol_b, start, end)
+        if error is not None:
+            return error
+
+        beta, p_value, cointegration_stat = self._fit_pair(series_a, series_b)
+
+        rows = sweep_grid(series_a, series_b, beta, entry_zs, exit_zs, windows)
+        for row in rows:
+            if not np.isfinite(row["cumulativeReturn"]):
+                row["cumulativeReturn"] = None
+
+        # Rank best-first; combinations without a value for the sort key go last
+        rows.sort(key=lambda r: (r[sort_by] is None, -(r[sort_by] or 0)))
+        for rank, row in enumerate(rows, start=1):
+            row["rank"] = rank
+
+        result = {
+            "symbols": {"A": symbol_a, "B": symbol_b},
+            "dateRange": {"start": str(start), "end": str(end)},
+            "observations": len(series_a),
+            "hedgeRatio": _safe_num(beta),
+            "cointegrationPValue": _safe_num(p_value),
+            "cointegrationTestStatistic": _safe_num(cointegration_stat),
+            "combinations": combinations,
+            "sortBy": sort_by,
+            "results": rows[:limit] if limit > 0 else rows,
+        }
+        return Response(result, status=status.HTTP_200_OK)
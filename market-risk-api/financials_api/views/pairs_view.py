@@ -1,26 +1,14 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-import os
 
-try:
-    import google.generativeai as genai
-    # env first, fallback to project secrets
-    GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-    if not GEMINI_API_KEY:
-        try:
-            from buffet_backend import secrets
-            GEMINI_API_KEY = getattr(secrets, "GEMINI_API_KEY", None)
-        except Exception:
-            GEMINI_API_KEY = None
-    if GEMINI_API_KEY:
-        genai.configure(api_key=GEMINI_API_KEY)
-except Exception:
-    genai = None
-    GEMINI_API_KEY = None
+from ..llm_clients import get_llm_registry
+from ..price_store import get_price_store
+from ..pairs_backtest import run_backtest, spread_records, zscore_records, pnl_records, price_records
+
+INSIGHT_MODEL_NAME = 'gemini-2.0-flash'
 
 try:
     from statsmodels.tsa.stattools import coint
@@ -33,26 +21,13 @@ except Exception:
     yf_exceptions = None
 
 
-class PairTradingView(APIView):
+class PairDataMixin:
     """
-    Runs a quick cointegration check and simple mean-reversion backtest
-    for two symbols over a given date range.
+    Shared request parsing, price loading and hedge-ratio fitting for the pairs views.
+    Each loader returns an error Response as its last element instead of raising.
     """
 
-    def post(self, request):
-        symbol_a = request.data.get("symbolA", "").upper().strip()
-        symbol_b = request.data.get("symbolB", "").upper().strip()
-        start = request.data.get("startDate")
-        end = request.data.get("endDate")
-        entry_z = float(request.data.get("entryZ", 1.0))
-        exit_z = float(request.data.get("exitZ", 0.25))
-        rolling_window = int(request.data.get("rollingWindow", 60))
-
-        if not symbol_a or not symbol_b:
-            return Response({"error": "Both symbolA and symbolB are required."}, status=status.HTTP_400_BAD_REQUEST)
-
-        today = pd.Timestamp.today().normalize()
-
+    def _parse_date_range(self, start, end, today):
         # Default to last 1Y if no dates provided
         if not start or not end:
             end = today
@@ -62,78 +37,55 @@ class PairTradingView(APIView):
                 start = pd.to_datetime(start).normalize()
                 end = pd.to_datetime(end).normalize()
             except Exception:
-                return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+                return None, None, Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
 
             # Clamp future dates to today
             if end > today:
                 end = today
             if start > end:
                 start = end - pd.Timedelta(days=365)
-
+        return start, end, None
+
+    def _load_aligned_prices(self, symbol_a, symbol_b, start, end):
+        """
+        Return (series_a, series_b, start, error_response) with both series on their common trading days.
+        start may move back 60 days when the fallback window is used.
+        """
+        store = get_price_store()
         try:
-            raw = yf.download(
-                [symbol_a, symbol_b],
-                start=start,
-                end=end,
-                auto_adjust=False,  # keep Adj Close
-                progress=False,
-            )
-            if raw is None or raw.empty:
-                return Response(
+            prices = store.get_many([symbol_a, symbol_b], start, end, field="Adj Close")
+            if prices is None or prices.empty:
+                return None, None, start, Response(
                     {
                         "error": "Price data unavailable (likely rate limit from data source).",
                         "suggestion": "Wait a few minutes and retry. Reduce rapid repeated requests.",
                     },
                     status=status.HTTP_429_TOO_MANY_REQUESTS,
                 )
-            # yfinance can return different shapes; normalize to a 2-column DataFrame
-            if isinstance(raw.columns, pd.MultiIndex):
-                prices = raw.get("Adj Close")
-            elif "Adj Close" in raw:
-                prices = raw["Adj Close"]
-            else:
-                prices = raw
-            if isinstance(prices, pd.Series):
-                prices = prices.to_frame()
         except Exception as e:
             msg = str(e)
             if "Too Many Requests" in msg or (yf_exceptions and isinstance(e, getattr(yf_exceptions, "YFRateLimitError", ()))):
-                return Response(
+                return None, None, start, Response(
                     {
                         "error": "Rate limited by data provider (yfinance).",
                         "suggestion": "Wait a few minutes or reduce repeated requests. Consider caching or widening the interval.",
                     },
                     status=status.HTTP_429_TOO_MANY_REQUESTS,
                 )
-            return Response({"error": f"Failed to download prices: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return None, None, start, Response({"error": f"Failed to download prices: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # If nothing came back, try a wider window as a fallback
-        fallback_used = False
-        if prices is None or prices.empty or prices.isna().all().any():
+        # If one symbol came back empty, try a wider window as a fallback.
+        # The store already holds [start, end), so only the extra 60 days are fetched.
+        if prices.isna().all().any() or len(prices.columns) < 2:
             try:
                 fallback_start = start - pd.Timedelta(days=60)
-                raw_fb = yf.download(
-                    [symbol_a, symbol_b],
-                    start=fallback_start,
-                    end=end,
-                    auto_adjust=False,
-                    progress=False,
-                )
-                if isinstance(raw_fb.columns, pd.MultiIndex):
-                    prices = raw_fb.get("Adj Close")
-                elif "Adj Close" in raw_fb:
-                    prices = raw_fb["Adj Close"]
-                else:
-                    prices = raw_fb
-                if isinstance(prices, pd.Series):
-                    prices = prices.to_frame()
-                fallback_used = True
+                prices = store.get_many([symbol_a, symbol_b], fallback_start, end, field="Adj Close")
                 start = fallback_start
             except Exception:
                 prices = None
 
         if prices is None or prices.empty or prices.isna().all().any():
-            return Response(
+            return None, None, start, Response(
                 {
                     "error": "Price data unavailable for one or both symbols in the chosen window.",
                     "suggestion": "Try a broader lookback (e.g., past 3–6 months), avoid illiquid symbols, and allow a few minutes if rate limited."
@@ -144,7 +96,7 @@ class PairTradingView(APIView):
         # Ensure both tickers are present after download
         missing_symbols = [s for s in [symbol_a, symbol_b] if s not in prices.columns]
         if missing_symbols:
-            return Response(
+            return None, None, start, Response(
                 {"error": f"Missing price data for: {', '.join(missing_symbols)}. Please check the symbols or try a different date range."},
                 status=status.HTTP_404_NOT_FOUND
             )
@@ -154,22 +106,15 @@ class PairTradingView(APIView):
 
         common_index = series_a.index.intersection(series_b.index)
         if common_index.empty:
-            return Response({"error": "No overlapping trading days for the selected symbols."}, status=status.HTTP_404_NOT_FOUND)
+            return None, None, start, Response({"error": "No overlapping trading days for the selected symbols."}, status=status.HTTP_404_NOT_FOUND)
 
-        series_a = series_a.loc[common_index]
-        series_b = series_b.loc[common_index]
-
-        # Suggest a fuller window if overlap is thin
-        suggest_start = None
-        suggest_end = None
-        suggestion_reason = None
-        if not common_index.empty:
-            span_days = (common_index.max() - common_index.min()).days
-            if span_days < 180:
-                suggest_end = min(today, end)
-                suggest_start = suggest_end - pd.Timedelta(days=365)
-                suggestion_reason = "Tight overlap detected; try a 1Y lookback for a more stable hedge ratio."
+        return series_a.loc[common_index], series_b.loc[common_index], start, None
 
+    def _fit_pair(self, series_a, series_b):
+        """
+        Hedge ratio (A ~ beta * B) plus Engle-Granger cointegration on log prices.
+        Returns (beta, p_value, test_statistic); the test values are None when unavailable.
+        """
         # Hedge ratio via simple linear fit (A ~ beta * B)
         beta, _ = np.polyfit(series_b.values, series_a.values, 1)
 
@@ -189,139 +134,167 @@ class PairTradingView(APIView):
                 cointegration_stat = float(test_stat)
             except Exception:
                 p_value = None
-        else:
-            p_value = None
-
-        spread = series_a - beta * series_b
-        # Rolling z-score to adapt to regime shifts
-        rolling_mean = spread.rolling(window=rolling_window, min_periods=max(2, rolling_window // 2)).mean()
-        rolling_std = spread.rolling(window=rolling_window, min_periods=max(2, rolling_window // 2)).std().replace(0, np.nan)
-        zscore = (spread - rolling_mean) / (rolling_std.fillna(rolling_std.mean() or 1e-9))
-
-        returns_a = series_a.pct_change().fillna(0.0)
-        returns_b = series_b.pct_change().fillna(0.0)
-
-        position = 0  # 1 = long spread (long A/short B), -1 = short spread
-        daily_pnl = []
-        trades = 0
-
-        z_history = []
-        pnl_series = []
-        cumulative_ret = 1.0
-
-        spread_series = []
-        entry_upper = rolling_mean + entry_z * rolling_std
-        entry_lower = rolling_mean - entry_z * rolling_std
-        exit_upper = rolling_mean + exit_z * rolling_std
-        exit_lower = rolling_mean - exit_z * rolling_std
-
-        for idx in spread.index:
-            spread_series.append({
-                "date": str(idx.date()),
-                "spread": float(spread.loc[idx]) if pd.notna(spread.loc[idx]) else None,
-                "mean": float(rolling_mean.loc[idx]) if pd.notna(rolling_mean.loc[idx]) else None,
-                "entryUpper": float(entry_upper.loc[idx]) if pd.notna(entry_upper.loc[idx]) else None,
-                "entryLower": float(entry_lower.loc[idx]) if pd.notna(entry_lower.loc[idx]) else None,
-                "exitUpper": float(exit_upper.loc[idx]) if pd.notna(exit_upper.loc[idx]) else None,
-                "exitLower": float(exit_lower.loc[idx]) if pd.notna(exit_lower.loc[idx]) else None,
-            })
-
-        for idx, (z, ret_a, ret_b) in enumerate(zip(zscore.iloc[1:], returns_a.iloc[1:], returns_b.iloc[1:])):
-            z_history.append({"date": str(zscore.index[idx + 1].date()), "z": float(z) if pd.notna(z) else None})
-            if position == 0:
-                if pd.notna(z) and z > entry_z:
-                    position = -1  # short spread: short A, long B
-                    trades += 1
-                elif pd.notna(z) and z < -entry_z:
-                    position = 1   # long spread: long A, short B
-                    trades += 1
-            elif pd.notna(z) and abs(z) < exit_z:
-                position = 0
-
-            pnl = position * (ret_a - beta * ret_b)
-            daily_pnl.append(pnl)
-            cumulative_ret *= (1 + pnl)
-            pnl_series.append({"date": str(zscore.index[idx + 1].date()), "cumulativeReturn": float(cumulative_ret - 1)})
-
-        cumulative_return = float(cumulative_ret - 1) if daily_pnl else 0.0
-
-        gemini_insight = None
-        if genai and GEMINI_API_KEY:
-            try:
-                prompt = (
-                    "You are George Soros. Given a pairs trade backtest summary, suggest if adjacent date windows "
-                    "around the user selection might be better. Keep it to 3 bullets and one action. "
-                    "If there is little info, say so briefly. Also propose a potentially better strategy tweak versus the one used "
-                    "(entry/exit z thresholds, rolling window length, or posture: cut/press/hedge/wait) based on the data provided. "
-                    "Note: the only user-adjustable variables are entry Z, exit Z, rolling window, the two symbols, and the date range (hedge ratio is computed, not user-managed).\n\n"
-                    "Make sure your tone and content reflect George Soros's own investment philosophy, especially for pairs trading and reflexivity.\n\n"
-                    f"Symbols: {symbol_a} vs {symbol_b}\n"
-                    f"Date range: {start.date()} to {end.date()}\n"
-                    f"Hedge ratio (A~beta*B): {beta:.4f}\n"
-                    f"Latest z-score: {zscore.iloc[-1] if not zscore.empty else 'N/A'}\n"
-                    f"Trades: {trades}\n"
-                    f"Cumulative return: {cumulative_return:.4f}\n"
-                    f"Entry Z: {entry_z}, Exit Z: {exit_z}, Rolling window: {rolling_window}\n"
-                    f"Overlap days: {(common_index.max() - common_index.min()).days if not common_index.empty else 'N/A'}\n"
-                    f"Suggested alt range (internal calc): {suggest_start.date() if suggest_start is not None else 'N/A'} to {suggest_end.date() if suggest_end is not None else 'N/A'}\n\n"
-                    "Output format:\n"
-                    "- Insight 1\n"
-                    "- Insight 2\n"
-                    "- Insight 3\n"
-                    "- Strategy tweak: <what to change and why>\n"
-                    "Action: cut risk / press / hedge / wait\n"
-                )
-                model = genai.GenerativeModel('gemini-2.0-flash')
-                resp = model.generate_content(prompt)
-                gemini_insight = resp.text.strip() if resp and hasattr(resp, "text") else None
-            except Exception:
-                gemini_insight = None
+        return beta, p_value, cointegration_stat
 
-        def safe_num(val):
-            try:
-                f = float(val)
-                if np.isnan(f) or np.isinf(f):
-                    return None
-                return f
-            except Exception:
+
+def _safe_num(val):
+    try:
+        f = float(val)
+        if np.isnan(f) or np.isinf(f):
+            return None
+        return f
+    except Exception:
+        return None
+
+
+def _threshold_error(entry_zs, exit_zs):
+    """
+    400 response unless every entryZ is positive and every exitZ is
+    non-negative and below every entryZ it is combined with; otherwise None.
+    """
+    if min(entry_zs) <= 0 or min(exit_zs) < 0:
+        return Response({"error": "entryZ must be positive and exitZ non-negative."}, status=status.HTTP_400_BAD_REQUEST)
+    if max(exit_zs) >= min(entry_zs):
+        return Response({"error": "exitZ must be below entryZ."}, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+
+class PairTradingMixin(PairDataMixin):
+    """
+    The steps of a pair-trading request, shared by PairTradingView and its
+    async counterpart (pairs_async_view.py), which run them on thread pools.
+    """
+
+    def _parse_request(self, data):
+        """Return (params, error_response)."""
+        params = {
+            "symbol_a": data.get("symbolA", "").upper().strip(),
+            "symbol_b": data.get("symbolB", "").upper().strip(),
+            "entry_z": float(data.get("entryZ", 1.0)),
+            "exit_z": float(data.get("exitZ", 0.25)),
+            "rolling_window": int(data.get("rollingWindow", 60)),
+        }
+
+        if not params["symbol_a"] or not params["symbol_b"]:
+            return None, Response({"error": "Both symbolA and symbolB are required."}, status=status.HTTP_400_BAD_REQUEST)
+        error = _threshold_error([params["entry_z"]], [params["exit_z"]])
+        if error is not None:
+            return None, error
+
+        params["today"] = pd.Timestamp.today().normalize()
+        start, end, error = self._parse_date_range(data.get("startDate"), data.get("endDate"), params["today"])
+        if error is not None:
+            return None, error
+        params["start"], params["end"] = start, end
+        return params, None
+
+    def _analyze(self, params, series_a, series_b):
+        """CPU-bound part: window suggestion, hedge ratio, cointegration and backtest."""
+        common_index = series_a.index
+
+        # Suggest a fuller window if overlap is thin
+        suggest_start = None
+        suggest_end = None
+        suggestion_reason = None
+        if not common_index.empty:
+            span_days = (common_index.max() - common_index.min()).days
+            if span_days < 180:
+                suggest_end = min(params["today"], params["end"])
+                suggest_start = suggest_end - pd.Timedelta(days=365)
+                suggestion_reason = "Tight overlap detected; try a 1Y lookback for a more stable hedge ratio."
+
+        beta, p_value, cointegration_stat = self._fit_pair(series_a, series_b)
+
+        # Vectorized backtest: rolling z-score, position state machine and compounded PnL
+        backtest = run_backtest(series_a, series_b, beta, params["entry_z"], params["exit_z"], params["rolling_window"])
+
+        return {
+            **params,
+            "series_a": series_a,
+            "series_b": series_b,
+            "beta": beta,
+            "p_value": p_value,
+            "cointegration_stat": cointegration_stat,
+            "backtest": backtest,
+            "suggest_start": suggest_start,
+            "suggest_end": suggest_end,
+            "suggestion_reason": suggestion_reason,
+        }
+
+    def _insight_prompt(self, analysis):
+        common_index = analysis["series_a"].index
+        backtest = analysis["backtest"]
+        latest_z = backtest.latest_zscore
+        suggest_start, suggest_end = analysis["suggest_start"], analysis["suggest_end"]
+        return (
+            "You are George Soros. Given a pairs trade backtest summary, suggest if adjacent date windows "
+            "around the user selection might be better. Keep it to 3 bullets and one action. "
+            "If there is little info, say so briefly. Also propose a potentially better strategy tweak versus the one used "
+            "(entry/exit z thresholds, rolling window length, or posture: cut/press/hedge/wait) based on the data provided. "
+            "Note: the only user-adjustable variables are entry Z, exit Z, rolling window, the two symbols, and the date range (hedge ratio is computed, not user-managed).\n\n"
+            "Make sure your tone and content reflect George Soros's own investment philosophy, especially for pairs trading and reflexivity.\n\n"
+            f"Symbols: {analysis['symbol_a']} vs {analysis['symbol_b']}\n"
+            f"Date range: {analysis['start'].date()} to {analysis['end'].date()}\n"
+            f"Hedge ratio (A~beta*B): {analysis['beta']:.4f}\n"
+            f"Latest z-score: {latest_z if latest_z is not None else 'N/A'}\n"
+            f"Trades: {backtest.trades}\n"
+            f"Cumulative return: {backtest.cumulative_return:.4f}\n"
+            f"Entry Z: {analysis['entry_z']}, Exit Z: {analysis['exit_z']}, Rolling window: {analysis['rolling_window']}\n"
+            f"Overlap days: {(common_index.max() - common_index.min()).days if not common_index.empty else 'N/A'}\n"
+            f"Suggested alt range (internal calc): {suggest_start.date() if suggest_start is not None else 'N/A'} to {suggest_end.date() if suggest_end is not None else 'N/A'}\n\n"
+            "Output format:\n"
+            "- Insight 1\n"
+            "- Insight 2\n"
+            "- Insight 3\n"
+            "- Strategy tweak: <what to change and why>\n"
+            "Action: cut risk / press / hedge / wait\n"
+        )
+
+    def _insight_model(self):
+        """Shared Gemini handle for the insight, or None when Gemini is not configured."""
+        registry = get_llm_registry()
+        return registry.model(INSIGHT_MODEL_NAME) if registry.available else None
+
+    def _insight(self, analysis):
+        try:
+            model = self._insight_model()
+            if model is None:
                 return None
+            resp = model.generate_content(self._insight_prompt(analysis))
+            return resp.text.strip() if resp and hasattr(resp, "text") else None
+        except Exception:
+            return None
 
+    def _result(self, analysis, gemini_insight=None):
+        backtest = analysis["backtest"]
+        p_value = analysis["p_value"]
+        entry_z, exit_z = analysis["entry_z"], analysis["exit_z"]
         result = {
-            "symbols": {"A": symbol_a, "B": symbol_b},
-            "dateRange": {"start": str(start), "end": str(end)},
-            "hedgeRatio": safe_num(beta),
-            "cointegrationPValue": safe_num(p_value),
-            "cointegrationTestStatistic": safe_num(cointegration_stat),
+            "symbols": {"A": analysis["symbol_a"], "B": analysis["symbol_b"]},
+            "dateRange": {"start": str(analysis["start"]), "end": str(analysis["end"])},
+            "hedgeRatio": _safe_num(analysis["beta"]),
+            "cointegrationPValue": _safe_num(p_value),
+            "cointegrationTestStatistic": _safe_num(analysis["cointegration_stat"]),
             "cointegrationInterpretation": (
                 "✅ p < 0.05: cointegrated (reject H₀ of no cointegration)" if p_value is not None and p_value < 0.05 else
                 "❌ p ≥ 0.05: not cointegrated (fail to reject H₀)" if p_value is not None else
                 "Cointegration test unavailable (need statsmodels + sufficient data)"
             ),
-            "latestZScore": safe_num(zscore.iloc[-1]) if not zscore.empty else None,
-            "trades": trades,
-            "cumulativeReturn": safe_num(cumulative_return),
+            "latestZScore": _safe_num(backtest.latest_zscore),
+            "trades": backtest.trades,
+            "cumulativeReturn": _safe_num(backtest.cumulative_return),
             "entryZ": entry_z,
             "exitZ": exit_z,
-            "rollingWindow": rolling_window,
-            "zHistory": [
-                {"date": item["date"], "z": safe_num(item["z"])}
-                for item in z_history[-200:]
-            ],
-            "spreadSeries": spread_series[-300:],  # for plotting spread + bands
-            "pnlSeries": pnl_series[-300:],        # for plotting cumulative PnL
-            "priceSeries": [
-                {
-                    "date": str(ts.date()),
-                    "priceA": safe_num(series_a.loc[ts]),
-                    "priceB": safe_num(series_b.loc[ts]),
-                }
-                for ts in series_a.index[-300:]
-            ],
+            "rollingWindow": analysis["rolling_window"],
+            "zHistory": zscore_records(backtest, tail=200),
+            "spreadSeries": spread_records(backtest, entry_z, exit_z, tail=300),  # for plotting spread + bands
+            "pnlSeries": pnl_records(backtest, tail=300),        # for plotting cumulative PnL
+            "priceSeries": price_records(analysis["series_a"], analysis["series_b"], tail=300),
         }
 
-        if suggestion_reason:
-            result["suggestedRange"] = {"start": str(suggest_start.date()), "end": str(suggest_end.date())}
-            result["suggestionReason"] = suggestion_reason
+        if analysis["suggestion_reason"]:
+            result["suggestedRange"] = {"start": str(analysis["suggest_start"].date()), "end": str(analysis["suggest_end"].date())}
+            result["suggestionReason"] = analysis["suggestion_reason"]
         if gemini_insight:
             # Present as Soros insight
             result["georgeSorosInsight"] = gemini_insight
@@ -330,5 +303,25 @@ class PairTradingView(APIView):
                 if line.lower().startswith("strategy tweak:"):
                     result["strategyTweak"] = line.split(":", 1)[1].strip()
                     break
+        return result
+
+
+class PairTradingView(PairTradingMixin, APIView):
+    """
+    Runs a quick cointegration check and simple mean-reversion backtest
+    for two symbols over a given date range.
+    """
 
-        return Response(result, status=status.HTTP_200_OK)
+    def post(self, request):
+        params, error = self._parse_request(request.data)
+        if error is not None:
+            return error
+
+        series_a, series_b, params["start"], error = self._load_aligned_prices(
+            params["symbol_a"], params["symbol_b"], params["start"], params["end"]
+        )
+        if error is not None:
+            return error
+
+        analysis = self._analyze(params, series_a, series_b)
+        return Response(self._result(analysis, self._insight(analysis)), status=status.HTTP_200_OK)
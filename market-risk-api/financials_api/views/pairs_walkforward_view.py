@@ -0,0 +1,111 @@
+import pandas as pd
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from .pairs_view import PairDataMixin, _safe_num, _threshold_error
+from ..pairs_backtest import _dates, _records, sharpe_ratio
+from ..pairs_walkforward import MIN_TRAIN_SIZE, walk_forward
+
+DEFAULT_TRAIN_SIZE = 252  # one year of trading days
+DEFAULT_TEST_SIZE = 63  # one quarter
+
+
+def _as_bool(value, default):
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.lower() in {"1", "true", "yes"}
+    return bool(value)
+
+
+class PairWalkForwardView(PairDataMixin, APIView):
+    """
+    Walk-forward (rolling-origin) backtest for one pair: the hedge ratio and,
+    optionally, the cointegration test are refit on each training window and
+    only the following test window is traded. Folds run across a process pool.
+    """
+
+    def post(self, request):
+        data = request.data
+        symbol_a = data.get("symbolA", "").upper().strip()
+        symbol_b = data.get("symbolB", "").upper().strip()
+        if not symbol_a or not symbol_b:
+            return Response({"error": "Both symbolA and symbolB are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            entry_z = float(data.get("entryZ", 1.0))
+            exit_z = float(data.get("exitZ", 0.25))
+            rolling_window = int(data.get("rollingWindow", 60))
+            train_size = int(data.get("trainSize", DEFAULT_TRAIN_SIZE))
+            test_size = int(data.get("testSize", DEFAULT_TEST_SIZE))
+            max_p_value = float(data.get("maxPValue", 0.05))
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "entryZ, exitZ, rollingWindow, trainSize, testSize and maxPValue must be numbers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if rolling_window < 2 or train_size < MIN_TRAIN_SIZE or test_size < 1:
+            return Response(
+                {"error": f"rollingWindow must be at least 2, trainSize at least {MIN_TRAIN_SIZE} and testSize at least 1."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        error = _threshold_error([entry_z], [exit_z])
+        if error is not None:
+            return error
+        anchored = _as_bool(data.get("anchored"), False)
+        rerun_coint = _as_bool(data.get("rerunCoint"), True)
+
+        today = pd.Timestamp.today().normalize()
+        start, end, error = self._parse_date_range(data.get("startDate"), data.get("endDate"), today)
+        if error is not None:
+            return error
+
+        series_a, series_b, start, error = self._load_aligned_prices(symbol_a, symbol_b, start, end)
+        if error is not None:
+            return error
+        if len(series_a) <= train_size:
+            return Response(
+                {"error": f"Only {len(series_a)} overlapping trading days; walk-forward needs more than trainSize ({train_size})."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = walk_forward(
+            series_a,
+            series_b,
+            train_size,
+            test_size,
+            entry_z,
+            exit_z,
+            rolling_window,
+            anchored=anchored,
+            rerun_coint=rerun_coint,
+            max_p_value=max_p_value,
+        )
+
+        folds = []
+        for fold in result.folds:
+            fold = dict(fold)
+            for key in ("trainStart", "trainEnd", "testStart", "testEnd"):
+                fold[key] = fold[key].strftime("%Y-%m-%d")
+            for key in ("hedgeRatio", "cointegrationPValue", "cumulativeReturn", "sharpe"):
+                fold[key] = _safe_num(fold[key])
+            folds.append(fold)
+
+        return Response({
+            "symbols": {"A": symbol_a, "B": symbol_b},
+            "dateRange": {"start": str(start), "end": str(end)},
+            "observations": len(series_a),
+            "trainSize": train_size,
+            "testSize": test_size,
+            "anchored": anchored,
+            "rerunCoint": rerun_coint,
+            "outOfSampleDays": len(result.daily_pnl),
+            "foldsTraded": sum(1 for f in folds if f["traded"]),
+            "trades": result.trades,
+            "cumulativeReturn": _safe_num(result.cumulative_return),
+            "sharpe": _safe_num(sharpe_ratio(result.daily_pnl)),
+            "folds": folds,
+            # Out-of-sample cumulative PnL across the stitched test windows, for plotting
+            "pnlSeries": _records(_dates(result.index[-300:]), {"cumulativeReturn": (result.cumulative[-300:] - 1).tolist()}),
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,62 @@
+import logging
+
+from ..concurrency import run_io
+from ..interface import answer_question_async
+from ..interface import answer_questions as answer_questions_rag
+from ..interface import rag_status
+from ..interface import stream_answer_async
+from ..sse import answer_events, sse_response, wants_stream
+from .async_base import AsyncJSONView
+from .rag_view import MAX_BATCH_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+
+class RAGAsyncView(AsyncJSONView):
+    """
+    Async (ASGI) variant of RAGView with the same requests and responses.
+    Chroma retrieval and the market snapshot run concurrently and Gemini is
+    awaited, so a slow answer does not tie up a worker thread.
+    """
+
+    async def get(self, request):
+        return self.json_response(rag_status())
+
+    async def post(self, request):
+        data, error = self.parse_body(request)
+        if error is not None:
+            return error
+
+        if 'messages' in data:
+            return await self._post_batch(data.get('messages'))
+
+        query = data.get('message', None)
+        if not query:
+            return self.json_response({"reply": "No query (message) provided."}, status=400)
+        try:
+            if wants_stream(request, data):
+                return sse_response(request, answer_events(await stream_answer_async(query)))
+            result = await answer_question_async(query)
+            return self.json_response({"reply": result.get("answer", "Could not generate answer from knowledge base.")})
+        except FileNotFoundError:
+            logger.error("RAG corpus file not found.")
+            return self.json_response({"reply": "Error: RAG knowledge base not found."}, status=500)
+        except Exception:
+            logger.exception("Error in RAGAsyncView")
+            return self.json_response({"reply": "An error occurred processing the RAG request."}, status=500)
+
+    async def _post_batch(self, messages):
+        if not isinstance(messages, list) or not messages or not all(isinstance(m, str) and m.strip() for m in messages):
+            return self.json_response({"replies": [], "error": "'messages' must be a non-empty list of questions."}, status=400)
+        if len(messages) > MAX_BATCH_MESSAGES:
+            return self.json_response({"replies": [], "error": f"At most {MAX_BATCH_MESSAGES} messages per batch."}, status=400)
+        try:
+            # answer_many already batches retrieval and fans Gemini calls out to threads
+            result = await run_io(answer_questions_rag, messages)
+            return self.json_response({"replies": result.get("answers", [])})
+        except FileNotFoundError:
+            logger.error("RAG corpus file not found.")
+            return self.json_response({"replies": [], "error": "RAG knowledge base not found."}, status=500)
+        except Exception:
+            logger.exception("Error in RAGAsyncView batch")
+            return self.json_response({"replies": [], "error": "An error occurred processing the RAG batch request."}, status=500)
@@ -3,14 +3,34 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from ..interface import answer_question as answer_question_rag
+from ..interface import answer_questions as answer_questions_rag
+from ..interface import rag_status
+from ..interface import stream_answer as stream_answer_rag
+from ..sse import answer_events, sse_response, wants_stream
+
+MAX_BATCH_MESSAGES = 50
 
 
 class RAGView(APIView):
-    """Handles chatbot requests using the Chroma + Gemini RAG pipeline."""
+    """
+    Handles chatbot requests using the Chroma + Gemini RAG pipeline.
+    Send {"message": "..."} for one reply or {"messages": [...]} for a batch.
+    Add "stream": true (or Accept: text/event-stream) to receive the reply as
+    server-sent events while Gemini generates it.
+    GET reports whether the pipeline is loaded ({"ready": ..., "state": ...}).
+    """
+    def get(self, request):
+        return Response(rag_status(), status=status.HTTP_200_OK)
+
     def post(self, request):
+        if 'messages' in request.data:
+            return self._post_batch(request.data.get('messages'))
+
         query = request.data.get('message', None)
         if not query:
             return Response({"reply": "No query (message) provided."}, status=status.HTTP_400_BAD_REQUEST)
+        if wants_stream(request):
+            return sse_response(request, answer_events(stream_answer_rag(query)))
         try:
             result = answer_question_rag(query)
             return Response({"reply": result.get("answer", "Could not generate answer from knowledge base.")}, status=status.HTTP_200_OK)
@@ -21,7 +41,24 @@ class RAGView(APIView):
             print(f"Error in RAGView: {e}")
             return Response({"reply": "An error occurred processing the RAG request."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _post_batch(self, messages):
+        if not isinstance(messages, list) or not messages or not all(isinstance(m, str) and m.strip() for m in messages):
+            return Response({"replies": [], "error": "'messages' must be a non-empty list of questions."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(messages) > MAX_BATCH_MESSAGES:
+            return Response({"replies": [], "error": f"At most {MAX_BATCH_MESSAGES} messages per batch."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = answer_questions_rag(messages)
+            return Response({"replies": result.get("answers", [])}, status=status.HTTP_200_OK)
+        except FileNotFoundError:
+             print("Error: RAG corpus file not found.")
+             return Response({"replies": [], "error": "RAG knowledge base not found."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except Exception as e:
+            print(f"Error in RAGView batch: {e}")
+            return Response({"replies": [], "error": "An error occurred processing the RAG batch request."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 # SAMPLE Qs
 
 # {"message": "How do you determine if a stock is undervalued?"}
 # {"message": "What is intrinsic value?"}
+# {"message": "What is reflexivity?", "stream": true}
+# {"messages": ["What is reflexivity?", "How does Soros size positions?"]}
@@ -0,0 +1,103 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+import numpy as np
+import pandas as pd
+
+from ..fundamentals_cache import get_fundamentals_cache
+from ..ratio_rules import COMPILED_RULES, stack_statements
+
+MAX_SYMBOLS = 500
+PREFETCH_WORKERS = 8
+
+
+def _parse_symbols(raw):
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    return list(dict.fromkeys(str(s).upper().strip() for s in (raw or []) if str(s).strip()))
+
+
+def _json_value(value):
+    """Convert numpy / pandas scalars to JSON-friendly values (NaN and <NA> become None)."""
+    if value is pd.NA or value is None:
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    f = float(value)
+    return None if np.isnan(f) or np.isinf(f) else f
+
+
+class FinancialScreenView(APIView):
+    """
+    Screens many symbols at once: stacks their annual statements and evaluates
+    every rule in the ratio registry as whole-column operations.
+    Accepts POST {"symbols": [...]} or GET ?symbols=AAPL,MSFT; optional sortBy / ascending.
+    """
+
+    def get(self, request):
+        return self._screen(request.query_params.get("symbols"), request.query_params)
+
+    def post(self, request):
+        return self._screen(request.data.get("symbols"), request.data)
+
+    def _screen(self, raw_symbols, params):
+        symbols = _parse_symbols(raw_symbols)
+        if not symbols:
+            return Response({"error": "Provide at least one symbol in 'symbols'."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(symbols) > MAX_SYMBOLS:
+            return Response({"error": f"At most {MAX_SYMBOLS} symbols per screen."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            year_index = int(params.get("yearIndex", 0))
+        except (TypeError, ValueError):
+            year_index = -1
+        if year_index < 0:
+            return Response({"error": "yearIndex must be a non-negative integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Statements come from the fundamentals cache; misses are fetched concurrently
+        cache = get_fundamentals_cache()
+        errors = {s: e for s, e in cache.prefetch(symbols, max_workers=PREFETCH_WORKERS).items() if e}
+        statements = {}
+        missing = []
+        for symbol in symbols:
+            if symbol in errors:
+                missing.append(symbol)
+                continue
+            income_stmt, balance_sheet, cash_flow = cache.get_statements(symbol)
+            if income_stmt.empty or balance_sheet.empty:
+                missing.append(symbol)
+                continue
+            statements[symbol] = (income_stmt, balance_sheet, cash_flow)
+
+        items, periods = stack_statements(statements, year_indices=(year_index,))
+        table = COMPILED_RULES.table(items, periods).droplevel("yearIndex")
+
+        sort_by = params.get("sortBy", "checksPassed")
+        if sort_by not in table.columns:
+            return Response(
+                {"error": f"Unknown sortBy '{sort_by}'.", "columns": list(table.columns)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ascending = str(params.get("ascending", "false")).lower() in {"1", "true", "yes"}
+        table = table.sort_values(sort_by, ascending=ascending, na_position="last", kind="stable")
+
+        columns = list(table.columns)
+        values = [table[col].to_numpy(dtype=object) for col in columns]
+        rows = [
+            dict(symbol=symbol, **{col: _json_value(v) for col, v in zip(columns, row)})
+            for symbol, *row in zip(table.index, *values)
+        ]
+
+        return Response(
+            {
+                "columns": columns,
+                "sortBy": sort_by,
+                "ascending": ascending,
+                "yearIndex": year_index,
+                "rows": rows,
+                "missing": missing,
+            },
+            status=status.HTTP_200_OK,
+        )
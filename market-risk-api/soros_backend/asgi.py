@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'buffet_backend.settings')
+# Route /api/ragbot/ and /api/pairs/ to their async views (see financials_api/urls.py)
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
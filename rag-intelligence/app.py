@@ -157,16 +157,25 @@ if user_input:
         </div>
     """, unsafe_allow_html=True)
     
-    # Get bot response
+    # Stream the bot response into a placeholder as Gemini writes it
+    placeholder = st.empty()
+    full_response = ""
     with st.spinner('Thinking like Soros...'):
-        full_response = st.session_state.chatbot.answer(user_input)
-        direct_answer = extract_direct_answer(full_response)
+        for chunk in st.session_state.chatbot.answer_stream(user_input):
+            full_response += chunk
+            placeholder.markdown(f"""
+                <div class="chat-message bot-message">
+                    <div class="message-header">Soros AI</div>
+                    <div>{full_response}</div>
+                </div>
+            """, unsafe_allow_html=True)
+    direct_answer = extract_direct_answer(full_response)
     
     # Add bot response to chat
     st.session_state.messages.append({"role": "assistant", "content": direct_answer})
     
     # Display bot response
-    st.markdown(f"""
+    placeholder.markdown(f"""
         <div class="chat-message bot-message">
             <div class="message-header">Soros AI</div>
             <div>{direct_answer}</div>
@@ -25,8 +25,11 @@ def main():
             print("SorosBot: Please type a question.\n")
             continue
 
-        reply = bot.answer(user_input)
-        print("\nSorosBot:", reply, "\n")
+        # Print the answer as it streams in
+        print("\nSorosBot: ", end="", flush=True)
+        for chunk in bot.answer_stream(user_input):
+            print(chunk, end="", flush=True)
+        print("\n")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,17 @@
 # market_data.py
 
-import warnings
-import yfinance as yf
+import sys
+from pathlib import Path
+
 import pandas as pd
 
-# Silence yfinance FutureWarnings
-warnings.filterwarnings("ignore", category=FutureWarning, module="yfinance")
+# The price store is market-risk-api's (no Django needed), so both apps share one
+# module and, unless PRICE_STORE_DIR says otherwise, one store of downloads
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "market-risk-api"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.append(str(BACKEND_DIR))
+
+from financials_api.price_store import get_price_store  # noqa: E402
 
 
 def _to_float(x):
@@ -27,28 +33,19 @@ def get_market_snapshot(ticker: str, period: str = "6mo") -> str:
     """
     Fetch a clean market snapshot for a given ticker.
     Always returns readable, scalar float values.
+    Prices come from the local price store, which only downloads dates it has not seen.
     """
     ticker = ticker.upper().strip()
 
     try:
-        data = yf.download(
-            ticker,
-            period=period,
-            interval="1d",
-            progress=False,
-            auto_adjust=False,  # explicitly set to avoid future warnings
-        )
+        data = get_price_store().get_period(ticker, period)
     except Exception as e:
         return f"Error fetching data for {ticker}: {e}"
 
     if data.empty:
         return f"No market data available for {ticker}."
 
-    # Handle multi-index columns like ('Close', 'AAPL')
-    if isinstance(data.columns, pd.MultiIndex):
-        close = data["Close"].iloc[:, 0].dropna()
-    else:
-        close = data["Close"].dropna()
+    close = data["Close"].dropna()
 
     if close.empty:
         return f"No valid close prices for {ticker}."
@@ -1,7 +1,7 @@
 # rag_generator.py
 
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 import google.generativeai as genai
 
@@ -9,6 +9,26 @@ import google.generativeai as genai
 DEFAULT_MODEL_NAME = "models/gemini-2.5-flash"
 
 
+def _blocked_message(response) -> str:
+    """Explanation returned when Gemini produced no text (usually safety filters)."""
+    finish_reasons = []
+    for cand in getattr(response, "candidates", []) or []:
+        fr = getattr(cand, "finish_reason", None)
+        if fr is not None:
+            finish_reasons.append(str(fr))
+
+    fr_info = ", ".join(sorted(set(finish_reasons))) if finish_reasons else "unknown"
+
+    return (
+        "The model could not return a normal answer (finish_reason="
+        + fr_info
+        + "). This often happens due to safety filters or content restrictions.\n\n"
+        "For your demo, you can explain that the underlying LLM refused to answer "
+        "this exact phrasing. Try rephrasing the question in more general, "
+        "educational terms and avoid asking for explicit buy/sell/hold advice."
+    )
+
+
 class GeminiAnswerGenerator:
     """
     Wrapper around a Gemini model used as the generator in the RAG pipeline.
@@ -93,23 +113,37 @@ class GeminiAnswerGenerator:
             return "\n".join(parts).strip()
 
         # --- Final fallback: likely safety / blocked content ---
-        finish_reasons = []
-        for cand in getattr(response, "candidates", []) or []:
-            fr = getattr(cand, "finish_reason", None)
-            if fr is not None:
-                finish_reasons.append(str(fr))
-
-        fr_info = ", ".join(sorted(set(finish_reasons))) if finish_reasons else "unknown"
-
-        return (
-            "The model could not return a normal answer (finish_reason="
-            + fr_info
-            + "). This often happens due to safety filters or content restrictions.\n\n"
-            "For your demo, you can explain that the underlying LLM refused to answer "
-            "this exact phrasing. Try rephrasing the question in more general, "
-            "educational terms and avoid asking for explicit buy/sell/hold advice."
+        return _blocked_message(response)
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Same as generate(), but yields text chunks as Gemini produces them
+        (stream=True), so callers can show the answer while it is written.
+        """
+        prompt = (prompt or "").strip()
+        if not prompt:
+            raise ValueError("Prompt is empty in GeminiAnswerGenerator.generate_stream().")
+
+        response = self.model.generate_content(
+            prompt,
+            generation_config=self.generation_config,
+            stream=True,
         )
 
+        produced = False
+        for chunk in response:
+            try:
+                text = chunk.text  # raises if this chunk has no valid Part
+            except Exception:
+                text = None
+            if text:
+                produced = True
+                yield text
+
+        # Nothing came back: likely safety / blocked content
+        if not produced:
+            yield _blocked_message(response)
+
 
 # Simple manual test (optional)
 if __name__ == "__main__":
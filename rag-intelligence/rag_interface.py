@@ -124,6 +124,19 @@ Be concise, avoid repetition, and keep the answer readable for a classroom prese
         reply = self.generator.generate(prompt)
         return reply
 
+    def answer_stream(self, user_question: str):
+        """
+        Same as answer(), but yields the reply in chunks while Gemini is still
+        writing it (used by chat_cli.py and app.py to show text immediately).
+        """
+        user_question = (user_question or "").strip()
+        if not user_question:
+            yield "Please ask a question about trading, investing, markets, or Soros's philosophy."
+            return
+
+        prompt = self._build_prompt(user_question)
+        yield from self.generator.generate_stream(prompt)
+
 
 # Quick test
 if __name__ == "__main__":